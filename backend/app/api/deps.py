@@ -0,0 +1,122 @@
+import time
+from datetime import datetime
+from typing import Dict, Optional
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.services.async_firestore_service import async_firestore_service
+from app.services.firestore_service import firestore_service
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
+# Same scheme for endpoints that also serve anonymous callers
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login", auto_error=False)
+
+# Maps raw bearer token -> principal so the hot path skips JWT decoding and
+# the user document read. The cache is per process: an account deleted or
+# revoked through another worker is only seen here once the entry expires,
+# so PRINCIPAL_CACHE_TTL_SECONDS bounds how long its tokens keep working.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+
+def _credentials_error(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+def _resolve_principal(token: str) -> Dict:
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    payload = decode_access_token(token)
+    if payload is None:
+        raise _credentials_error("Invalid or expired token. Please log in again.")
+
+    username = payload.get("sub")
+    if not username:
+        raise _credentials_error("Invalid token format. Please log in again.")
+
+    user_id = payload.get("uid")
+    if user_id:
+        user = firestore_service.get_user_by_id(user_id)
+    else:
+        # Tokens issued before the uid claim was added are looked up by name
+        user = firestore_service.get_user_by_username(username)
+        if not user:
+            raise _credentials_error("User account not found. Please register or log in again.")
+        user_id = user["id"]
+
+    # Deleted accounts, and accounts being deleted (``revoked_at`` is set
+    # on the user document), keep a principal so their jobs can be polled
+    principal = {
+        "user_id": user_id,
+        "username": username,
+        "active": user is not None and not user.get("revoked_at")
+    }
+
+    # Never keep a principal around longer than the token itself is valid
+    expires_in = payload.get("exp", 0) - time.time()
+    principal_cache.set(token, principal, ttl=expires_in)
+    return principal
+
+
+def get_current_principal(token: str = Depends(oauth2_scheme)) -> Dict:
+    """Resolve the bearer token to ``{"user_id", "username", "active"}`` of an active account"""
+    principal = _resolve_principal(token)
+    if not principal["active"]:
+        raise _credentials_error("User account not found. Please register or log in again.")
+    return principal
+
+
+def get_current_user_id(principal: Dict = Depends(get_current_principal)) -> str:
+    """Get current user ID from token"""
+    return principal["user_id"]
+
+
+def get_job_owner_id(token: str = Depends(oauth2_scheme)) -> str:
+    """
+    Like ``get_current_user_id``, but still accepts the tokens of an account
+    that is being deleted, so its deletion job can be polled
+    """
+    return _resolve_principal(token)["user_id"]
+
+
+def get_optional_user_id(token: Optional[str] = Depends(optional_oauth2_scheme)) -> Optional[str]:
+    """User ID for a valid bearer token, or None for anonymous or invalid tokens"""
+    if not token:
+        return None
+    try:
+        return get_current_principal(token)["user_id"]
+    except HTTPException:
+        return None
+
+
+def invalidate_user(user_id: str) -> int:
+    """Drop every cached principal belonging to a user"""
+    return principal_cache.discard_where(lambda principal: principal["user_id"] == user_id)
+
+
+async def revoke_user(user_id: str) -> bool:
+    """
+    Reject a user's outstanding tokens on every worker (their account is
+    being deleted): mark the user document, which principals are checked
+    against, and drop this process's cached principals. False if the
+    document could not be updated.
+    """
+    revoked = await async_firestore_service.update_user(user_id, {"revoked_at": datetime.utcnow()})
+    invalidate_user(user_id)
+    return revoked
+
+
+async def restore_user(user_id: str) -> None:
+    """Accept a user's tokens again (their account deletion failed)"""
+    await async_firestore_service.update_user(user_id, {"revoked_at": None})
+    invalidate_user(user_id)
@@ -1,95 +1,88 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, Request
 from datetime import datetime, timedelta
-import pandas as pd
-from app.api.routes.auth import oauth2_scheme
-from app.core.security import decode_access_token
-from app.services.firestore_service import firestore_service
+from typing import Dict
+from app.api.deps import get_current_user_id
+from app.core.config import settings
+from app.services.async_firestore_service import async_firestore_service
+from app.services.jobs import job_queue, prefers_async
+from app.services.response_cache import response_cache
+from app.services.timeseries_store import timeseries_store
 
 router = APIRouter()
 
-def get_current_user_id(token: str = Depends(oauth2_scheme)) -> str:
-    """Get current user ID from token"""
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    
-    username = payload.get("sub")
-    user = firestore_service.get_user_by_username(username)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    return user["id"]
+# Trends and statistics are computed from the cached columnar series in
+# app.services.timeseries; numpy and that module are imported inside the
+# handlers, so they are only loaded on first use instead of on every cold start
+
+# Progress and statistics are polled by dashboards, so they answer
+# conditional GETs and reuse rendered responses (see app.services.response_cache).
+# Long progress windows are computed as background jobs (app.services.jobs).
 
 @router.get("/progress")
 async def get_progress_analytics(
+    request: Request,
     days: int = 30,
     user_id: str = Depends(get_current_user_id)
 ):
-    """Get workout and nutrition progress analytics using Pandas"""
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    # Get workouts
-    all_workouts = firestore_service.get_user_workouts(user_id, limit=1000)
-    workouts = [w for w in all_workouts if w.get("created_at") and w["created_at"] >= start_date]
+    """
+    Get workout and nutrition progress analytics from the daily rollups.
+    Windows over ANALYTICS_SYNC_MAX_DAYS, or requests sent with
+    ``Prefer: respond-async``, answer 202 with a job to poll unless the
+    result is already cached.
+    """
+    if days > settings.ANALYTICS_SYNC_MAX_DAYS or prefers_async(request):
+        return await job_queue.respond(
+            request, user_id, "analytics/progress", {"days": days},
+            lambda user: _progress_analytics(user_id, days)
+        )
+    return await response_cache.respond(request, user_id, lambda user: _progress_analytics(user_id, days))
+
+async def _progress_analytics(user_id: str, days: int) -> Dict:
+    # One pre-aggregated document per day: at most `days` reads
+    today = datetime.utcnow().date()
+    rollups = await async_firestore_service.get_daily_rollups(user_id, today - timedelta(days=days - 1), today)
     
-    # Get nutrition logs
-    all_nutrition = firestore_service.get_user_nutrition_logs(user_id, limit=1000)
-    nutrition_logs = [n for n in all_nutrition if n.get("created_at") and n["created_at"] >= start_date]
+    workout_data = []
+    total_workouts = 0
+    type_distribution = {}
+    nutrition_data = []
+    total_meals = 0
+    total_calories = 0
+    total_protein = 0
     
-    # Convert to DataFrames for analysis
-    if workouts:
-        workout_df = pd.DataFrame([{
-            'date': w["created_at"].date() if isinstance(w["created_at"], datetime) else w["created_at"],
-            'duration': w.get("duration", 0) or 0,
-            'calories_burned': w.get("calories_burned", 0) or 0,
-            'workout_type': w.get("workout_type", "unknown")
-        } for w in workouts])
-        
-        # Group by date
-        workout_summary = workout_df.groupby('date').agg({
-            'duration': 'sum',
-            'calories_burned': 'sum'
-        }).reset_index()
-        
-        workout_data = workout_summary.to_dict('records')
+    for rollup in rollups:
+        if rollup.get("workout_count", 0) > 0:
+            workout_data.append({
+                "date": rollup["date"],
+                "duration": rollup.get("duration", 0),
+                "calories_burned": rollup.get("calories_burned", 0)
+            })
+            total_workouts += rollup["workout_count"]
+            for workout_type, count in rollup.get("workout_types", {}).items():
+                if count > 0:
+                    type_distribution[workout_type] = type_distribution.get(workout_type, 0) + count
         
-        # Workout type distribution
-        type_distribution = workout_df['workout_type'].value_counts().to_dict()
-    else:
-        workout_data = []
-        type_distribution = {}
+        if rollup.get("meal_count", 0) > 0:
+            nutrition_data.append({
+                "date": rollup["date"],
+                "calories": rollup.get("calories", 0),
+                "protein": rollup.get("protein", 0),
+                "carbs": rollup.get("carbs", 0),
+                "fats": rollup.get("fats", 0)
+            })
+            total_meals += rollup["meal_count"]
+            total_calories += rollup.get("calories", 0)
+            total_protein += rollup.get("protein", 0)
     
-    if nutrition_logs:
-        nutrition_df = pd.DataFrame([{
-            'date': n["created_at"].date() if isinstance(n["created_at"], datetime) else n["created_at"],
-            'calories': n.get("calories", 0),
-            'protein': n.get("protein", 0) or 0,
-            'carbs': n.get("carbs", 0) or 0,
-            'fats': n.get("fats", 0) or 0
-        } for n in nutrition_logs])
-        
-        # Group by date
-        nutrition_summary = nutrition_df.groupby('date').agg({
-            'calories': 'sum',
-            'protein': 'sum',
-            'carbs': 'sum',
-            'fats': 'sum'
-        }).reset_index()
-        
-        nutrition_data = nutrition_summary.to_dict('records')
-        
-        # Calculate averages
-        avg_calories = nutrition_df['calories'].mean()
-        avg_protein = nutrition_df['protein'].mean()
-    else:
-        nutrition_data = []
-        avg_calories = 0
-        avg_protein = 0
+    # Averages are per logged meal, as before
+    avg_calories = total_calories / total_meals if total_meals else 0
+    avg_protein = total_protein / total_meals if total_meals else 0
     
     return {
         "period_days": days,
         "workouts": {
-            "total_count": len(workouts),
+            "total_count": total_workouts,
             "daily_data": workout_data,
             "type_distribution": type_distribution
         },
@@ -112,24 +105,25 @@ async def get_trends(
     start_date = datetime.utcnow() - timedelta(days=days)
     
     if metric in ["calories_burned", "duration"]:
-        # Workout metrics
-        all_workouts = firestore_service.get_user_workouts(user_id, limit=1000)
-        workouts = [w for w in all_workouts if w.get("created_at") and w["created_at"] >= start_date]
+        # Workout metrics; only the window is loaded if nothing is cached yet
+        series = await asyncio.to_thread(timeseries_store.get, user_id, since=start_date)
         
-        if not workouts:
-            return {"trend": "no_data", "data": []}
+        import numpy as np
+        from app.services.timeseries import day_to_date, epoch_seconds, utc_days
+        columns = series.workouts.columns()
+        recent = columns["log_date"] >= epoch_seconds(start_date)
         
-        df = pd.DataFrame([{
-            'date': w["created_at"].date() if isinstance(w["created_at"], datetime) else w["created_at"],
-            'value': w.get(metric, 0) or 0
-        } for w in workouts])
+        if not recent.any():
+            return {"trend": "no_data", "data": []}
         
-        daily_data = df.groupby('date')['value'].sum().reset_index()
+        # Daily totals, oldest day first
+        day_numbers, day_index = np.unique(utc_days(columns["log_date"][recent]), return_inverse=True)
+        totals = np.bincount(day_index, columns[metric][recent])
         
-        # Calculate trend (simple linear regression)
-        if len(daily_data) > 1:
-            daily_data['day_num'] = range(len(daily_data))
-            correlation = daily_data['day_num'].corr(daily_data['value'])
+        # Calculate trend (correlation of the daily totals with time)
+        if len(totals) > 1:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                correlation = np.corrcoef(np.arange(len(totals)), totals)[0, 1]
             trend = "increasing" if correlation > 0.1 else "decreasing" if correlation < -0.1 else "stable"
         else:
             trend = "insufficient_data"
@@ -137,31 +131,31 @@ async def get_trends(
         return {
             "metric": metric,
             "trend": trend,
-            "data": daily_data[['date', 'value']].to_dict('records')
+            "data": [
+                {"date": day_to_date(day), "value": value}
+                for day, value in zip(day_numbers.tolist(), totals.tolist())
+            ]
         }
     
     return {"error": "Invalid metric"}
 
 @router.get("/statistics")
 async def get_statistics(
+    request: Request,
     user_id: str = Depends(get_current_user_id)
 ):
     """Get overall user statistics"""
-    user = firestore_service.get_user_by_id(user_id)
-    
-    # Get all workouts and nutrition logs
-    all_workouts = firestore_service.get_user_workouts(user_id, limit=10000)
-    all_nutrition = firestore_service.get_user_nutrition_logs(user_id, limit=10000)
+    return await response_cache.respond(request, user_id, lambda user: _statistics(user_id, user))
+
+async def _statistics(user_id: str, user: Dict) -> Dict:
+    # The profile also carries the data versions the cached series are checked against
+    series = await asyncio.to_thread(timeseries_store.get, user_id, user, True, True)
     
-    total_workouts = len(all_workouts)
-    total_nutrition_logs = len(all_nutrition)
+    from app.services.timeseries import epoch_seconds
     
     # Last 7 days activity
     last_week = datetime.utcnow() - timedelta(days=7)
-    recent_workouts = len([
-        w for w in all_workouts 
-        if w.get("created_at") and w["created_at"] >= last_week
-    ])
+    recent_workouts = int((series.workouts.columns()["created_at"] >= epoch_seconds(last_week)).sum())
     
     return {
         "user_info": {
@@ -169,8 +163,8 @@ async def get_statistics(
             "member_since": user.get("created_at").date() if user.get("created_at") else None
         },
         "totals": {
-            "workouts": total_workouts,
-            "nutrition_logs": total_nutrition_logs
+            "workouts": len(series.workouts),
+            "nutrition_logs": len(series.nutrition)
         },
         "recent_activity": {
             "workouts_last_7_days": recent_workouts
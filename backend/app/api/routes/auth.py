@@ -1,35 +1,44 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.api.deps import get_current_user_id, invalidate_user, restore_user, revoke_user
+from app.core.security import password_hasher, create_access_token
 from app.schemas.schemas import UserCreate, UserResponse, Token, UserUpdate
 from app.core.config import settings
-from app.services.firestore_service import firestore_service
+from app.services.async_firestore_service import async_firestore_service
+from app.services.insights_worker import insights_worker
+from app.services.jobs import job_queue
+from app.services.model_store import model_store
+from app.services.timeseries_store import timeseries_store
 
 router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_PREFIX}/auth/login")
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user: UserCreate):
     """Register a new user"""
+    # Check email and username availability concurrently
+    existing_email, existing_username = await asyncio.gather(
+        async_firestore_service.get_user_by_email(user.email),
+        async_firestore_service.get_user_by_username(user.username)
+    )
+    
     # Check if user exists by email
-    existing_user = firestore_service.get_user_by_email(user.email)
-    if existing_user:
+    if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Check if username is taken
-    existing_user = firestore_service.get_user_by_username(user.username)
-    if existing_user:
+    if existing_username:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     user_data = {
         "email": user.email,
         "username": user.username,
@@ -41,47 +50,44 @@ async def register(user: UserCreate):
         "gender": user.gender
     }
     
-    user_id = firestore_service.create_user(user_data)
+    user_id = await async_firestore_service.create_user(user_data)
     
     # Get the created user to return
-    created_user = firestore_service.get_user_by_id(user_id)
+    created_user = await async_firestore_service.get_user_by_id(user_id)
     
     return created_user
 
 @router.post("/login", response_model=Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """Login user and return access token"""
-    user = firestore_service.get_user_by_username(form_data.username)
+    user = await async_firestore_service.get_user_by_username(form_data.username)
     
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await password_hasher.verify_and_update(form_data.password, user["hashed_password"])
+    
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Re-hash with the current argon2 parameters while we have the password
+    if new_hash:
+        await async_firestore_service.update_user(user["id"], {"hashed_password": new_hash})
+    
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user["username"]}, expires_delta=access_token_expires
+        data={"sub": user["username"], "uid": user["id"]}, expires_delta=access_token_expires
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(user_id: str = Depends(get_current_user_id)):
     """Get current authenticated user"""
-    from app.core.security import decode_access_token
-    
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    username: str = payload.get("sub")
-    user = firestore_service.get_user_by_username(username)
+    user = await async_firestore_service.get_user_by_id(user_id)
     
     if user is None:
         raise HTTPException(
@@ -94,21 +100,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
 @router.put("/me", response_model=UserResponse)
 async def update_current_user(
     user_update: UserUpdate,
-    token: str = Depends(oauth2_scheme)
+    user_id: str = Depends(get_current_user_id)
 ):
     """Update current authenticated user profile"""
-    from app.core.security import decode_access_token
-    
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    username: str = payload.get("sub")
-    user = firestore_service.get_user_by_username(username)
+    user = await async_firestore_service.get_user_by_id(user_id)
     
     if user is None:
         raise HTTPException(
@@ -131,9 +126,60 @@ async def update_current_user(
     
     # Update user in Firestore
     if update_data:
-        firestore_service.update_user(user["id"], update_data)
+        await async_firestore_service.update_user(user["id"], update_data)
+        invalidate_user(user["id"])
     
     # Get updated user
-    updated_user = firestore_service.get_user_by_id(user["id"])
+    updated_user = await async_firestore_service.get_user_by_id(user["id"])
     
     return updated_user
+
+@router.delete("/me", status_code=status.HTTP_202_ACCEPTED)
+async def delete_current_user(user_id: str = Depends(get_current_user_id)):
+    """
+    Delete the current user's account with all of their workouts, exercises,
+    nutrition logs and goals. Runs as a background job: poll the returned
+    ``status_url`` for progress (documents deleted so far) and the total.
+    """
+    user = await async_firestore_service.get_user_by_id(user_id)
+    
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found"
+        )
+    
+    # Reject the account's tokens on every worker before answering, so
+    # nothing runs under it once the client has been told it is going
+    if not await revoke_user(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Account deletion could not be started, please retry"
+        )
+    
+    job = None
+    
+    def progress(deleted: int) -> None:
+        job.progress = {"deleted": deleted}
+    
+    async def delete_account():
+        # Let a running insights refresh finish so it cannot write under
+        # the account after the cascade
+        await insights_worker.cancel(user_id)
+        try:
+            deleted = await async_firestore_service.delete_user(user_id, progress=progress)
+        except Exception:
+            # Let the user retry the deletion
+            await restore_user(user_id)
+            raise
+        timeseries_store.invalidate(user_id)
+        model_store.discard_user(user_id)
+        invalidate_user(user_id)
+        return {"deleted": deleted}
+    
+    try:
+        job = job_queue.submit(user_id, "account-delete", {}, user.get("data_version", 0), delete_account)
+    except Exception:
+        await restore_user(user_id)
+        raise
+    return job_queue.accepted(job)
@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from typing import Literal, Optional
+from app.api.deps import get_current_user_id
+from app.services.exporter import EXPORT_FORMATS, stream_export
+from app.services.firestore_service import firestore_service
+
+router = APIRouter()
+
+@router.get("")
+async def export_data(
+    export_format: Literal["ndjson", "csv", "parquet", "arrow"] = Query("ndjson", alias="format"),
+    table: Literal["workouts", "exercises", "nutrition_logs"] = "workouts",
+    columns: Optional[str] = Query(None, description="Comma-separated columns (parquet/arrow only)"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Download all of the user's workouts (with exercises), nutrition logs and
+    goals as NDJSON or CSV. The file is streamed while it is read from
+    Firestore, so it is never built up in memory.
+
+    ``format=parquet`` or ``format=arrow`` instead exports one ``table``
+    with typed columns (timestamps, floats, categorical types), optionally
+    limited to ``columns``, one row group at a time.
+    """
+    if export_format in ("parquet", "arrow"):
+        return _columnar_export(user_id, export_format, table, columns)
+
+    filename = f"fitness-export-{datetime.utcnow():%Y%m%d}.{export_format}"
+
+    # A plain generator: Starlette iterates it on a worker thread, so the
+    # blocking Firestore reads stay off the event loop
+    return StreamingResponse(
+        stream_export(firestore_service, user_id, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+def _columnar_export(user_id: str, export_format: str, table: str, columns: Optional[str]) -> StreamingResponse:
+    try:
+        from app.services.columnar_export import COLUMNAR_FORMATS, select_columns, stream_table
+    except ModuleNotFoundError as exc:
+        if not (exc.name or "").startswith("pyarrow"):
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"{export_format} export needs the pyarrow package, which is not installed"
+        )
+    except ImportError as exc:
+        # Installed, but broken (e.g. built against another numpy major version)
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"{export_format} export needs pyarrow, which is installed but failed to import: {exc}"
+        )
+
+    try:
+        selected = select_columns(table, columns)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc))
+
+    filename = f"fitness-{table}-{datetime.utcnow():%Y%m%d}.{export_format}"
+    return StreamingResponse(
+        stream_table(firestore_service, user_id, table, export_format, selected),
+        media_type=COLUMNAR_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,79 @@
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from typing import Literal, Optional
+from app.api.deps import get_current_user_id
+from app.core.config import settings
+from app.services.async_firestore_service import async_firestore_service
+from app.services.importer import run_import
+from app.services.insights_worker import insights_worker
+from app.services.timeseries_store import timeseries_store
+
+router = APIRouter()
+
+# Content types accepted for each upload format
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+_CHUNK_SIZE = 64 * 1024
+
+
+@router.post("")
+async def import_history(
+    request: Request,
+    kind: Literal["workouts", "nutrition"] = Query(...),
+    import_format: Optional[Literal["csv", "ndjson"]] = Query(None, alias="format"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """
+    Bulk-import past workouts or nutrition logs from a CSV (with a header
+    row) or NDJSON file, sent either as the raw request body or as the
+    ``file`` field of a multipart form. Rows take the same fields as
+    ``POST /workouts`` and ``POST /nutrition``. Returns a report of how many
+    rows were imported and why any were rejected.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    
+    if content_type == "multipart/form-data":
+        # Starlette spools the uploaded file to disk past 1 MiB
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Missing 'file' upload")
+        extension = os.path.splitext((upload.filename or "").lower())[1]
+        detected = _CONTENT_TYPES.get((upload.content_type or "").lower()) or _EXTENSIONS.get(extension)
+        
+        async def chunks():
+            while chunk := await upload.read(_CHUNK_SIZE):
+                yield chunk
+    else:
+        detected = _CONTENT_TYPES.get(content_type)
+        chunks = request.stream
+    
+    import_format = import_format or detected
+    if import_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson"
+        )
+    
+    report = await run_import(
+        async_firestore_service, user_id, kind, import_format, chunks(),
+        concurrency=settings.IMPORT_BATCH_CONCURRENCY,
+        max_rows=settings.IMPORT_MAX_ROWS,
+        max_errors=settings.IMPORT_MAX_ERRORS
+    )
+    
+    if report["imported"]:
+        # Cached series reload on next use; insights are refreshed in the background
+        timeseries_store.invalidate(user_id)
+        if kind == "workouts":
+            insights_worker.schedule(user_id)
+    
+    return report
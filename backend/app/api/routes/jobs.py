@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.schemas.schemas import JobResponse
+from app.api.deps import get_job_owner_id
+from app.core.config import settings
+from app.services.jobs import job_queue
+
+router = APIRouter()
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=settings.JOB_LONG_POLL_MAX_SECONDS),
+    user_id: str = Depends(get_job_owner_id)
+):
+    """
+    Get a background job's status, and its result once it has finished.
+    Pass ``wait`` to long-poll: the response is held for up to that many
+    seconds until the job finishes.
+    """
+    job = job_queue.get(job_id)
+    
+    # Other users' jobs are indistinguishable from missing ones
+    if not job or job.user_id != user_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    
+    if wait and not job.done:
+        job = await job_queue.wait(job_id, wait) or job
+    
+    return job.to_dict()
@@ -1,126 +1,102 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, Query, Request
 from datetime import datetime, timedelta
-import numpy as np
-from sklearn.linear_model import LinearRegression
-import pandas as pd
-from app.api.routes.auth import oauth2_scheme
-from app.core.security import decode_access_token
-from app.services.firestore_service import firestore_service
+from app.api.deps import get_current_user_id
+from app.services.timeseries_store import timeseries_store
+from app.services.model_store import model_store
+from app.services.response_cache import response_cache
+from app.services.insights_worker import insights_worker
+from app.services.jobs import job_queue, prefers_async
 
 router = APIRouter()
 
-def get_current_user_id(token: str = Depends(oauth2_scheme)) -> str:
-    """Get current user ID from token"""
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(status_code=401, detail="Invalid token")
-    
-    username = payload.get("sub")
-    user = firestore_service.get_user_by_username(username)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    return user["id"]
+# Every endpoint here computes from the cached columnar series in
+# app.services.timeseries. numpy, that module and the forecasting engine are
+# imported inside the handlers, so they are only loaded on first use instead
+# of on every cold start
 
 @router.get("/predict-performance")
 async def predict_workout_performance(
     workout_type: str = "strength",
-    days_ahead: int = 7,
+    days_ahead: int = Query(7, ge=1, le=365),
     user_id: str = Depends(get_current_user_id)
 ):
-    """Predict future workout performance using Linear Regression"""
-    # Get historical workout data
-    all_workouts = firestore_service.get_user_workouts(user_id, limit=1000)
-    workouts = [
-        w for w in all_workouts 
-        if w.get("workout_type") == workout_type
-    ]
-    workouts.sort(key=lambda x: x.get("created_at", datetime.min))
+    """
+    Forecast workout duration and calories with linear trends and 95%
+    prediction intervals. Pass ``workout_type=all`` for every type at once.
+    """
+    from app.services.forecasting import MIN_WORKOUTS, fit_workout_trends, forecast
+    
+    # The cached series is checked against the user's workout data version,
+    # and fits for all types are cached under that same version
+    series = await asyncio.to_thread(timeseries_store.get, user_id)
+    workouts = series.workouts
+    key = (user_id, "performance", workouts.version)
+    fits = await asyncio.to_thread(model_store.get, key)
+    
+    if fits is None:
+        import numpy as np
+        columns = workouts.columns()
+        # Fit on the most recent 1000 workouts, with log date as the x-axis
+        # too, so imported or back-dated workouts sit where they happened
+        recent = np.argsort(-columns["log_date"], kind="stable")[:1000]
+        fits = fit_workout_trends(
+            columns["workout_type"][recent],
+            workouts.categories["workout_type"],
+            columns["log_date"][recent],
+            columns["duration"][recent],
+            columns["calories_burned"][recent]
+        )
+        await asyncio.to_thread(model_store.put, key, fits)
+    
+    if workout_type == "all":
+        return {
+            "workout_type": "all",
+            "forecasts": [
+                {"workout_type": name, **forecast(fit, days_ahead)}
+                for name, fit in fits.items() if "slope" in fit
+            ],
+            "insufficient_data": [
+                {"workout_type": name, "current_count": fit["historical_workouts"]}
+                for name, fit in fits.items() if "slope" not in fit
+            ]
+        }
     
-    if len(workouts) < 5:
+    fit = fits.get(workout_type)
+    if fit is None or "slope" not in fit:
         return {
             "error": "Insufficient data for prediction",
-            "message": "Need at least 5 workouts of this type",
-            "current_count": len(workouts)
+            "message": f"Need at least {MIN_WORKOUTS} workouts of this type",
+            "current_count": fit["historical_workouts"] if fit else 0
         }
     
-    # Prepare data
-    df = pd.DataFrame([{
-        'date': w["created_at"],
-        'duration': w.get("duration", 0) or 0,
-        'calories_burned': w.get("calories_burned", 0) or 0
-    } for w in workouts])
-    
-    # Create day numbers for regression
-    df['day_num'] = (df['date'] - df['date'].min()).dt.days
-    
-    # Train model for duration prediction
-    X = df[['day_num']].values
-    y_duration = df['duration'].values
-    y_calories = df['calories_burned'].values
-    
-    # Duration model
-    duration_model = LinearRegression()
-    duration_model.fit(X, y_duration)
-    
-    # Calories model
-    calories_model = LinearRegression()
-    calories_model.fit(X, y_calories)
-    
-    # Make predictions
-    last_day = df['day_num'].max()
-    future_days = np.array([[last_day + i] for i in range(1, days_ahead + 1)])
-    
-    predicted_duration = duration_model.predict(future_days)
-    predicted_calories = calories_model.predict(future_days)
-    
-    predictions = []
-    for i, (dur, cal) in enumerate(zip(predicted_duration, predicted_calories)):
-        predictions.append({
-            "day": i + 1,
-            "predicted_duration": max(0, round(float(dur), 2)),
-            "predicted_calories": max(0, round(float(cal), 2))
-        })
-    
-    return {
-        "workout_type": workout_type,
-        "historical_workouts": len(workouts),
-        "predictions": predictions,
-        "model_info": {
-            "duration_score": round(duration_model.score(X, y_duration), 3),
-            "calories_score": round(calories_model.score(X, y_calories), 3)
-        }
-    }
+    return {"workout_type": workout_type, **forecast(fit, days_ahead)}
 
 @router.get("/recommend-goals")
 async def recommend_goals(
     user_id: str = Depends(get_current_user_id)
 ):
     """Recommend fitness goals based on user's historical data"""
-    user = firestore_service.get_user_by_id(user_id)
-    
-    # Get last 30 days of workouts
+    # Last 30 days of workouts; only those are loaded if nothing is cached yet
     start_date = datetime.utcnow() - timedelta(days=30)
-    all_workouts = firestore_service.get_user_workouts(user_id, limit=1000)
-    workouts = [w for w in all_workouts if w.get("created_at") and w["created_at"] >= start_date]
+    series = await asyncio.to_thread(timeseries_store.get, user_id, since=start_date)
+    
+    from app.services.timeseries import epoch_seconds
     
-    if not workouts:
+    columns = series.workouts.columns()
+    recent = columns["log_date"] >= epoch_seconds(start_date)
+    total_workouts = int(recent.sum())
+    
+    if not total_workouts:
         return {
             "message": "No recent workout data available",
             "recommendations": []
         }
     
-    df = pd.DataFrame([{
-        'duration': w.get("duration", 0) or 0,
-        'calories_burned': w.get("calories_burned", 0) or 0,
-        'workout_type': w.get("workout_type", "unknown")
-    } for w in workouts])
-    
     # Calculate statistics
-    avg_duration = df['duration'].mean()
-    avg_calories = df['calories_burned'].mean()
-    workout_frequency = len(workouts) / 30  # workouts per day
-    
+    avg_duration = float(columns["duration"][recent].mean())
+    avg_calories = float(columns["calories_burned"][recent].mean())
+    workout_frequency = total_workouts / 30  # workouts per day
     recommendations = []
     
     # Duration goal
@@ -157,60 +133,27 @@ async def recommend_goals(
     
     return {
         "period_analyzed": "Last 30 days",
-        "total_workouts": len(workouts),
+        "total_workouts": total_workouts,
         "recommendations": recommendations
     }
 
 @router.get("/workout-insights")
 async def get_workout_insights(
+    request: Request,
     user_id: str = Depends(get_current_user_id)
 ):
-    """Get ML-powered insights about workout patterns"""
-    workouts = firestore_service.get_user_workouts(user_id, limit=10000)
-    
-    if len(workouts) < 3:
-        return {"message": "Need more workout data for insights"}
-    
-    df = pd.DataFrame([{
-        'date': w["created_at"],
-        'duration': w.get("duration", 0) or 0,
-        'calories': w.get("calories_burned", 0) or 0,
-        'type': w.get("workout_type", "unknown"),
-        'day_of_week': w["created_at"].strftime('%A') if isinstance(w["created_at"], datetime) else "Unknown"
-    } for w in workouts])
-    
-    insights = []
-    
-    # Best day of week
-    if len(df) > 7:
-        day_stats = df.groupby('day_of_week')['calories'].mean()
-        best_day = day_stats.idxmax()
-        insights.append({
-            "type": "best_day",
-            "message": f"You perform best on {best_day}s",
-            "data": {"day": best_day, "avg_calories": round(day_stats.max(), 2)}
-        })
-    
-    # Most common workout type
-    if 'type' in df.columns:
-        most_common = df['type'].mode()[0] if len(df['type'].mode()) > 0 else None
-        if most_common:
-            insights.append({
-                "type": "preferred_workout",
-                "message": f"Your most common workout type is {most_common}",
-                "data": {"workout_type": most_common}
-            })
-    
-    # Consistency score
-    if len(df) > 14:
-        last_14_days = datetime.utcnow() - timedelta(days=14)
-        recent_workouts = df[df['date'] >= last_14_days]
-        consistency = (len(recent_workouts) / 14) * 100
-        
-        insights.append({
-            "type": "consistency",
-            "message": f"Your workout consistency is {round(consistency, 1)}%",
-            "data": {"consistency_score": round(consistency, 2)}
-        })
-    
-    return {"insights": insights}
+    """
+    Get ML-powered insights about workout patterns. With
+    ``Prefer: respond-async``, answers 202 with a job to poll unless the
+    result is already cached.
+    """
+    # Precomputed in the background after workout writes (see
+    # app.services.insights_worker); polled by dashboards, so it also answers
+    # conditional GETs and reuses rendered responses
+    if prefers_async(request):
+        return await job_queue.respond(
+            request, user_id, "ml/workout-insights", {},
+            lambda user: insights_worker.get(user_id, user)
+        )
+    return await response_cache.respond(request, user_id, lambda user: insights_worker.get(user_id, user))
+
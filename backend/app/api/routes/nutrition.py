@@ -1,41 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import List, Optional
 from datetime import datetime, timedelta
 from app.schemas.schemas import NutritionLogCreate, NutritionLogResponse
-from app.api.routes.auth import oauth2_scheme
-from app.core.security import decode_access_token
-from app.services.firestore_service import firestore_service
+from app.api.deps import get_current_user_id
+from app.services.firestore_service import next_cursor
+from app.services.async_firestore_service import async_firestore_service
+from app.services.timeseries_store import timeseries_store
 
 router = APIRouter()
 
-def get_current_user_id(token: str = Depends(oauth2_scheme)) -> str:
-    """Get current user ID from token"""
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED, 
-            detail="Invalid or expired token. Please log in again.",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    
-    username = payload.get("sub")
-    if not username:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token format. Please log in again.",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    
-    user = firestore_service.get_user_by_username(username)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail=f"User account not found. Please register or log in again.",
-            headers={"WWW-Authenticate": "Bearer"}
-        )
-    
-    return user["id"]
-
 @router.post("", response_model=NutritionLogResponse, status_code=status.HTTP_201_CREATED)
 async def create_nutrition_log(
     nutrition: NutritionLogCreate,
@@ -53,33 +26,39 @@ async def create_nutrition_log(
         "log_date": nutrition.log_date or datetime.utcnow()
     }
     
-    log_id = firestore_service.create_nutrition_log(user_id, nutrition_data)
-    created_log = firestore_service.get_nutrition_log_by_id(user_id, log_id)
+    log_id = await async_firestore_service.create_nutrition_log(user_id, nutrition_data)
+    created_log = await async_firestore_service.get_nutrition_log_by_id(user_id, log_id)
+    timeseries_store.add_nutrition_log(user_id, created_log)
     
     return created_log
 
 @router.get("", response_model=List[NutritionLogResponse])
 async def get_nutrition_logs(
-    skip: int = 0,
+    response: Response,
     limit: int = 100,
     days: int = 7,
+    cursor: Optional[str] = None,
     user_id: str = Depends(get_current_user_id)
 ):
-    """Get nutrition logs for current user (default: last 7 days)"""
-    logs = firestore_service.get_user_nutrition_logs(user_id, limit=limit)
-    
-    # Filter by date range (last N days)
+    """
+    Get nutrition logs for current user (default: last 7 days).
+    When more pages exist the X-Next-Cursor response header holds the
+    cursor to pass back for the next one.
+    """
+    # Date range (last N days) is filtered by Firestore
     start_date = datetime.utcnow() - timedelta(days=days)
-    filtered_logs = [
-        log for log in logs 
-        if log.get("log_date") and log["log_date"] >= start_date
-    ]
+    try:
+        logs = await async_firestore_service.get_user_nutrition_logs_between(
+            user_id, start=start_date, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    # Apply skip if needed
-    if skip > 0:
-        filtered_logs = filtered_logs[skip:]
+    cursor_for_next_page = next_cursor(logs, limit)
+    if cursor_for_next_page:
+        response.headers["X-Next-Cursor"] = cursor_for_next_page
     
-    return filtered_logs
+    return logs
 
 @router.get("/daily-summary")
 async def get_daily_summary(
@@ -92,20 +71,13 @@ async def get_daily_summary(
     else:
         target_date = datetime.utcnow()
     
-    start_of_day = target_date.replace(hour=0, minute=0, second=0, microsecond=0)
-    end_of_day = start_of_day + timedelta(days=1)
-    
-    # Get all nutrition logs and filter by date
-    all_logs = firestore_service.get_user_nutrition_logs(user_id, limit=1000)
-    logs = [
-        log for log in all_logs
-        if log.get("log_date") and start_of_day <= log["log_date"] < end_of_day
-    ]
+    # A single pre-aggregated rollup document holds the day's totals
+    rollup = await async_firestore_service.get_daily_rollup(user_id, target_date.date()) or {}
     
-    total_calories = sum(log.get("calories", 0) for log in logs)
-    total_protein = sum(log.get("protein", 0) or 0 for log in logs)
-    total_carbs = sum(log.get("carbs", 0) or 0 for log in logs)
-    total_fats = sum(log.get("fats", 0) or 0 for log in logs)
+    total_calories = rollup.get("calories", 0)
+    total_protein = rollup.get("protein", 0)
+    total_carbs = rollup.get("carbs", 0)
+    total_fats = rollup.get("fats", 0)
     
     return {
         "date": target_date.date(),
@@ -113,7 +85,7 @@ async def get_daily_summary(
         "total_protein": total_protein,
         "total_carbs": total_carbs,
         "total_fats": total_fats,
-        "meal_count": len(logs)
+        "meal_count": rollup.get("meal_count", 0)
     }
 
 @router.delete("/{log_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -122,11 +94,12 @@ async def delete_nutrition_log(
     user_id: str = Depends(get_current_user_id)
 ):
     """Delete a nutrition log"""
-    log = firestore_service.get_nutrition_log_by_id(user_id, log_id)
+    log = await async_firestore_service.get_nutrition_log_by_id(user_id, log_id)
     
     if not log:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Nutrition log not found")
     
-    firestore_service.delete_nutrition_log(user_id, log_id)
+    if await async_firestore_service.delete_nutrition_log(user_id, log_id, log):
+        timeseries_store.remove_nutrition_log(user_id, log_id)
     
     return None
@@ -1,22 +1,92 @@
-from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import BaseModel, Field
+from app.api.deps import get_optional_user_id
+from app.core.config import settings
 from app.services.ai_service import ai_service
+from app.services.async_firestore_service import async_firestore_service
+from app.services.met_matcher import normalize_activity
+from app.services.nutrition_cache import normalize_query
 
 router = APIRouter()
 
+# How often a long-running prediction checks whether its client is still there
+DISCONNECT_POLL_SECONDS = 0.25
+
+async def run_until_disconnect(request: Request, coro):
+    """
+    Await ``coro`` but cancel it if the client disconnects first, so the
+    caller stops waiting on (and holding open) a shared upstream lookup.
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+
+async def run_batch(
+    items: List[Any],
+    key: Callable[[Any], Hashable],
+    resolve: Callable[[Any], Awaitable[Dict]]
+) -> Dict:
+    """
+    Resolve each distinct item once, with at most PREDICTION_BATCH_CONCURRENCY
+    in flight, and return one ``{"result", "error"}`` entry per input item in
+    input order. A failing item does not fail the rest of the batch.
+    """
+    semaphore = asyncio.Semaphore(settings.PREDICTION_BATCH_CONCURRENCY)
+    distinct: Dict[Hashable, Any] = {}
+    for item in items:
+        distinct.setdefault(key(item), item)
+
+    async def resolve_one(item):
+        async with semaphore:
+            try:
+                return {"result": await resolve(item), "error": None}
+            except Exception as e:
+                return {"result": None, "error": str(e)}
+
+    keys = list(distinct)
+    outcomes = dict(zip(keys, await asyncio.gather(*(resolve_one(distinct[k]) for k in keys))))
+    return {"results": [outcomes[key(item)] for item in items]}
+
+async def resolve_weight(user_id: Optional[str]) -> Optional[float]:
+    """The caller's stored body weight, if signed in and recorded"""
+    if not user_id:
+        return None
+    user = await async_firestore_service.get_user_by_id(user_id)
+    return (user or {}).get("weight")
+
 class NutritionPredictionRequest(BaseModel):
     query: str
 
 class WorkoutPredictionRequest(BaseModel):
     activity: str
     duration: int
+    weight_kg: Optional[float] = Field(default=None, gt=0)
+
+class NutritionBatchRequest(BaseModel):
+    items: List[NutritionPredictionRequest] = Field(min_length=1, max_length=settings.PREDICTION_BATCH_MAX_ITEMS)
+
+class WorkoutBatchRequest(BaseModel):
+    items: List[WorkoutPredictionRequest] = Field(min_length=1, max_length=settings.PREDICTION_BATCH_MAX_ITEMS)
 
 @router.post("/nutrition")
-async def predict_nutrition(request: NutritionPredictionRequest):
+async def predict_nutrition(request: NutritionPredictionRequest, http_request: Request):
     """Predict nutritional information for a food item"""
     try:
-        result = await ai_service.predict_nutrition(request.query)
+        result = await run_until_disconnect(http_request, ai_service.predict_nutrition(request.query))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         if "GOOGLE_API_KEY" in str(e):
             raise HTTPException(
@@ -26,10 +96,16 @@ async def predict_nutrition(request: NutritionPredictionRequest):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 @router.post("/workout")
-async def predict_workout(request: WorkoutPredictionRequest):
-    """Predict calories burned for a workout"""
+async def predict_workout(
+    request: WorkoutPredictionRequest,
+    user_id: Optional[str] = Depends(get_optional_user_id)
+):
+    """Predict calories burned for a workout, using the caller's stored weight when known"""
     try:
-        result = await ai_service.predict_workout(request.activity, request.duration)
+        weight_kg = request.weight_kg
+        if weight_kg is None:
+            weight_kg = await resolve_weight(user_id)
+        result = await ai_service.predict_workout(request.activity, request.duration, weight_kg)
         return result
     except Exception as e:
         if "GOOGLE_API_KEY" in str(e):
@@ -38,3 +114,31 @@ async def predict_workout(request: WorkoutPredictionRequest):
                 detail="Google API Key missing. Please add GOOGLE_API_KEY to backend/.env"
             )
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.post("/nutrition/batch")
+async def predict_nutrition_batch(request: NutritionBatchRequest, http_request: Request):
+    """Predict nutritional information for several food items in one call"""
+    return await run_until_disconnect(http_request, run_batch(
+        request.items,
+        key=lambda item: normalize_query(item.query),
+        resolve=lambda item: ai_service.predict_nutrition(item.query)
+    ))
+
+@router.post("/workout/batch")
+async def predict_workout_batch(
+    request: WorkoutBatchRequest,
+    user_id: Optional[str] = Depends(get_optional_user_id)
+):
+    """Predict calories burned for several workouts in one call"""
+    stored_weight_kg = None
+    if any(item.weight_kg is None for item in request.items):
+        stored_weight_kg = await resolve_weight(user_id)
+
+    def weight_of(item):
+        return item.weight_kg if item.weight_kg is not None else stored_weight_kg
+
+    return await run_batch(
+        request.items,
+        key=lambda item: (normalize_activity(item.activity), item.duration, weight_of(item)),
+        resolve=lambda item: ai_service.predict_workout(item.activity, item.duration, weight_of(item))
+    )
@@ -1,26 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from typing import List, Optional
 from datetime import datetime
 from app.schemas.schemas import WorkoutCreate, WorkoutResponse
-from app.api.routes.auth import oauth2_scheme
-from app.core.security import decode_access_token
-from app.services.firestore_service import firestore_service
+from app.api.deps import get_current_user_id
+from app.services.firestore_service import next_cursor
+from app.services.async_firestore_service import async_firestore_service
+from app.services.timeseries_store import timeseries_store
+from app.services.insights_worker import insights_worker
 
 router = APIRouter()
 
-def get_current_user_id(token: str = Depends(oauth2_scheme)) -> str:
-    """Get current user ID from token"""
-    payload = decode_access_token(token)
-    if payload is None:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    
-    username = payload.get("sub")
-    user = firestore_service.get_user_by_username(username)
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
-    
-    return user["id"]
-
 @router.post("", response_model=WorkoutResponse, status_code=status.HTTP_201_CREATED)
 async def create_workout(
     workout: WorkoutCreate,
@@ -36,42 +26,51 @@ async def create_workout(
         "log_date": workout.log_date or datetime.utcnow()
     }
     
-    workout_id = firestore_service.create_workout(user_id, workout_data)
-    
-    # Add exercises
-    if workout.exercises:
-        for exercise in workout.exercises:
-            exercise_data = {
-                "name": exercise.name,
-                "sets": exercise.sets,
-                "reps": exercise.reps,
-                "weight": exercise.weight,
-                "distance": exercise.distance
-            }
-            firestore_service.create_exercise(user_id, workout_id, exercise_data)
+    exercises = [
+        {
+            "name": exercise.name,
+            "sets": exercise.sets,
+            "reps": exercise.reps,
+            "weight": exercise.weight,
+            "distance": exercise.distance
+        }
+        for exercise in workout.exercises
+    ]
     
-    # Get the created workout with exercises
-    created_workout = firestore_service.get_workout_by_id(user_id, workout_id)
-    created_workout["exercises"] = firestore_service.get_workout_exercises(user_id, workout_id)
+    # Workout and exercises are committed together in one batch
+    created_workout = await async_firestore_service.create_workout_with_exercises(user_id, workout_data, exercises)
+    timeseries_store.add_workout(user_id, created_workout)
+    insights_worker.schedule(user_id)
     
     return created_workout
 
 @router.get("", response_model=List[WorkoutResponse])
 async def get_workouts(
-    skip: int = 0,
+    response: Response,
     limit: int = 100,
+    cursor: Optional[str] = None,
     user_id: str = Depends(get_current_user_id)
 ):
-    """Get all workouts for current user"""
-    workouts = firestore_service.get_user_workouts(user_id, limit=limit)
+    """
+    Get workouts for current user, newest first.
+    When more pages exist the X-Next-Cursor response header holds the
+    cursor to pass back for the next one.
+    """
+    try:
+        workouts = await async_firestore_service.get_user_workouts(user_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    # Add exercises to each workout
+    # Load exercises for the whole page at once instead of one query per workout
+    exercises_by_workout = await async_firestore_service.get_exercises_for_workouts(
+        user_id, [workout["id"] for workout in workouts]
+    )
     for workout in workouts:
-        workout["exercises"] = firestore_service.get_workout_exercises(user_id, workout["id"])
+        workout["exercises"] = exercises_by_workout.get(workout["id"], [])
     
-    # Apply skip if needed (Firestore returns from start, we slice in Python)
-    if skip > 0:
-        workouts = workouts[skip:]
+    cursor_for_next_page = next_cursor(workouts, limit)
+    if cursor_for_next_page:
+        response.headers["X-Next-Cursor"] = cursor_for_next_page
     
     return workouts
 
@@ -81,13 +80,16 @@ async def get_workout(
     user_id: str = Depends(get_current_user_id)
 ):
     """Get a specific workout"""
-    workout = firestore_service.get_workout_by_id(user_id, workout_id)
+    # Workout and its exercises are independent reads
+    workout, exercises = await asyncio.gather(
+        async_firestore_service.get_workout_by_id(user_id, workout_id),
+        async_firestore_service.get_workout_exercises(user_id, workout_id)
+    )
     
     if not workout:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workout not found")
     
-    # Add exercises
-    workout["exercises"] = firestore_service.get_workout_exercises(user_id, workout_id)
+    workout["exercises"] = exercises
     
     return workout
 
@@ -97,11 +99,13 @@ async def delete_workout(
     user_id: str = Depends(get_current_user_id)
 ):
     """Delete a workout"""
-    workout = firestore_service.get_workout_by_id(user_id, workout_id)
+    workout = await async_firestore_service.get_workout_by_id(user_id, workout_id)
     
     if not workout:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Workout not found")
     
-    firestore_service.delete_workout(user_id, workout_id)
+    if await async_firestore_service.delete_workout(user_id, workout_id, workout):
+        timeseries_store.remove_workout(user_id, workout_id)
+        insights_worker.schedule(user_id)
     
     return None
@@ -9,12 +9,30 @@ class Settings(BaseSettings):
     
     # Firebase
     FIREBASE_CREDENTIALS_PATH: Optional[str] = None
+    # Max parallel Firestore queries when loading subcollections in bulk
+    FIRESTORE_FANOUT_CONCURRENCY: int = 16
+    # Max delete batches (of up to 500 documents) committed at once
+    DELETE_COMMIT_CONCURRENCY: int = 8
     
     # Security
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Password hashing (argon2). Hashes made with other parameters are
+    # upgraded on the user's next successful login.
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 102400  # KiB
+    ARGON2_PARALLELISM: int = 8
+    # Max hash/verify operations running at once; extra requests wait in line
+    PASSWORD_HASH_CONCURRENCY: int = 4
+
+    # Token -> principal cache used by the auth dependency. Each worker
+    # re-reads the user document at most this often per token, so an account
+    # deleted through another worker keeps authenticating for up to this long
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+
     # CORS - Make it optional with a sensible default
     BACKEND_CORS_ORIGINS: Union[List[str], str] = []
 
@@ -54,12 +72,86 @@ class Settings(BaseSettings):
         
         return []
 
-    # ML Models
+    # ML Models: fitted per-user models are persisted under MODEL_PATH
+    # (set it empty to keep them in memory only)
     MODEL_PATH: str = "./app/ml/models/"
+    MODEL_CACHE_MEMORY_BYTES: int = 4 * 1024 * 1024
+
+    # Pre-load numpy (and Gemini, if configured) in the background
+    # once the server is up, instead of on the first analytics/ML/AI request
+    WARMUP_ON_STARTUP: bool = False
+
+    # Serve GET /metrics (cache, pool and worker counters). It has no auth,
+    # so only enable it where the port is not reachable from the internet.
+    METRICS_ENABLED: bool = False
+
+    # Per-user columnar workout/nutrition history used by analytics and ML
+    TIMESERIES_CACHE_BYTES: int = 64 * 1024 * 1024
+    TIMESERIES_MAX_ROWS: int = 10000
+
+    # Rendered analytics/insights responses, keyed by their ETag. The window
+    # is how long a "last N days" result may be reused without any write.
+    RESPONSE_CACHE_BYTES: int = 16 * 1024 * 1024
+    RESPONSE_CACHE_WINDOW_SECONDS: int = 300
+
+    # Background refresh of each user's stored workout insights: worker
+    # count, quiet period after a user's last workout write before
+    # recomputing, and the age after which stored insights are recomputed
+    # inline (the consistency score moves with time, not only with writes)
+    INSIGHTS_WORKERS: int = 2
+    INSIGHTS_DEBOUNCE_SECONDS: float = 5.0
+    INSIGHTS_MAX_AGE_SECONDS: int = 900
+
+    # Background jobs for expensive analytics (202 + GET /jobs/{id}).
+    # Finished jobs and their results are kept for JOB_TTL_SECONDS.
+    JOB_WORKERS: int = 4
+    JOB_TTL_SECONDS: int = 600
+    JOB_MAX_STORED: int = 10000
+    JOB_LONG_POLL_MAX_SECONDS: float = 30.0
+    # /analytics/progress windows longer than this always run as a job
+    ANALYTICS_SYNC_MAX_DAYS: int = 90
     
     # AI
     GOOGLE_API_KEY: Optional[str] = None
     CALORIENINJAS_API_KEY: Optional[str] = None
+    CALORIENINJAS_API_URL: str = "https://api.calorieninjas.com/v1/nutrition"
+
+    # Nutrition lookup cache: in-process LRU + persistent SQLite tier
+    NUTRITION_CACHE_MEMORY_BYTES: int = 8 * 1024 * 1024
+    # Set to an empty string to disable the on-disk tier
+    NUTRITION_CACHE_PATH: Optional[str] = "./nutrition_cache.sqlite3"
+
+    # Bundled offline food database, tried before CalorieNinjas.
+    # The index is (re)built from the CSV on startup when missing or stale.
+    FOOD_DATABASE_CSV: Optional[str] = "./data/foods.csv"
+    FOOD_INDEX_PATH: Optional[str] = "./data/foods.idx"
+    FOOD_INDEX_MIN_SCORE: float = 0.7
+
+    # Activity -> MET table for workout calorie estimates, and the body
+    # weight assumed when the user has not recorded one
+    ACTIVITY_TABLE_CSV: Optional[str] = "./data/activities.csv"
+    DEFAULT_MET: float = 5.0
+    DEFAULT_WEIGHT_KG: float = 70.0
+
+    # Batch prediction endpoints: items per request, and how many distinct
+    # items of one batch are resolved at the same time
+    PREDICTION_BATCH_MAX_ITEMS: int = 100
+    PREDICTION_BATCH_CONCURRENCY: int = 8
+
+    # POST /import: rows per upload, 500-write batches committed at once,
+    # and how many rejected rows are listed in the report
+    IMPORT_MAX_ROWS: int = 100000
+    IMPORT_BATCH_CONCURRENCY: int = 4
+    IMPORT_MAX_ERRORS: int = 100
+
+    # Shared outbound HTTP client (one pool for the app's lifetime)
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 10.0
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    # Requires the h2 package (pip install "httpx[http2]")
+    HTTP2_ENABLED: bool = False
     
     class Config:
         env_file = ".env"
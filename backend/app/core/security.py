@@ -1,5 +1,7 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -7,7 +9,10 @@ from app.core.config import settings
 # Configure password hashing with argon2 (more secure and no length limits)
 pwd_context = CryptContext(
     schemes=["argon2"],
-    deprecated="auto"
+    deprecated="auto",
+    argon2__time_cost=settings.ARGON2_TIME_COST,
+    argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+    argon2__parallelism=settings.ARGON2_PARALLELISM
 )
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -18,6 +23,62 @@ def get_password_hash(password: str) -> str:
     """Hash a password using argon2"""
     return pwd_context.hash(password)
 
+class PasswordHasher:
+    """
+    Runs argon2 on a dedicated, bounded thread pool so async handlers don't
+    block the event loop. At most ``concurrency`` operations run at once;
+    the rest wait their turn and are counted in ``stats()["queued"]``.
+    """
+    
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="password-hash")
+        self._slots = asyncio.Semaphore(concurrency)
+        self._queued = 0
+        self._active = 0
+        self._max_queued = 0
+        self._completed = 0
+    
+    async def _run(self, func, *args):
+        self._queued += 1
+        self._max_queued = max(self._max_queued, self._queued)
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+        
+        self._active += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self._active -= 1
+            self._completed += 1
+            self._slots.release()
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password off the event loop"""
+        return await self._run(pwd_context.hash, password)
+    
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password off the event loop.
+        Returns ``(verified, new_hash)``; ``new_hash`` is set when the stored
+        hash uses outdated argon2 parameters and should be replaced.
+        """
+        return await self._run(pwd_context.verify_and_update, plain_password, hashed_password)
+    
+    def stats(self) -> Dict[str, int]:
+        """Queue-depth and throughput counters for monitoring"""
+        return {
+            "concurrency": self.concurrency,
+            "active": self._active,
+            "queued": self._queued,
+            "max_queued": self._max_queued,
+            "completed": self._completed
+        }
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_CONCURRENCY)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
     to_encode = data.copy()
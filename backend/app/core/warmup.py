@@ -0,0 +1,24 @@
+import importlib
+import time
+from typing import Dict
+
+# Heavy modules kept off the import path of app.main; the analytics, ML and
+# AI routes import them on first use. scripts/check_import_time.py fails if
+# any of them is imported at startup again.
+HEAVY_MODULES = (
+    "numpy",
+    "joblib",
+    "app.services.forecasting",
+    "app.services.timeseries",
+    "app.services.insights",
+)
+
+
+def warm_up() -> Dict[str, float]:
+    """Import the deferred heavy modules; returns seconds spent on each"""
+    timings = {}
+    for name in HEAVY_MODULES:
+        started = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = round(time.perf_counter() - started, 3)
+    return timings
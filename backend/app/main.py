@@ -1,4 +1,5 @@
 # backend/app/main.py
+import asyncio
 import logging
 import json
 from typing import List
@@ -7,8 +8,17 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.api.routes import auth, nutrition, workouts, analytics, ml_predictions as ml, prediction
+from app.api.routes import auth, nutrition, workouts, analytics, ml_predictions as ml, prediction, jobs, imports, export
 from app.core.firebase_config import initialize_firebase
+from app.core.security import password_hasher
+from app.core.warmup import warm_up
+from app.services.ai_service import ai_service
+from app.api.deps import principal_cache
+from app.services.model_store import model_store
+from app.services.timeseries_store import timeseries_store
+from app.services.response_cache import response_cache
+from app.services.insights_worker import insights_worker
+from app.services.jobs import job_queue
 
 
 # ----------------- Logging -----------------
@@ -35,6 +45,44 @@ async def startup_event():
     except Exception as exc:
         logger.exception("Error initializing Firebase: %s", exc)
         raise
+    
+    await ai_service.start()
+    await insights_worker.start()
+    await job_queue.start()
+    
+    if settings.WARMUP_ON_STARTUP:
+        global _warmup_task
+        _warmup_task = asyncio.create_task(_warm_up_in_background())
+
+
+# Held so the background warm-up task is not garbage collected mid-run
+_warmup_task = None
+
+
+async def _warm_up_in_background():
+    """Import the lazily loaded heavy modules off the event loop"""
+    def load():
+        timings = warm_up()
+        # Configures Gemini when GOOGLE_API_KEY is set
+        ai_service.model
+        # Opens (or builds) the offline food index and compiles the MET table
+        ai_service.food_index
+        ai_service.met_matcher
+        return timings
+    
+    try:
+        timings = await asyncio.to_thread(load)
+        logger.info("Warm-up finished: %s", timings)
+    except Exception:
+        logger.exception("Warm-up failed; modules will load on first use instead")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled outbound connections and stop background workers"""
+    await ai_service.aclose()
+    await insights_worker.stop()
+    await job_queue.stop()
 # -------------------------------------------------------
 
 
@@ -76,6 +124,7 @@ if _origins:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
 else:
     logger.warning(
@@ -90,6 +139,7 @@ else:
         allow_credentials=False,  # Can't use credentials with allow_origins=["*"]
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor"],
     )
 
 
@@ -100,16 +150,18 @@ app.include_router(workouts.router, prefix=f"{settings.API_V1_PREFIX}/workouts",
 app.include_router(analytics.router, prefix=f"{settings.API_V1_PREFIX}/analytics", tags=["analytics"])
 app.include_router(ml.router, prefix=f"{settings.API_V1_PREFIX}/ml", tags=["ml"])
 app.include_router(prediction.router, prefix=f"{settings.API_V1_PREFIX}/prediction", tags=["prediction"])
+app.include_router(jobs.router, prefix=f"{settings.API_V1_PREFIX}/jobs", tags=["jobs"])
+app.include_router(imports.router, prefix=f"{settings.API_V1_PREFIX}/import", tags=["import"])
+app.include_router(export.router, prefix=f"{settings.API_V1_PREFIX}/export", tags=["export"])
 
 
-# Print mounted routes for debugging (check this in logs after startup)
-for route in app.routes:
-    try:
-        route_path = getattr(route, "path", None)
-        route_methods = getattr(route, "methods", None)
-        logger.info(f"Route: path={route_path} methods={route_methods} name={route.name}")
-    except Exception:
-        logger.exception("Error printing route info for %r", route)
+# Print mounted routes for debugging (enable DEBUG logging to see them)
+if logger.isEnabledFor(logging.DEBUG):
+    for route in app.routes:
+        logger.debug(
+            "Route: path=%s methods=%s name=%s",
+            getattr(route, "path", None), getattr(route, "methods", None), getattr(route, "name", None)
+        )
 
 
 @app.get("/")
@@ -124,3 +176,24 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+async def metrics():
+    """In-process cache and worker-pool counters"""
+    return {
+        "principal_cache": principal_cache.stats(),
+        "password_hashing": password_hasher.stats(),
+        "calorieninjas_http": ai_service.http_stats(),
+        "nutrition_cache": ai_service.nutrition_cache.stats(),
+        "food_index": ai_service.food_index_stats(),
+        "forecast_models": model_store.stats(),
+        "timeseries": timeseries_store.stats(),
+        "responses": response_cache.stats(),
+        "insights": insights_worker.stats(),
+        "jobs": job_queue.stats()
+    }
+
+
+# Internal counters; only served when an operator turns them on
+if settings.METRICS_ENABLED:
+    app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
 # User Schemas
@@ -114,3 +114,16 @@ class GoalResponse(GoalBase):
     
     class Config:
         from_attributes = True
+
+# Background Job Schemas
+class JobResponse(BaseModel):
+    id: str
+    status: str
+    endpoint: str
+    params: Dict[str, Any]
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: Optional[Dict[str, Any]] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
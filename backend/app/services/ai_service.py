@@ -1,35 +1,194 @@
-import google.generativeai as genai
+import asyncio
+import logging
 import os
 import json
+import threading
+import time
 import httpx
+from typing import Optional
 from dotenv import load_dotenv
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.services.nutrition_cache import NutritionCache, normalize_query
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Marks a lazily loaded attribute that has not been loaded yet
+_UNLOADED = object()
+
 class AIService:
     def __init__(self):
         self.api_key = os.getenv("GOOGLE_API_KEY")
         self.calorieninjas_api_key = os.getenv("CALORIENINJAS_API_KEY")
+        self.calorieninjas_api_url = settings.CALORIENINJAS_API_URL
+        
+        # Gemini is configured on first use; importing the SDK is slow
+        self._model = None
+        
+        self.nutrition_cache = NutritionCache(
+            memory_bytes=settings.NUTRITION_CACHE_MEMORY_BYTES,
+            path=settings.NUTRITION_CACHE_PATH
+        )
         
-        if self.api_key:
+        # The food index and MET table are opened (or built) on first use,
+        # not when this module is imported
+        self._food_index = _UNLOADED
+        self._met_matcher = _UNLOADED
+        self._load_lock = threading.Lock()
+        
+        # Concurrent lookups of the same food share one upstream request
+        self._inflight = SingleFlight()
+        
+        # Long-lived pooled client, opened and closed with the app lifespan
+        self._client = None
+        self._http_requests = 0
+        self._http_connections = 0
+        self._http_latency_total = 0.0
+
+    @property
+    def model(self):
+        """Gemini model, or None when GOOGLE_API_KEY is not set"""
+        if self._model is None and self.api_key:
+            import google.generativeai as genai
             genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
-        else:
-            self.model = None
+            self._model = genai.GenerativeModel('gemini-1.5-flash')
+        return self._model
 
-    async def predict_nutrition(self, query: str):
+    @property
+    def food_index(self):
+        """Bundled offline food index, or None when unconfigured or unusable"""
+        if self._food_index is _UNLOADED:
+            with self._load_lock:
+                if self._food_index is _UNLOADED:
+                    self._food_index = self._open_food_index()
+        return self._food_index
+
+    @food_index.setter
+    def food_index(self, index):
+        self._food_index = index
+
+    def _open_food_index(self):
+        if not settings.FOOD_INDEX_PATH:
+            return None
+        from app.services.food_index import FoodIndex
+        try:
+            return FoodIndex.open(
+                settings.FOOD_INDEX_PATH,
+                source_csv=settings.FOOD_DATABASE_CSV,
+                min_score=settings.FOOD_INDEX_MIN_SCORE
+            )
+        except (OSError, ValueError) as e:
+            logger.warning("Offline food index unavailable: %s", e)
+            return None
+
+    @property
+    def met_matcher(self):
+        """Activity -> MET matcher, compiled from the activity table on first use"""
+        if self._met_matcher is _UNLOADED:
+            with self._load_lock:
+                if self._met_matcher is _UNLOADED:
+                    from app.services.met_matcher import MetMatcher
+                    self._met_matcher = MetMatcher.from_csv(settings.ACTIVITY_TABLE_CSV)
+        return self._met_matcher
+
+    @met_matcher.setter
+    def met_matcher(self, matcher):
+        self._met_matcher = matcher
+
+    def food_index_stats(self) -> Optional[dict]:
+        """Offline index counters, without opening the index just to report them"""
+        if self._food_index is _UNLOADED or self._food_index is None:
+            return None
+        return self._food_index.stats()
+
+    async def start(self):
+        """Open the shared HTTP client (called on application startup)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=settings.HTTP2_ENABLED,
+                timeout=httpx.Timeout(
+                    settings.HTTP_READ_TIMEOUT,
+                    connect=settings.HTTP_CONNECT_TIMEOUT
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+                )
+            )
+
+    async def aclose(self):
+        """Close pooled connections (called on application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _trace(self, event_name: str, info: dict):
+        # Fired by httpcore; a completed TCP connect means the pool had no idle connection
+        if event_name == "connection.connect_tcp.complete":
+            self._http_connections += 1
+
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        """GET through the pooled client, recording latency and connection reuse"""
+        if self._client is None:
+            await self.start()
+        
+        started = time.perf_counter()
+        try:
+            return await self._client.get(url, extensions={"trace": self._trace}, **kwargs)
+        finally:
+            self._http_requests += 1
+            self._http_latency_total += time.perf_counter() - started
+
+    def http_stats(self) -> dict:
+        """Latency and connection-reuse counters for the outbound client"""
+        requests = self._http_requests
+        return {
+            "requests": requests,
+            "connections_opened": self._http_connections,
+            "connections_reused": max(requests - self._http_connections, 0),
+            "avg_latency_ms": round(self._http_latency_total / requests * 1000, 2) if requests else 0.0,
+            "http2": settings.HTTP2_ENABLED,
+            "coalescing": self._inflight.stats()
+        }
+
+    async def _fetch_items(self, query: str) -> list:
+        """Ask CalorieNinjas for the items matching a single food"""
         if not self.calorieninjas_api_key:
             raise Exception("CALORIENINJAS_API_KEY not found in .env file")
 
-        api_url = 'https://api.calorieninjas.com/v1/nutrition?query=' + query
-        async with httpx.AsyncClient() as client:
-            response = await client.get(api_url, headers={'X-Api-Key': self.calorieninjas_api_key})
+        response = await self._get(
+            self.calorieninjas_api_url,
+            params={'query': query},
+            headers={'X-Api-Key': self.calorieninjas_api_key}
+        )
         
         if response.status_code != 200:
             raise Exception(f"Error from CalorieNinjas API: {response.status_code} - {response.text}")
 
-        data = response.json()
-        items = data.get('items', [])
+        return response.json().get('items', [])
+
+    async def predict_nutrition(self, query: str):
+        key = normalize_query(query)
+        # The cache may read or write its SQLite file, so it runs off the loop
+        # unless the answer is already in memory
+        items = self.nutrition_cache.cached(key)
+        if items is None:
+            items = await asyncio.to_thread(self.nutrition_cache.lookup, key)
+        if items is None:
+            # Fast path: bundled food database, no network call. Queries with
+            # a quantity ("2 eggs") never match it and go upstream.
+            food_index = self.food_index if self._food_index is not _UNLOADED \
+                else await asyncio.to_thread(lambda: self.food_index)
+            local = food_index.lookup(key) if food_index else None
+            if local is not None:
+                items = [local]
+            else:
+                items = await self._inflight.do(key, lambda: self._fetch_items(key))
+                if items:
+                    await asyncio.to_thread(self.nutrition_cache.set, key, items)
         
         if not items:
             raise Exception("No food items found for this query")
@@ -59,42 +218,15 @@ class AIService:
             "serving_size": ", ".join(serving_size_parts)
         }
 
-    async def predict_workout(self, activity: str, duration: int):
+    async def predict_workout(self, activity: str, duration: int, weight_kg: Optional[float] = None):
         # Local MET calculation
         # Formula: Calories = MET * Weight(kg) * Duration(hours)
-        # Default weight: 70kg
-        
-        met_values = {
-            "running": 9.8,
-            "jogging": 7.0,
-            "cycling": 7.5,
-            "biking": 7.5,
-            "swimming": 8.0,
-            "walking": 3.8,
-            "strength": 5.0,
-            "lifting": 5.0,
-            "gym": 5.0,
-            "yoga": 2.5,
-            "pilates": 3.0,
-            "hiit": 8.0,
-            "cardio": 7.0,
-            "basketball": 6.5,
-            "soccer": 7.0,
-            "tennis": 7.0,
-            "hiking": 6.0,
-            "dancing": 5.0
-        }
+        # Weight defaults to settings.DEFAULT_WEIGHT_KG when unknown
         
-        activity_lower = activity.lower()
-        met = 5.0 # Default to moderate activity if not found
+        match = self.met_matcher.match(activity)
+        met = match[1] if match else settings.DEFAULT_MET
         
-        # Simple keyword matching
-        for key, value in met_values.items():
-            if key in activity_lower:
-                met = value
-                break
-                
-        weight_kg = 70
+        weight_kg = weight_kg or settings.DEFAULT_WEIGHT_KG
         duration_hours = duration / 60.0
         calories = met * weight_kg * duration_hours
         
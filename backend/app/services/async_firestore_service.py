@@ -0,0 +1,34 @@
+import asyncio
+import functools
+from app.services.firestore_service import FirestoreService, firestore_service
+
+
+class AsyncFirestoreService:
+    """
+    Awaitable counterpart of FirestoreService for use in ``async def`` routes.
+
+    Every public FirestoreService method is exposed under the same name as a
+    coroutine that runs the blocking Firestore call on a worker thread, so a
+    slow query no longer stalls the event loop. Independent reads can be
+    awaited together with ``asyncio.gather``.
+    """
+
+    def __init__(self, service: FirestoreService):
+        self._service = service
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._service, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(attr, *args, **kwargs)
+
+        # Cache the wrapper so later lookups skip __getattr__
+        setattr(self, name, call)
+        return call
+
+
+# Singleton instance
+async_firestore_service = AsyncFirestoreService(firestore_service)
@@ -0,0 +1,267 @@
+"""
+Typed, columnar export of a user's history as Parquet or an Arrow IPC stream.
+
+Workouts and nutrition logs go through the same columnar conversion the
+analytics and ML routes use (app.services.timeseries): dates become UTC
+timestamps, amounts float64 and workout / meal types dictionary-encoded
+categoricals. Exercises are read per page of workouts. Documents are read
+from Firestore in row groups of ``ROW_GROUP_ROWS``; each group is encoded,
+written and flushed to the client before the next one is read, so memory
+stays bounded by one row group. Only the requested columns are read from
+Firestore (a projection query) and written.
+
+Requires the pyarrow package (pinned in requirements.txt); importing this
+module raises ImportError when it is missing or cannot be loaded.
+"""
+import io
+from collections import defaultdict
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from app.services.firestore_service import (
+    FirestoreService,
+    MAX_BATCH_SIZE,
+    NUTRITION_LOGS_COLLECTION,
+    WORKOUTS_COLLECTION,
+)
+from app.services.timeseries import NutritionSeries, WorkoutSeries
+
+# format -> media type
+COLUMNAR_FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+ROW_GROUP_ROWS = 10000
+
+_TIMESTAMP = pa.timestamp("ms", tz="UTC")
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+
+class _Dictionary:
+    """Categorical values for one column, kept stable across the row groups of an export"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        value = str(value or "unknown")
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def encode(self, names: List[str], codes: np.ndarray) -> pa.DictionaryArray:
+        """Re-code a series' categorical codes (indexes into ``names``) to this dictionary"""
+        mapping = np.array([self.code(name) for name in names], dtype=np.int32)
+        return self.array(mapping[codes] if len(mapping) else codes.astype(np.int32))
+
+    def array(self, codes) -> pa.DictionaryArray:
+        return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), pa.array(self.values, type=pa.string()))
+
+
+def _timestamps(seconds: np.ndarray) -> pa.Array:
+    missing = np.isnan(seconds)
+    millis = np.where(missing, 0, np.round(seconds * 1000)).astype(np.int64)
+    return pa.array(millis, type=_TIMESTAMP, mask=missing)
+
+
+def _values(documents: List[Dict], field: str, arrow_type: pa.DataType) -> pa.Array:
+    return pa.array([document.get(field) for document in documents], type=arrow_type)
+
+
+def _workout_columns(documents: List[Dict], dictionaries: Dict[str, _Dictionary]) -> Dict[str, pa.Array]:
+    series = WorkoutSeries.from_documents(documents)
+    columns = series.columns()
+    return {
+        "id": pa.array(series.ids, type=pa.string()),
+        "log_date": _timestamps(columns["log_date"]),
+        "created_at": _timestamps(columns["created_at"]),
+        "name": _values(documents, "name", pa.string()),
+        "workout_type": dictionaries["workout_type"].encode(series.categories["workout_type"], columns["workout_type"]),
+        "duration": pa.array(columns["duration"]),
+        "calories_burned": pa.array(columns["calories_burned"]),
+        "notes": _values(documents, "notes", pa.string()),
+    }
+
+
+def _nutrition_columns(documents: List[Dict], dictionaries: Dict[str, _Dictionary]) -> Dict[str, pa.Array]:
+    series = NutritionSeries.from_documents(documents)
+    columns = series.columns()
+    return {
+        "id": pa.array(series.ids, type=pa.string()),
+        "log_date": _timestamps(columns["log_date"]),
+        "created_at": _timestamps(columns["created_at"]),
+        "meal_type": dictionaries["meal_type"].encode(series.categories["meal_type"], columns["meal_type"]),
+        "food_name": _values(documents, "food_name", pa.string()),
+        "calories": pa.array(columns["calories"]),
+        "protein": pa.array(columns["protein"]),
+        "carbs": pa.array(columns["carbs"]),
+        "fats": pa.array(columns["fats"]),
+        "serving_size": _values(documents, "serving_size", pa.string()),
+    }
+
+
+def _exercise_columns(documents: List[Dict], dictionaries: Dict[str, _Dictionary]) -> Dict[str, pa.Array]:
+    names = dictionaries["name"]
+    return {
+        "id": _values(documents, "id", pa.string()),
+        "workout_id": _values(documents, "workout_id", pa.string()),
+        "name": names.array([names.code(document.get("name")) for document in documents]),
+        "sets": _values(documents, "sets", pa.int32()),
+        "reps": _values(documents, "reps", pa.int32()),
+        "weight": _values(documents, "weight", pa.float64()),
+        "distance": _values(documents, "distance", pa.float64()),
+        "created_at": _values(documents, "created_at", _TIMESTAMP),
+    }
+
+
+def _iter_exercises(service: FirestoreService, user_id: str, fields: List[str]) -> Iterator[Dict]:
+    # Only the workout ids are read, a page of workouts at a time
+    workouts = service.iter_user_documents(user_id, WORKOUTS_COLLECTION, fields=[])
+    while True:
+        page = [workout["id"] for workout in islice(workouts, MAX_BATCH_SIZE)]
+        if not page:
+            return
+        for exercises in service.get_exercises_for_workouts(user_id, page).values():
+            yield from exercises
+
+
+class _Table:
+    def __init__(
+        self,
+        schema: pa.Schema,
+        documents: Callable[[FirestoreService, str, List[str]], Iterator[Dict]],
+        build: Callable[[List[Dict], Dict[str, _Dictionary]], Dict[str, pa.Array]]
+    ):
+        self.schema = schema
+        self.documents = documents
+        self.build = build
+
+
+TABLES = {
+    "workouts": _Table(
+        pa.schema([
+            ("id", pa.string()),
+            ("log_date", _TIMESTAMP),
+            ("created_at", _TIMESTAMP),
+            ("name", pa.string()),
+            ("workout_type", _CATEGORY),
+            ("duration", pa.float64()),
+            ("calories_burned", pa.float64()),
+            ("notes", pa.string()),
+        ]),
+        lambda service, user_id, fields: service.iter_user_documents(user_id, WORKOUTS_COLLECTION, fields),
+        _workout_columns
+    ),
+    "exercises": _Table(
+        pa.schema([
+            ("id", pa.string()),
+            ("workout_id", pa.string()),
+            ("name", _CATEGORY),
+            ("sets", pa.int32()),
+            ("reps", pa.int32()),
+            ("weight", pa.float64()),
+            ("distance", pa.float64()),
+            ("created_at", _TIMESTAMP),
+        ]),
+        _iter_exercises,
+        _exercise_columns
+    ),
+    "nutrition_logs": _Table(
+        pa.schema([
+            ("id", pa.string()),
+            ("log_date", _TIMESTAMP),
+            ("created_at", _TIMESTAMP),
+            ("meal_type", _CATEGORY),
+            ("food_name", pa.string()),
+            ("calories", pa.float64()),
+            ("protein", pa.float64()),
+            ("carbs", pa.float64()),
+            ("fats", pa.float64()),
+            ("serving_size", pa.string()),
+        ]),
+        lambda service, user_id, fields: service.iter_user_documents(user_id, NUTRITION_LOGS_COLLECTION, fields),
+        _nutrition_columns
+    ),
+}
+
+
+def select_columns(table: str, columns: Optional[str]) -> List[str]:
+    """Validate a comma-separated projection (all columns if empty); raises ValueError"""
+    names = TABLES[table].schema.names
+    if not columns:
+        return list(names)
+    selected = [column.strip() for column in columns.split(",") if column.strip()]
+    unknown = [column for column in selected if column not in names]
+    if unknown or not selected:
+        raise ValueError(f"Unknown columns for {table}: {', '.join(unknown) or columns}. Available: {', '.join(names)}")
+    return list(dict.fromkeys(selected))
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file object whose contents are handed out chunk by chunk"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_table(
+    service: FirestoreService,
+    user_id: str,
+    table: str,
+    export_format: str,
+    columns: List[str]
+) -> Iterator[bytes]:
+    """Encoded Parquet file or Arrow IPC stream of one table, one row group at a time"""
+    spec = TABLES[table]
+    schema = pa.schema([spec.schema.field(column) for column in columns])
+    # Firestore projection: just the fields behind the requested columns
+    fields = [column for column in columns if column != "id"]
+    dictionaries: Dict[str, _Dictionary] = defaultdict(_Dictionary)
+
+    sink = _Sink()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        # Later row groups only send the categorical values they add
+        writer = pa.ipc.new_stream(sink, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True))
+
+    def write(documents: List[Dict]) -> bytes:
+        arrays = spec.build(documents, dictionaries)
+        writer.write_batch(pa.record_batch([arrays[column] for column in columns], schema=schema))
+        return sink.drain()
+
+    documents = []
+    for document in spec.documents(service, user_id, fields):
+        documents.append(document)
+        if len(documents) == ROW_GROUP_ROWS:
+            yield write(documents)
+            documents = []
+    if documents:
+        yield write(documents)
+
+    writer.close()
+    yield sink.drain()
@@ -0,0 +1,106 @@
+"""
+Streaming export of everything a user has logged: workouts (with their
+exercises), nutrition logs and goals.
+
+``stream_export`` is a generator of encoded chunks meant for a
+StreamingResponse. Documents are read through FirestoreService's streaming
+iterators and written out as they arrive, so memory use stays flat however
+long the history is: at most one page of workouts plus one output chunk is
+held at a time.
+
+The CSV layout has one row per record with a ``record_type`` column; workout
+rows carry their exercises as a JSON array, matching what ``POST /import``
+accepts.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, Tuple
+from app.services.firestore_service import (
+    FirestoreService,
+    GOALS_COLLECTION,
+    NUTRITION_LOGS_COLLECTION,
+)
+
+# format -> media type
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CSV_COLUMNS = (
+    "record_type", "id", "log_date", "created_at",
+    # workouts
+    "name", "workout_type", "duration", "calories_burned", "notes", "exercises",
+    # nutrition logs
+    "meal_type", "food_name", "calories", "protein", "carbs", "fats", "serving_size",
+    # goals
+    "goal_type", "target_value", "current_value", "target_date", "is_achieved",
+)
+
+# Output is flushed to the client in chunks of about this many bytes
+CHUNK_BYTES = 64 * 1024
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def iter_records(service: FirestoreService, user_id: str) -> Iterator[Tuple[str, Dict]]:
+    """``(record_type, document)`` for everything the user has logged"""
+    for page in service.iter_workout_pages(user_id):
+        for workout in page:
+            yield "workout", workout
+    for log in service.iter_user_documents(user_id, NUTRITION_LOGS_COLLECTION):
+        yield "nutrition_log", log
+    for goal in service.iter_user_documents(user_id, GOALS_COLLECTION):
+        yield "goal", goal
+
+
+def _ndjson_lines(records: Iterator[Tuple[str, Dict]]) -> Iterator[str]:
+    for record_type, document in records:
+        document.pop("user_id", None)
+        yield json.dumps({"record_type": record_type, **document}, default=_json_default) + "\n"
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_default)
+    return value
+
+
+def _csv_lines(records: Iterator[Tuple[str, Dict]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def line(values) -> str:
+        writer.writerow(values)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield line(CSV_COLUMNS)
+    for record_type, document in records:
+        document["record_type"] = record_type
+        yield line([_csv_value(document.get(column)) for column in CSV_COLUMNS])
+
+
+def stream_export(service: FirestoreService, user_id: str, export_format: str) -> Iterator[bytes]:
+    """Encoded export of a user's data, in chunks of roughly CHUNK_BYTES"""
+    lines = _csv_lines if export_format == "csv" else _ndjson_lines
+    chunk = []
+    size = 0
+    for text in lines(iter_records(service, user_id)):
+        chunk.append(text)
+        size += len(text)
+        if size >= CHUNK_BYTES:
+            yield "".join(chunk).encode()
+            chunk, size = [], 0
+    if chunk:
+        yield "".join(chunk).encode()
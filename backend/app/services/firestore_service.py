@@ -1,6 +1,12 @@
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-from google.cloud.firestore_v1 import FieldFilter
+import base64
+import json
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Any, Set
+from google.cloud.firestore_v1 import FieldFilter, Increment
+from google.cloud.firestore_v1.field_path import FieldPath
+from app.core.config import settings
 from app.core.firebase_config import get_db
 
 # Collection names
@@ -9,12 +15,210 @@ WORKOUTS_COLLECTION = "workouts"
 EXERCISES_COLLECTION = "exercises"
 NUTRITION_LOGS_COLLECTION = "nutrition_logs"
 GOALS_COLLECTION = "goals"
+DAILY_ROLLUPS_COLLECTION = "daily_rollups"
+INSIGHTS_COLLECTION = "insights"
+
+# Firestore rejects batches with more operations than this
+MAX_BATCH_SIZE = 500
+
+# Subcollections of each collection's documents, deleted along with them
+SUBCOLLECTIONS = {
+    USERS_COLLECTION: (
+        WORKOUTS_COLLECTION,
+        NUTRITION_LOGS_COLLECTION,
+        GOALS_COLLECTION,
+        DAILY_ROLLUPS_COLLECTION,
+        INSIGHTS_COLLECTION,
+    ),
+    WORKOUTS_COLLECTION: (EXERCISES_COLLECTION,),
+}
+
+
+def rollup_day(log_date: datetime) -> str:
+    """The ``YYYY-MM-DD`` (UTC) rollup document id for a log date"""
+    if log_date.tzinfo is not None:
+        log_date = log_date.astimezone(timezone.utc)
+    return log_date.strftime("%Y-%m-%d")
+
+
+def workout_rollup_delta(workout: Dict, sign: int = 1) -> Dict:
+    """Per-day rollup contribution of one workout (sign=-1 to remove it)"""
+    return {
+        'workout_count': sign,
+        'duration': sign * (workout.get('duration') or 0),
+        'calories_burned': sign * (workout.get('calories_burned') or 0),
+        'workout_types': {workout.get('workout_type') or 'unknown': sign}
+    }
+
+
+def nutrition_rollup_delta(log: Dict, sign: int = 1) -> Dict:
+    """Per-day rollup contribution of one nutrition log (sign=-1 to remove it)"""
+    return {
+        'meal_count': sign,
+        'calories': sign * (log.get('calories') or 0),
+        'protein': sign * (log.get('protein') or 0),
+        'carbs': sign * (log.get('carbs') or 0),
+        'fats': sign * (log.get('fats') or 0)
+    }
+
+
+def accumulate_delta(target: Dict, delta: Dict) -> None:
+    """Add a (nested) rollup delta into ``target`` in place"""
+    for key, value in delta.items():
+        if isinstance(value, dict):
+            accumulate_delta(target.setdefault(key, {}), value)
+        else:
+            target[key] = target.get(key, 0) + value
+
+
+def _as_increments(delta: Dict) -> Dict:
+    return {
+        key: _as_increments(value) if isinstance(value, dict) else Increment(value)
+        for key, value in delta.items()
+    }
+
+
+def encode_cursor(doc: Dict) -> str:
+    """Build an opaque pagination cursor from the last document of a page"""
+    payload = json.dumps({"log_date": doc["log_date"].isoformat(), "id": doc["id"]})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict:
+    """Turn a cursor back into ``start_after`` values; raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return {
+            "log_date": datetime.fromisoformat(payload["log_date"]),
+            FieldPath.document_id(): payload["id"]
+        }
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+
+
+def next_cursor(page: List[Dict], limit: int) -> Optional[str]:
+    """Cursor for the page after ``page``, or None if this was the last one"""
+    if len(page) < limit or not page:
+        return None
+    return encode_cursor(page[-1])
+
+
+class BatchDeleter:
+    """
+    Deletes documents in batches of MAX_BATCH_SIZE, committing up to
+    ``concurrency`` batches at once on ``executor``. ``progress`` is called
+    (from a committing thread) with the running total after every commit.
+    """
+    
+    def __init__(self, db, executor: ThreadPoolExecutor, concurrency: int,
+                 progress: Optional[Callable[[int], None]] = None):
+        self._db = db
+        self._executor = executor
+        self._concurrency = concurrency
+        self._progress = progress
+        self._refs: List[Any] = []
+        self._committing: Set[Future] = set()
+        self._lock = threading.Lock()
+        self.deleted = 0
+    
+    def delete(self, ref) -> None:
+        self._refs.append(ref)
+        if len(self._refs) == MAX_BATCH_SIZE:
+            self._flush()
+    
+    def _flush(self) -> None:
+        if not self._refs:
+            return
+        if len(self._committing) >= self._concurrency:
+            done, self._committing = wait(self._committing, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+        self._committing.add(self._executor.submit(self._commit, self._refs))
+        self._refs = []
+    
+    def _commit(self, refs: List[Any]) -> None:
+        batch = self._db.batch()
+        for ref in refs:
+            batch.delete(ref)
+        batch.commit()
+        with self._lock:
+            self.deleted += len(refs)
+            deleted = self.deleted
+        if self._progress is not None:
+            self._progress(deleted)
+    
+    def close(self) -> int:
+        """Commit what is queued and wait for every batch; raises if one failed"""
+        self._flush()
+        committing, self._committing = self._committing, set()
+        for future in wait(committing).done:
+            future.result()
+        return self.deleted
+
 
 class FirestoreService:
     """Service for interacting with Firestore database"""
     
     def __init__(self):
-        self.db = get_db()
+        # Shared pool for fanning out per-document subcollection reads
+        self._fanout = ThreadPoolExecutor(
+            max_workers=settings.FIRESTORE_FANOUT_CONCURRENCY,
+            thread_name_prefix="firestore-fanout"
+        )
+        # Separate pool for delete batches, so commits never wait behind reads
+        self._committers = ThreadPoolExecutor(
+            max_workers=settings.DELETE_COMMIT_CONCURRENCY,
+            thread_name_prefix="firestore-commit"
+        )
+    
+    @property
+    def db(self):
+        """Firestore client, created on first use rather than at import time"""
+        return get_db()
+    
+    @staticmethod
+    def _between(query, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        """Restrict a query to ``start <= log_date < end`` on the server"""
+        if start is not None:
+            query = query.where(filter=FieldFilter('log_date', '>=', start))
+        if end is not None:
+            query = query.where(filter=FieldFilter('log_date', '<', end))
+        return query
+    
+    @staticmethod
+    def _paginated(query, cursor: Optional[str] = None):
+        """
+        Order by (log_date, id) descending and resume after ``cursor``.
+        The id tie-breaker keeps pages stable when log dates collide.
+        """
+        query = query.order_by('log_date', direction='DESCENDING')\
+            .order_by(FieldPath.document_id(), direction='DESCENDING')
+        if cursor:
+            query = query.start_after(decode_cursor(cursor))
+        return query
+    
+    def _rollup_ref(self, user_id: str, day: str):
+        return self.db.collection(USERS_COLLECTION).document(user_id)\
+            .collection(DAILY_ROLLUPS_COLLECTION).document(day)
+    
+    def _add_to_rollup(self, batch, user_id: str, log_date: datetime, delta: Dict) -> None:
+        """Queue an atomic increment of a daily rollup document on ``batch``"""
+        day = rollup_day(log_date)
+        batch.set(self._rollup_ref(user_id, day), {'date': day, **_as_increments(delta)}, merge=True)
+    
+    def _bump_data_version(self, batch, user_id: str, collection: str) -> None:
+        """
+        Queue an increment of the user's ``data_versions.<collection>`` counter
+        and of the overall ``data_version`` counter on ``batch``, so anything
+        derived from that collection (or from any of the user's data) can tell
+        it changed. This is an update, not a merge, so the whole batch fails
+        instead of recreating the user document of a deleted account.
+        """
+        batch.update(
+            self.db.collection(USERS_COLLECTION).document(user_id),
+            {'data_version': Increment(1), f'data_versions.{collection}': Increment(1)}
+        )
     
     # ============ USER OPERATIONS ============
     
@@ -62,11 +266,31 @@ class FirestoreService:
     def update_user(self, user_id: str, update_data: Dict) -> bool:
         """Update user document"""
         try:
-            self.db.collection(USERS_COLLECTION).document(user_id).update(update_data)
+            self.db.collection(USERS_COLLECTION).document(user_id)\
+                .update({**update_data, 'data_version': Increment(1)})
             return True
         except Exception:
             return False
     
+    def delete_user(self, user_id: str, progress: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Delete a user and everything under it (see SUBCOLLECTIONS). The user
+        document goes last, once every other batch has committed, so a failed
+        run can simply be repeated. Returns the number of documents deleted;
+        ``progress`` gets the running total as batches commit.
+        """
+        user_ref = self.db.collection(USERS_COLLECTION).document(user_id)
+        deleter = self._batch_deleter(progress)
+        for name in SUBCOLLECTIONS[USERS_COLLECTION]:
+            self._delete_collection(deleter, user_ref.collection(name))
+        deleted = deleter.close()
+        
+        user_ref.delete()
+        deleted += 1
+        if progress is not None:
+            progress(deleted)
+        return deleted
+    
     # ============ WORKOUT OPERATIONS ============
     
     def create_workout(self, user_id: str, workout_data: Dict) -> str:
@@ -75,21 +299,75 @@ class FirestoreService:
         workout_data['log_date'] = workout_data.get('log_date', datetime.utcnow())
         workout_data['created_at'] = datetime.utcnow()
         
+        batch = self.db.batch()
         doc_ref = self.db.collection(USERS_COLLECTION).document(user_id)\
             .collection(WORKOUTS_COLLECTION).document()
-        doc_ref.set(workout_data)
+        batch.set(doc_ref, workout_data)
+        self._add_to_rollup(batch, user_id, workout_data['log_date'], workout_rollup_delta(workout_data))
+        self._bump_data_version(batch, user_id, WORKOUTS_COLLECTION)
+        batch.commit()
         return doc_ref.id
     
-    def get_user_workouts(self, user_id: str, limit: int = 100) -> List[Dict]:
-        """Get all workouts for a user"""
-        workouts = self.db.collection(USERS_COLLECTION).document(user_id)\
-            .collection(WORKOUTS_COLLECTION)\
-            .order_by('log_date', direction='DESCENDING')\
-            .limit(limit)\
-            .stream()
+    def create_workout_with_exercises(self, user_id: str, workout_data: Dict, exercises: List[Dict]) -> Dict:
+        """
+        Create a workout and all of its exercises in a single atomic batch.
+        Returns the workout as written (with exercises) so callers don't need
+        to read it back.
+        """
+        now = datetime.utcnow()
+        workout_data['user_id'] = user_id
+        workout_data['log_date'] = workout_data.get('log_date') or now
+        workout_data['created_at'] = now
+        
+        batch = self.db.batch()
+        workout_ref = self.db.collection(USERS_COLLECTION).document(user_id)\
+            .collection(WORKOUTS_COLLECTION).document()
+        batch.set(workout_ref, workout_data)
+        
+        created_exercises = []
+        for exercise_data in exercises:
+            exercise_data['workout_id'] = workout_ref.id
+            exercise_data['created_at'] = now
+            exercise_ref = workout_ref.collection(EXERCISES_COLLECTION).document()
+            batch.set(exercise_ref, exercise_data)
+            created_exercises.append({**exercise_data, 'id': exercise_ref.id})
+        
+        self._add_to_rollup(batch, user_id, workout_data['log_date'], workout_rollup_delta(workout_data))
+        self._bump_data_version(batch, user_id, WORKOUTS_COLLECTION)
+        batch.commit()
+        return {**workout_data, 'id': workout_ref.id, 'exercises': created_exercises}
+    
+    def get_user_workouts(self, user_id: str, limit: int = 100, cursor: Optional[str] = None) -> List[Dict]:
+        """
+        Get workouts for a user, newest first.
+        Pass the ``next_cursor`` of the previous page to continue after it.
+        """
+        return self.get_user_workouts_between(user_id, limit=limit, cursor=cursor)
+    
+    def get_user_workouts_between(
+        self,
+        user_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Get workouts with ``start <= log_date < end``, newest first.
+        The range is filtered by Firestore, so only matching documents are read.
+        """
+        query = self._paginated(
+            self._between(
+                self.db.collection(USERS_COLLECTION).document(user_id).collection(WORKOUTS_COLLECTION),
+                start, end
+            ),
+            cursor
+        )
+        if limit is not None:
+            query = query.limit(limit)
         
         result = []
-        for workout in workouts:
+        for workout in query.stream():
             workout_data = workout.to_dict()
             workout_data['id'] = workout.id
             result.append(workout_data)
@@ -109,26 +387,48 @@ class FirestoreService:
     def update_workout(self, user_id: str, workout_id: str, update_data: Dict) -> bool:
         """Update a workout"""
         try:
-            self.db.collection(USERS_COLLECTION).document(user_id)\
-                .collection(WORKOUTS_COLLECTION).document(workout_id).update(update_data)
+            batch = self.db.batch()
+            batch.update(self.db.collection(USERS_COLLECTION).document(user_id)\
+                .collection(WORKOUTS_COLLECTION).document(workout_id), update_data)
+            self._bump_data_version(batch, user_id, WORKOUTS_COLLECTION)
+            batch.commit()
             return True
         except Exception:
             return False
     
-    def delete_workout(self, user_id: str, workout_id: str) -> bool:
-        """Delete a workout and its exercises"""
+    def delete_workout(self, user_id: str, workout_id: str, workout: Optional[Dict] = None) -> bool:
+        """
+        Delete a workout and its exercises.
+        Pass the already-loaded ``workout`` to skip re-reading it for the rollup.
+        """
         try:
-            # Delete all exercises first
-            exercises = self.db.collection(USERS_COLLECTION).document(user_id)\
-                .collection(WORKOUTS_COLLECTION).document(workout_id)\
-                .collection(EXERCISES_COLLECTION).stream()
+            if workout is None:
+                workout = self.get_workout_by_id(user_id, workout_id)
+                if workout is None:
+                    return False
             
-            for exercise in exercises:
-                exercise.reference.delete()
+            workout_ref = self.db.collection(USERS_COLLECTION).document(user_id)\
+                .collection(WORKOUTS_COLLECTION).document(workout_id)
+            exercises = [ref for page in self._iter_ref_pages(workout_ref.collection(EXERCISES_COLLECTION))
+                         for ref in page]
             
-            # Delete the workout
-            self.db.collection(USERS_COLLECTION).document(user_id)\
-                .collection(WORKOUTS_COLLECTION).document(workout_id).delete()
+            # Exercises share the workout's batch when they fit next to the
+            # workout, its rollup and the version bump; otherwise they are
+            # deleted first, in batches of their own
+            batch = self.db.batch()
+            if len(exercises) <= MAX_BATCH_SIZE - 3:
+                for ref in exercises:
+                    batch.delete(ref)
+            else:
+                deleter = self._batch_deleter()
+                for ref in exercises:
+                    deleter.delete(ref)
+                deleter.close()
+            
+            batch.delete(workout_ref)
+            self._add_to_rollup(batch, user_id, workout['log_date'], workout_rollup_delta(workout, sign=-1))
+            self._bump_data_version(batch, user_id, WORKOUTS_COLLECTION)
+            batch.commit()
             return True
         except Exception:
             return False
@@ -143,7 +443,10 @@ class FirestoreService:
         doc_ref = self.db.collection(USERS_COLLECTION).document(user_id)\
             .collection(WORKOUTS_COLLECTION).document(workout_id)\
             .collection(EXERCISES_COLLECTION).document()
-        doc_ref.set(exercise_data)
+        batch = self.db.batch()
+        batch.set(doc_ref, exercise_data)
+        self._bump_data_version(batch, user_id, EXERCISES_COLLECTION)
+        batch.commit()
         return doc_ref.id
     
     def get_workout_exercises(self, user_id: str, workout_id: str) -> List[Dict]:
@@ -159,6 +462,22 @@ class FirestoreService:
             result.append(exercise_data)
         return result
     
+    def get_exercises_for_workouts(self, user_id: str, workout_ids: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Get exercises for many workouts at once, grouped by workout_id.
+        The per-workout queries run concurrently (bounded by
+        FIRESTORE_FANOUT_CONCURRENCY), so latency stays close to a single
+        round-trip regardless of how many workouts are requested.
+        """
+        if not workout_ids:
+            return {}
+        
+        results = self._fanout.map(
+            lambda workout_id: self.get_workout_exercises(user_id, workout_id),
+            workout_ids
+        )
+        return dict(zip(workout_ids, results))
+    
     # ============ NUTRITION LOG OPERATIONS ============
     
     def create_nutrition_log(self, user_id: str, nutrition_data: Dict) -> str:
@@ -167,21 +486,46 @@ class FirestoreService:
         nutrition_data['log_date'] = nutrition_data.get('log_date', datetime.utcnow())
         nutrition_data['created_at'] = datetime.utcnow()
         
+        batch = self.db.batch()
         doc_ref = self.db.collection(USERS_COLLECTION).document(user_id)\
             .collection(NUTRITION_LOGS_COLLECTION).document()
-        doc_ref.set(nutrition_data)
+        batch.set(doc_ref, nutrition_data)
+        self._add_to_rollup(batch, user_id, nutrition_data['log_date'], nutrition_rollup_delta(nutrition_data))
+        self._bump_data_version(batch, user_id, NUTRITION_LOGS_COLLECTION)
+        batch.commit()
         return doc_ref.id
     
-    def get_user_nutrition_logs(self, user_id: str, limit: int = 100) -> List[Dict]:
-        """Get nutrition logs for a user"""
-        logs = self.db.collection(USERS_COLLECTION).document(user_id)\
-            .collection(NUTRITION_LOGS_COLLECTION)\
-            .order_by('log_date', direction='DESCENDING')\
-            .limit(limit)\
-            .stream()
+    def get_user_nutrition_logs(self, user_id: str, limit: int = 100, cursor: Optional[str] = None) -> List[Dict]:
+        """
+        Get nutrition logs for a user, newest first.
+        Pass the ``next_cursor`` of the previous page to continue after it.
+        """
+        return self.get_user_nutrition_logs_between(user_id, limit=limit, cursor=cursor)
+    
+    def get_user_nutrition_logs_between(
+        self,
+        user_id: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Get nutrition logs with ``start <= log_date < end``, newest first.
+        The range is filtered by Firestore, so only matching documents are read.
+        """
+        query = self._paginated(
+            self._between(
+                self.db.collection(USERS_COLLECTION).document(user_id).collection(NUTRITION_LOGS_COLLECTION),
+                start, end
+            ),
+            cursor
+        )
+        if limit is not None:
+            query = query.limit(limit)
         
         result = []
-        for log in logs:
+        for log in query.stream():
             log_data = log.to_dict()
             log_data['id'] = log.id
             result.append(log_data)
@@ -201,21 +545,233 @@ class FirestoreService:
     def update_nutrition_log(self, user_id: str, log_id: str, update_data: Dict) -> bool:
         """Update a nutrition log"""
         try:
-            self.db.collection(USERS_COLLECTION).document(user_id)\
-                .collection(NUTRITION_LOGS_COLLECTION).document(log_id).update(update_data)
+            batch = self.db.batch()
+            batch.update(self.db.collection(USERS_COLLECTION).document(user_id)\
+                .collection(NUTRITION_LOGS_COLLECTION).document(log_id), update_data)
+            self._bump_data_version(batch, user_id, NUTRITION_LOGS_COLLECTION)
+            batch.commit()
             return True
         except Exception:
             return False
     
-    def delete_nutrition_log(self, user_id: str, log_id: str) -> bool:
-        """Delete a nutrition log"""
+    def delete_nutrition_log(self, user_id: str, log_id: str, log: Optional[Dict] = None) -> bool:
+        """
+        Delete a nutrition log.
+        Pass the already-loaded ``log`` to skip re-reading it for the rollup.
+        """
         try:
-            self.db.collection(USERS_COLLECTION).document(user_id)\
-                .collection(NUTRITION_LOGS_COLLECTION).document(log_id).delete()
+            if log is None:
+                log = self.get_nutrition_log_by_id(user_id, log_id)
+                if log is None:
+                    return False
+            
+            batch = self.db.batch()
+            batch.delete(self.db.collection(USERS_COLLECTION).document(user_id)\
+                .collection(NUTRITION_LOGS_COLLECTION).document(log_id))
+            self._add_to_rollup(batch, user_id, log['log_date'], nutrition_rollup_delta(log, sign=-1))
+            self._bump_data_version(batch, user_id, NUTRITION_LOGS_COLLECTION)
+            batch.commit()
             return True
         except Exception:
             return False
     
+    # ============ DAILY ROLLUP OPERATIONS ============
+    
+    def get_daily_rollups(self, user_id: str, start_day: date, end_day: date) -> List[Dict]:
+        """Get rollup documents for ``start_day``..``end_day`` (inclusive), oldest first"""
+        rollups = self.db.collection(USERS_COLLECTION).document(user_id)\
+            .collection(DAILY_ROLLUPS_COLLECTION)\
+            .where(filter=FieldFilter('date', '>=', start_day.isoformat()))\
+            .where(filter=FieldFilter('date', '<=', end_day.isoformat()))\
+            .order_by('date')\
+            .stream()
+        return [rollup.to_dict() for rollup in rollups]
+    
+    def get_daily_rollup(self, user_id: str, day: date) -> Optional[Dict]:
+        """Get the rollup document for a single day"""
+        doc = self._rollup_ref(user_id, day.isoformat()).get()
+        return doc.to_dict() if doc.exists else None
+    
+    def rebuild_daily_rollups(self, user_id: str) -> int:
+        """
+        Regenerate every rollup for a user from the raw workouts and nutrition
+        logs, replacing whatever is stored. Returns the number of days written.
+        """
+        user_ref = self.db.collection(USERS_COLLECTION).document(user_id)
+        days: Dict[str, Dict] = {}
+        
+        for doc in user_ref.collection(WORKOUTS_COLLECTION).stream():
+            workout = doc.to_dict()
+            if workout.get('log_date'):
+                day = rollup_day(workout['log_date'])
+                accumulate_delta(days.setdefault(day, {'date': day}), workout_rollup_delta(workout))
+        
+        for doc in user_ref.collection(NUTRITION_LOGS_COLLECTION).stream():
+            log = doc.to_dict()
+            if log.get('log_date'):
+                day = rollup_day(log['log_date'])
+                accumulate_delta(days.setdefault(day, {'date': day}), nutrition_rollup_delta(log))
+        
+        batch = self.db.batch()
+        pending = 0
+        
+        def queue(write) -> None:
+            nonlocal batch, pending
+            write(batch)
+            pending += 1
+            if pending == MAX_BATCH_SIZE:
+                batch.commit()
+                batch = self.db.batch()
+                pending = 0
+        
+        for doc in user_ref.collection(DAILY_ROLLUPS_COLLECTION).stream():
+            if doc.id not in days:
+                queue(lambda b, ref=doc.reference: b.delete(ref))
+        for day, rollup in days.items():
+            queue(lambda b, ref=self._rollup_ref(user_id, day), data=rollup: b.set(ref, data))
+        self._bump_data_version(batch, user_id, DAILY_ROLLUPS_COLLECTION)
+        batch.commit()
+        return len(days)
+    
+    # ============ BULK IMPORT ============
+    
+    def import_batch(self, user_id: str, collection: str, documents: List[Dict]) -> int:
+        """
+        Create many workouts (each with its ``exercises``) or nutrition logs
+        in one atomic batch: one increment per rollup day for the whole batch
+        and a single data version bump. That is one write per document and
+        exercise, plus one per distinct day, plus one; callers keep it within
+        MAX_BATCH_SIZE. Imported rows keep their ``log_date`` as
+        ``created_at`` so history-based analytics place them on their own dates.
+        """
+        now = datetime.utcnow()
+        rollup_delta = workout_rollup_delta if collection == WORKOUTS_COLLECTION else nutrition_rollup_delta
+        user_ref = self.db.collection(USERS_COLLECTION).document(user_id)
+        batch = self.db.batch()
+        days: Dict[str, Dict] = {}
+        
+        for document in documents:
+            exercises = document.pop('exercises', None) or []
+            document['user_id'] = user_id
+            document['log_date'] = document.get('log_date') or now
+            document['created_at'] = document['log_date']
+            document['imported_at'] = now
+            
+            doc_ref = user_ref.collection(collection).document()
+            batch.set(doc_ref, document)
+            for exercise_data in exercises:
+                exercise_data['workout_id'] = doc_ref.id
+                exercise_data['created_at'] = now
+                batch.set(doc_ref.collection(EXERCISES_COLLECTION).document(), exercise_data)
+            
+            accumulate_delta(days.setdefault(rollup_day(document['log_date']), {}), rollup_delta(document))
+        
+        for day, delta in days.items():
+            batch.set(self._rollup_ref(user_id, day), {'date': day, **_as_increments(delta)}, merge=True)
+        self._bump_data_version(batch, user_id, collection)
+        batch.commit()
+        return len(documents)
+    
+    # ============ EXPORT ============
+    
+    def iter_user_documents(
+        self,
+        user_id: str,
+        collection: str,
+        fields: Optional[List[str]] = None
+    ) -> Iterator[Dict]:
+        """
+        Every document of one of a user's collections, in document id order,
+        optionally with only ``fields`` read. Firestore's ``stream()`` fetches
+        results as they are consumed, so only the documents not yet handed
+        out are held in memory.
+        """
+        query = self.db.collection(USERS_COLLECTION).document(user_id).collection(collection)
+        if fields is not None:
+            query = query.select(fields)
+        documents = query.stream()
+        
+        for doc in documents:
+            data = doc.to_dict()
+            data['id'] = doc.id
+            yield data
+    
+    def iter_workout_pages(self, user_id: str, page_size: int = MAX_BATCH_SIZE) -> Iterator[List[Dict]]:
+        """
+        Every workout of a user with its ``exercises``, in pages of
+        ``page_size``; each page's exercises are loaded together.
+        """
+        page = []
+        for workout in self.iter_user_documents(user_id, WORKOUTS_COLLECTION):
+            page.append(workout)
+            if len(page) == page_size:
+                yield self._with_exercises(user_id, page)
+                page = []
+        if page:
+            yield self._with_exercises(user_id, page)
+    
+    def _with_exercises(self, user_id: str, workouts: List[Dict]) -> List[Dict]:
+        exercises = self.get_exercises_for_workouts(user_id, [workout['id'] for workout in workouts])
+        for workout in workouts:
+            workout['exercises'] = exercises.get(workout['id'], [])
+        return workouts
+    
+    # ============ INSIGHTS OPERATIONS ============
+    
+    def _insights_ref(self, user_id: str, name: str):
+        return self.db.collection(USERS_COLLECTION).document(user_id)\
+            .collection(INSIGHTS_COLLECTION).document(name)
+    
+    def get_workout_insights(self, user_id: str) -> Optional[Dict]:
+        """Stored workout insights with the workouts version they were computed at"""
+        doc = self._insights_ref(user_id, WORKOUTS_COLLECTION).get()
+        return doc.to_dict() if doc.exists else None
+    
+    def save_workout_insights(self, user_id: str, result: Dict, workouts_version: int) -> None:
+        """Replace the stored workout insights (derived data, so data_version is not bumped)"""
+        self._insights_ref(user_id, WORKOUTS_COLLECTION).set({
+            'result': result,
+            'workouts_version': workouts_version,
+            'computed_at': datetime.utcnow()
+        })
+    
+    # ============ CASCADING DELETES ============
+    
+    def _batch_deleter(self, progress: Optional[Callable[[int], None]] = None) -> BatchDeleter:
+        return BatchDeleter(self.db, self._committers, settings.DELETE_COMMIT_CONCURRENCY, progress)
+    
+    def _iter_ref_pages(self, collection_ref, page_size: int = MAX_BATCH_SIZE) -> Iterator[List[Any]]:
+        """References to every document of a collection, a page at a time (ids only are read)"""
+        query = collection_ref.select([]).order_by(FieldPath.document_id()).limit(page_size)
+        last = None
+        while True:
+            page = list((query if last is None else query.start_after(last)).stream())
+            if page:
+                yield [doc.reference for doc in page]
+            if len(page) < page_size:
+                return
+            last = page[-1]
+    
+    def _delete_collection(self, deleter: BatchDeleter, collection_ref) -> None:
+        """Queue deletes for a whole collection, a page at a time"""
+        for page in self._iter_ref_pages(collection_ref):
+            self._delete_documents(deleter, page)
+    
+    def _delete_documents(self, deleter: BatchDeleter, refs: List[Any]) -> None:
+        """Queue deletes for documents of one collection, after everything nested under them"""
+        for name in SUBCOLLECTIONS.get(refs[0].parent.id, ()):
+            # One listing per document, run concurrently; recursing happens
+            # here rather than on the fanout pool so it can never wait on itself
+            nested = self._fanout.map(
+                lambda ref: [child for page in self._iter_ref_pages(ref.collection(name)) for child in page],
+                refs
+            )
+            for children in nested:
+                if children:
+                    self._delete_documents(deleter, children)
+        for ref in refs:
+            deleter.delete(ref)
+    
     # ============ GOAL OPERATIONS ============
     
     def create_goal(self, user_id: str, goal_data: Dict) -> str:
@@ -226,7 +782,10 @@ class FirestoreService:
         
         doc_ref = self.db.collection(USERS_COLLECTION).document(user_id)\
             .collection(GOALS_COLLECTION).document()
-        doc_ref.set(goal_data)
+        batch = self.db.batch()
+        batch.set(doc_ref, goal_data)
+        self._bump_data_version(batch, user_id, GOALS_COLLECTION)
+        batch.commit()
         return doc_ref.id
     
     def get_user_goals(self, user_id: str) -> List[Dict]:
@@ -257,8 +816,11 @@ class FirestoreService:
     def update_goal(self, user_id: str, goal_id: str, update_data: Dict) -> bool:
         """Update a goal"""
         try:
-            self.db.collection(USERS_COLLECTION).document(user_id)\
-                .collection(GOALS_COLLECTION).document(goal_id).update(update_data)
+            batch = self.db.batch()
+            batch.update(self.db.collection(USERS_COLLECTION).document(user_id)\
+                .collection(GOALS_COLLECTION).document(goal_id), update_data)
+            self._bump_data_version(batch, user_id, GOALS_COLLECTION)
+            batch.commit()
             return True
         except Exception:
             return False
@@ -266,8 +828,11 @@ class FirestoreService:
     def delete_goal(self, user_id: str, goal_id: str) -> bool:
         """Delete a goal"""
         try:
-            self.db.collection(USERS_COLLECTION).document(user_id)\
-                .collection(GOALS_COLLECTION).document(goal_id).delete()
+            batch = self.db.batch()
+            batch.delete(self.db.collection(USERS_COLLECTION).document(user_id)\
+                .collection(GOALS_COLLECTION).document(goal_id))
+            self._bump_data_version(batch, user_id, GOALS_COLLECTION)
+            batch.commit()
             return True
         except Exception:
             return False
@@ -0,0 +1,204 @@
+"""
+Offline food database with a memory-mapped trigram index.
+
+The index file is produced from a CSV by ``build_index`` (or
+``scripts/build_food_index.py``) and opened read-only with ``mmap``, so every
+worker process on a host shares the same pages. Lookups score candidates by
+trigram Dice similarity without any network call, and only accept a food
+whose name accounts for every word of the query: "apple pie" must not come
+back as "apple".
+
+File layout (native byte order, every section 4-byte aligned)::
+
+    header        magic, byte-order flag, n_foods, n_trigrams, n_postings, names_bytes
+    tri_hashes    u32[n_trigrams]     sorted trigram hashes
+    tri_offsets   u32[n_trigrams + 1] slice of ``postings`` for each hash
+    postings      u32[n_postings]     food ids containing the trigram
+    tri_counts    u32[n_foods]        distinct trigrams per food name
+    nutrients     f32[n_foods * 5]    serving g, kcal, protein, carbs, fat
+    name_offsets  u32[n_foods + 1]    slice of ``names`` for each food
+    names         utf-8 bytes
+"""
+import csv
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+MAGIC = b"FIDX"
+_HEADER = struct.Struct("=4sIIIII")
+_BYTE_ORDER = 1 if sys.byteorder == "little" else 2
+_NUTRIENT_FIELDS = ("serving_size_g", "calories", "protein_g", "carbohydrates_total_g", "fat_total_g")
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    return " ".join(_NON_WORD.sub(" ", name.lower()).split())
+
+
+def trigrams(name: str) -> Set[int]:
+    """Hashed, padded character trigrams of a normalized name"""
+    padded = f"  {name} "
+    return {zlib.crc32(padded[i:i + 3].encode()) for i in range(len(padded) - 2)}
+
+
+def _covers(query_words: List[Set[int]], name: str, min_score: float) -> bool:
+    """Whether every query word (as trigrams) closely matches some word of ``name``"""
+    name_words = [trigrams(word) for word in name.split()]
+    for word in query_words:
+        if not any(2.0 * len(word & other) / (len(word) + len(other)) >= min_score for other in name_words):
+            return False
+    return True
+
+
+def build_index(csv_path: str, index_path: str) -> int:
+    """
+    Build an index file from a CSV with a ``name`` column plus the
+    CalorieNinjas-style nutrient columns. Returns the number of foods.
+    The file is written to a temp path and renamed into place, so workers
+    never observe a half-written index.
+    """
+    names: List[str] = []
+    nutrients = array("f")
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            name = normalize_name(row["name"])
+            if not name:
+                continue
+            names.append(name)
+            nutrients.extend(float(row.get(field) or 0) for field in _NUTRIENT_FIELDS)
+
+    postings_by_hash: Dict[int, List[int]] = defaultdict(list)
+    tri_counts = array("I")
+    for food_id, name in enumerate(names):
+        grams = trigrams(name)
+        tri_counts.append(len(grams))
+        for gram in grams:
+            postings_by_hash[gram].append(food_id)
+
+    tri_hashes = array("I", sorted(postings_by_hash))
+    tri_offsets = array("I", [0])
+    postings = array("I")
+    for gram in tri_hashes:
+        postings.extend(postings_by_hash[gram])
+        tri_offsets.append(len(postings))
+
+    name_offsets = array("I", [0])
+    blob = bytearray()
+    for name in names:
+        blob += name.encode("utf-8")
+        name_offsets.append(len(blob))
+    blob += b"\0" * (-len(blob) % 4)
+
+    tmp_path = f"{index_path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as out:
+        out.write(_HEADER.pack(MAGIC, _BYTE_ORDER, len(names), len(tri_hashes), len(postings), len(blob)))
+        for section in (tri_hashes, tri_offsets, postings, tri_counts, nutrients, name_offsets):
+            section.tofile(out)
+        out.write(blob)
+    os.replace(tmp_path, index_path)
+    return len(names)
+
+
+class FoodIndex:
+    """Read-only, memory-mapped view over an index built by ``build_index``"""
+
+    def __init__(self, path: str, min_score: float = 0.7):
+        self.path = path
+        self.min_score = min_score
+        self.hits = 0
+        self.misses = 0
+
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, byte_order, n_foods, n_trigrams, n_postings, names_bytes = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or byte_order != _BYTE_ORDER:
+            raise ValueError(f"{path} is not a food index for this platform")
+
+        view = memoryview(self._mmap)
+        offset = _HEADER.size
+
+        def section(fmt: str, count: int) -> memoryview:
+            nonlocal offset
+            size = count * 4
+            part = view[offset:offset + size].cast(fmt)
+            offset += size
+            return part
+
+        self._tri_hashes = section("I", n_trigrams)
+        self._tri_offsets = section("I", n_trigrams + 1)
+        self._postings = section("I", n_postings)
+        self._tri_counts = section("I", n_foods)
+        self._nutrients = section("f", n_foods * len(_NUTRIENT_FIELDS))
+        self._name_offsets = section("I", n_foods + 1)
+        self._names = view[offset:offset + names_bytes]
+        self.size = n_foods
+
+    @classmethod
+    def open(cls, path: str, source_csv: Optional[str] = None, min_score: float = 0.7) -> Optional["FoodIndex"]:
+        """
+        Open the index, (re)building it first from ``source_csv`` when the
+        file is missing or older than the CSV. Returns None if neither exists.
+        """
+        if source_csv and os.path.exists(source_csv):
+            if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(source_csv):
+                build_index(source_csv, path)
+        if not os.path.exists(path):
+            return None
+        return cls(path, min_score=min_score)
+
+    def name(self, food_id: int) -> str:
+        start, end = self._name_offsets[food_id], self._name_offsets[food_id + 1]
+        return bytes(self._names[start:end]).decode("utf-8")
+
+    def item(self, food_id: int) -> Dict:
+        """A food as a CalorieNinjas-shaped item dict"""
+        base = food_id * len(_NUTRIENT_FIELDS)
+        item = {"name": self.name(food_id)}
+        for index, field in enumerate(_NUTRIENT_FIELDS):
+            item[field] = round(self._nutrients[base + index], 2)
+        return item
+
+    def lookup(self, query: str) -> Optional[Dict]:
+        """Best fuzzy match for ``query``, or None if nothing is close enough"""
+        name = normalize_name(query)
+        if not name:
+            return None
+
+        grams = trigrams(name)
+        shared: Dict[int, int] = defaultdict(int)
+        hashes = self._tri_hashes
+        for gram in grams:
+            position = bisect_left(hashes, gram)
+            if position < len(hashes) and hashes[position] == gram:
+                for food_id in self._postings[self._tri_offsets[position]:self._tri_offsets[position + 1]]:
+                    shared[food_id] += 1
+
+        # Dice coefficient over trigram sets
+        candidates = sorted(
+            ((2.0 * count / (len(grams) + self._tri_counts[food_id]), food_id) for food_id, count in shared.items()),
+            reverse=True
+        )
+        # A shared prefix alone scores high ("carrot cake" vs "carrot"), so
+        # the best candidate must also match each word of the query
+        query_words = [trigrams(word) for word in name.split()]
+        for score, food_id in candidates:
+            if score < self.min_score:
+                break
+            if _covers(query_words, self.name(food_id), self.min_score):
+                self.hits += 1
+                return self.item(food_id)
+
+        self.misses += 1
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {"foods": self.size, "hits": self.hits, "misses": self.misses}
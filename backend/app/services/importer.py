@@ -0,0 +1,237 @@
+"""
+Streaming bulk import of workouts and nutrition logs from CSV or NDJSON.
+
+The upload is decoded and split into rows as chunks arrive, so memory use
+depends on the batch size and concurrency, not on the file size. Each row is
+validated with the same schema as ``POST /workouts`` or ``POST /nutrition``;
+valid rows are grouped into batches of at most MAX_BATCH_SIZE Firestore
+writes (see FirestoreService.import_batch) and up to ``concurrency`` batches
+are committed at a time. Invalid rows and failed batches are reported by row
+number without stopping the import.
+"""
+import asyncio
+import codecs
+import csv
+import json
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from pydantic import ValidationError
+from app.schemas.schemas import NutritionLogCreate, WorkoutCreate
+from app.services.async_firestore_service import AsyncFirestoreService
+from app.services.firestore_service import (
+    MAX_BATCH_SIZE,
+    NUTRITION_LOGS_COLLECTION,
+    WORKOUTS_COLLECTION,
+    rollup_day,
+)
+
+logger = logging.getLogger(__name__)
+
+# kind -> (row schema, collection)
+IMPORT_KINDS = {
+    "workouts": (WorkoutCreate, WORKOUTS_COLLECTION),
+    "nutrition": (NutritionLogCreate, NUTRITION_LOGS_COLLECTION),
+}
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# (row number, raw row or None, parse error or None)
+ParsedRow = Tuple[int, Optional[Dict], Optional[str]]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode UTF-8 (with or without a BOM) and split into lines as bytes arrive"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    """
+    Rows of a CSV file with a header line. Quoted fields may span lines.
+    Empty cells are left out so schema defaults apply, and an ``exercises``
+    cell may hold a JSON array.
+    """
+    header = None
+    record: List[str] = []
+    quotes = 0
+    row = 0
+    async for line in lines:
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            # Inside a quoted field that continues on the next line
+            continue
+        text = "\n".join(record)
+        record, quotes = [], 0
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        raw = {name: value.strip() for name, value in zip(header, values) if value.strip()}
+        if "exercises" in raw:
+            try:
+                raw["exercises"] = json.loads(raw["exercises"])
+            except ValueError:
+                yield row, None, "exercises: not a JSON array"
+                continue
+        yield row, raw, None
+
+    if record:
+        yield row + 1, None, "unterminated quoted field"
+
+
+async def iter_ndjson_rows(lines: AsyncIterator[str]) -> AsyncIterator[ParsedRow]:
+    """Rows of a newline-delimited JSON file, one object per line"""
+    row = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            raw = json.loads(line)
+        except ValueError as exc:
+            yield row, None, f"invalid JSON: {exc.msg}"
+            continue
+        if not isinstance(raw, dict):
+            yield row, None, "expected a JSON object"
+            continue
+        yield row, raw, None
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+class _Report:
+    def __init__(self, kind: str, import_format: str, max_errors: int):
+        self.kind = kind
+        self.format = import_format
+        self.max_errors = max_errors
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors: List[Dict] = []
+        self.errors_truncated = False
+        self.started = datetime.utcnow()
+
+    def error(self, row: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "error": message})
+        else:
+            self.errors_truncated = True
+
+    def to_dict(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "format": self.format,
+            "rows": self.rows,
+            "imported": self.imported,
+            "failed": self.failed,
+            "batches": self.batches,
+            "seconds": round((datetime.utcnow() - self.started).total_seconds(), 3),
+            "errors": self.errors,
+            "errors_truncated": self.errors_truncated
+        }
+
+
+async def run_import(
+    service: AsyncFirestoreService,
+    user_id: str,
+    kind: str,
+    import_format: str,
+    chunks: AsyncIterator[bytes],
+    concurrency: int,
+    max_rows: int,
+    max_errors: int
+) -> Dict:
+    """Import an uploaded file's rows for a user; returns the progress and error report"""
+    schema, collection = IMPORT_KINDS[kind]
+    parse = iter_csv_rows if import_format == "csv" else iter_ndjson_rows
+    report = _Report(kind, import_format, max_errors)
+    committing: Set[asyncio.Task] = set()
+
+    async def commit(rows: List[int], documents: List[Dict]) -> None:
+        try:
+            imported = await service.import_batch(user_id, collection, documents)
+        except Exception:
+            logger.exception("Import batch of %d rows failed for user %s", len(rows), user_id)
+            for row in rows:
+                report.error(row, "write failed")
+            return
+        report.imported += imported
+
+    async def flush() -> None:
+        nonlocal rows, documents, days, ops
+        if not documents:
+            return
+        if len(committing) >= concurrency:
+            _, still_running = await asyncio.wait(committing, return_when=asyncio.FIRST_COMPLETED)
+            committing.intersection_update(still_running)
+        committing.add(asyncio.create_task(commit(rows, documents)))
+        report.batches += 1
+        rows, documents, days, ops = [], [], set(), 1
+
+    # Current batch; ``ops`` counts its writes, starting with the version bump
+    rows: List[int] = []
+    documents: List[Dict] = []
+    days: Set[str] = set()
+    ops = 1
+
+    try:
+        async for row, raw, error in parse(iter_lines(chunks)):
+            if report.rows >= max_rows:
+                report.error(row, f"import is limited to {max_rows} rows; this row and the rest were skipped")
+                break
+            report.rows += 1
+            if error:
+                report.error(row, error)
+                continue
+            try:
+                item = schema.model_validate(raw)
+            except ValidationError as exc:
+                report.error(row, _validation_message(exc))
+                continue
+
+            document = item.model_dump()
+            document["log_date"] = document.get("log_date") or datetime.utcnow()
+            day = rollup_day(document["log_date"])
+            writes = 1 + len(document.get("exercises") or ())
+            # Must fit a fresh batch next to its rollup day and the version bump
+            if writes + 2 > MAX_BATCH_SIZE:
+                report.error(row, f"too many exercises for one workout (max {MAX_BATCH_SIZE - 3})")
+                continue
+            if ops + writes + (day not in days) > MAX_BATCH_SIZE:
+                await flush()
+            ops += writes + (day not in days)
+            rows.append(row)
+            documents.append(document)
+            days.add(day)
+
+        await flush()
+    finally:
+        # Batches already handed to Firestore finish even if the upload breaks off
+        if committing:
+            await asyncio.gather(*committing)
+    return report.to_dict()
@@ -0,0 +1,62 @@
+"""
+Workout pattern insights (best day, preferred type, consistency) computed
+from a user's cached workout series. Used by /ml/workout-insights and by the
+background worker in app.services.insights_worker that keeps each user's
+stored insights document up to date.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import numpy as np
+from app.services.timeseries import WEEKDAYS, WorkoutSeries, epoch_seconds, utc_weekdays
+
+
+def workout_insights(workouts: WorkoutSeries, now: Optional[datetime] = None) -> Dict:
+    """The /ml/workout-insights response body for a workout series"""
+    if len(workouts) < 3:
+        return {"message": "Need more workout data for insights"}
+    
+    columns = workouts.columns()
+    count = len(columns["created_at"])
+    
+    insights = []
+    
+    # Best day of week (by mean calories; ties go to the alphabetically first day)
+    if count > 7:
+        weekday = utc_weekdays(columns["created_at"])
+        sums = np.bincount(weekday, columns["calories_burned"], minlength=7)
+        counts = np.bincount(weekday, minlength=7)
+        day_means = {WEEKDAYS[day]: sums[day] / counts[day] for day in range(7) if counts[day]}
+        best_day = max(sorted(day_means), key=day_means.get)
+        insights.append({
+            "type": "best_day",
+            "message": f"You perform best on {best_day}s",
+            "data": {"day": best_day, "avg_calories": round(float(day_means[best_day]), 2)}
+        })
+    
+    # Most common workout type (ties go to the alphabetically first type)
+    types = workouts.categories["workout_type"]
+    type_counts = np.bincount(columns["workout_type"], minlength=len(types))
+    most_common = min(
+        (name for code, name in enumerate(types) if type_counts[code] == type_counts.max()),
+        default=None
+    )
+    if most_common:
+        insights.append({
+            "type": "preferred_workout",
+            "message": f"Your most common workout type is {most_common}",
+            "data": {"workout_type": most_common}
+        })
+    
+    # Consistency score
+    if count > 14:
+        last_14_days = (now or datetime.utcnow()) - timedelta(days=14)
+        recent_workouts = int((columns["created_at"] >= epoch_seconds(last_14_days)).sum())
+        consistency = (recent_workouts / 14) * 100
+        
+        insights.append({
+            "type": "consistency",
+            "message": f"Your workout consistency is {round(consistency, 1)}%",
+            "data": {"consistency_score": round(consistency, 2)}
+        })
+    
+    return {"insights": insights}
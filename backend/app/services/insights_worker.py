@@ -0,0 +1,185 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+from app.core.config import settings
+from app.services.async_firestore_service import AsyncFirestoreService, async_firestore_service
+from app.services.firestore_service import WORKOUTS_COLLECTION
+from app.services.timeseries_store import TimeSeriesStore, timeseries_store
+
+logger = logging.getLogger(__name__)
+
+
+class InsightsWorker:
+    """
+    Keeps each user's stored workout insights document up to date.
+
+    Workout write routes call ``schedule(user_id)``; a user's refresh runs
+    ``debounce_seconds`` after their last write, so a burst of writes costs
+    one recomputation. Refreshes are run by a small pool of asyncio tasks
+    reading one shared queue. ``get`` serves the stored document and only
+    recomputes inline when it is missing, was computed at an older workouts
+    version, or is older than ``max_age_seconds``.
+    """
+
+    def __init__(
+        self,
+        service: AsyncFirestoreService,
+        store: TimeSeriesStore,
+        workers: int,
+        debounce_seconds: float,
+        max_age_seconds: float
+    ):
+        self._service = service
+        self._store = store
+        self.workers = workers
+        self.debounce_seconds = debounce_seconds
+        self.max_age_seconds = max_age_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: Set[str] = set()
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[str, Set[asyncio.Future]] = {}
+        self.scheduled = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.served = 0
+        self.inline = 0
+
+    async def start(self):
+        """Start the worker pool (called on application startup)"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Drop pending refreshes and stop the pool (called on application shutdown)"""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._queued.clear()
+
+    def schedule(self, user_id: str) -> None:
+        """Refresh a user's insights once their workout writes go quiet"""
+        if self._queue is None:
+            # Not started (scripts); stale documents are recomputed on read
+            return
+        timer = self._timers.pop(user_id, None)
+        if timer is not None:
+            timer.cancel()
+        self._timers[user_id] = asyncio.get_running_loop()\
+            .call_later(self.debounce_seconds, self._enqueue, user_id)
+        self.scheduled += 1
+
+    async def cancel(self, user_id: str) -> None:
+        """
+        Drop a user's pending refresh and wait for any running one to finish
+        (their data is being deleted)
+        """
+        timer = self._timers.pop(user_id, None)
+        if timer is not None:
+            timer.cancel()
+        self._queued.discard(user_id)
+        running = list(self._running.get(user_id, ()))
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    def _enqueue(self, user_id: str) -> None:
+        self._timers.pop(user_id, None)
+        if self._queue is not None and user_id not in self._queued:
+            self._queued.add(user_id)
+            self._queue.put_nowait(user_id)
+
+    async def _run(self):
+        while True:
+            user_id = await self._queue.get()
+            if user_id not in self._queued:
+                # Cancelled while waiting in the queue
+                self._queue.task_done()
+                continue
+            # A write arriving while this refresh runs schedules another one
+            self._queued.discard(user_id)
+            try:
+                await self.refresh(user_id)
+            except Exception:
+                self.failed += 1
+                logger.exception("Refreshing workout insights for user %s failed", user_id)
+            finally:
+                self._queue.task_done()
+
+    async def refresh(self, user_id: str, user: Optional[Dict] = None) -> Dict:
+        """Recompute and store a user's insights; returns the response body"""
+        task = asyncio.ensure_future(self._refresh(user_id, user))
+        running = self._running.setdefault(user_id, set())
+        running.add(task)
+
+        def done(_):
+            running.discard(task)
+            if not running and self._running.get(user_id) is running:
+                del self._running[user_id]
+
+        task.add_done_callback(done)
+        return await task
+
+    async def _refresh(self, user_id: str, user: Optional[Dict]) -> Dict:
+        if user is None:
+            user = await self._service.get_user_by_id(user_id) or {}
+        # Read before the series, so the stored version is never newer than the data
+        version = (user.get("data_versions") or {}).get(WORKOUTS_COLLECTION, 0)
+
+        def compute() -> Dict:
+            from app.services.insights import workout_insights
+            return workout_insights(self._store.get(user_id, user).workouts)
+
+        result = await asyncio.to_thread(compute)
+        await self._service.save_workout_insights(user_id, result, version)
+        self.refreshed += 1
+        return result
+
+    def _is_fresh(self, stored: Optional[Dict], user: Dict) -> bool:
+        if not stored or "result" not in stored:
+            return False
+        if stored.get("workouts_version") != (user.get("data_versions") or {}).get(WORKOUTS_COLLECTION, 0):
+            return False
+        computed_at = stored.get("computed_at")
+        if not isinstance(computed_at, datetime):
+            return False
+        # Firestore hands datetimes back timezone-aware (UTC)
+        age = datetime.utcnow() - computed_at.replace(tzinfo=None)
+        return age.total_seconds() <= self.max_age_seconds
+
+    async def get(self, user_id: str, user: Dict) -> Dict:
+        """A user's insights from the stored document, recomputed inline if stale"""
+        stored = await self._service.get_workout_insights(user_id)
+        if self._is_fresh(stored, user):
+            self.served += 1
+            return stored["result"]
+        self.inline += 1
+        return await self.refresh(user_id, user)
+
+    def stats(self) -> Dict:
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "debouncing": len(self._timers),
+            "scheduled": self.scheduled,
+            "refreshed": self.refreshed,
+            "failed": self.failed,
+            "served": self.served,
+            "inline": self.inline
+        }
+
+
+insights_worker = InsightsWorker(
+    async_firestore_service,
+    timeseries_store,
+    workers=settings.INSIGHTS_WORKERS,
+    debounce_seconds=settings.INSIGHTS_DEBOUNCE_SECONDS,
+    max_age_seconds=settings.INSIGHTS_MAX_AGE_SECONDS
+)
@@ -0,0 +1,297 @@
+"""
+In-process background jobs for expensive endpoints.
+
+Instead of holding a request open for seconds, a route hands its computation
+to ``job_queue.respond``: a result already computed for the same user,
+endpoint, parameters and ``data_version`` is returned straight away (200);
+otherwise a job is queued and the client gets ``202`` with the job id, then
+polls (or long-polls) ``GET /jobs/{id}`` for the result. Routes with side
+effects (account deletion) call ``submit`` and ``accepted`` directly, and may
+report ``progress`` on the job while it runs.
+
+Job state lives in a ``JobBackend``. ``InMemoryJobBackend`` keeps it in this
+process; a shared store (Redis, Firestore) can implement the same four
+methods. The computations themselves always run on this process's worker
+pool, so a job can only be executed by the worker that accepted it.
+"""
+import asyncio
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.services.async_firestore_service import AsyncFirestoreService, async_firestore_service
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class Job:
+    def __init__(self, user_id: str, endpoint: str, params: Dict, key: Hashable):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.endpoint = endpoint
+        self.params = params
+        self.key = key
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        # Set by long-running jobs while they work, e.g. {"deleted": 1500}
+        self.progress: Optional[Dict] = None
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "endpoint": self.endpoint,
+            "params": self.params,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class JobBackend(ABC):
+    """
+    Storage for job state and finished results. ``save`` is called on every
+    status change; a job must stay readable until it finishes, and only
+    then may its retention period start.
+    """
+
+    @abstractmethod
+    def save(self, job: Job) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    def get_result(self, key: Hashable) -> Any:
+        ...
+
+    @abstractmethod
+    def put_result(self, key: Hashable, result: Any) -> None:
+        ...
+
+    def stats(self) -> Dict:
+        return {}
+
+
+class InMemoryJobBackend(JobBackend):
+    """
+    Jobs and results kept in this process. Queued and running jobs are held
+    until they finish, however long that takes; finished jobs and results
+    are then kept for ``ttl`` seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._pending: Dict[str, Job] = {}
+        self._jobs = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._results = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def save(self, job: Job) -> None:
+        if job.done:
+            # The retention period starts when the job finishes
+            self._pending.pop(job.id, None)
+            self._jobs.set(job.id, job)
+        else:
+            self._pending[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self._pending.get(job_id)
+        return job if job is not None else self._jobs.get(job_id)
+
+    def get_result(self, key: Hashable) -> Any:
+        return self._results.get(key)
+
+    def put_result(self, key: Hashable, result: Any) -> None:
+        self._results.set(key, result)
+
+    def stats(self) -> Dict:
+        return {"pending": len(self._pending), "jobs": len(self._jobs), "results": self._results.stats()}
+
+
+def prefers_async(request: Request) -> bool:
+    """Whether the client asked for a 202 + job (``Prefer: respond-async``, RFC 7240)"""
+    return "respond-async" in request.headers.get("prefer", "").lower()
+
+
+class JobQueue:
+    """
+    asyncio queue of jobs drained by a pool of ``workers`` tasks.
+
+    Submitting a job that is already queued or running for the same key
+    returns the existing job instead of starting a second one.
+    """
+
+    def __init__(self, service: AsyncFirestoreService, backend: JobBackend, workers: int):
+        self._service = service
+        self.backend = backend
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # key -> id of the queued/running job for it; job id -> finished signal
+        self._active: Dict[Hashable, str] = {}
+        self._finished: Dict[str, asyncio.Event] = {}
+        self.submitted = 0
+        self.coalesced = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.cached = 0
+
+    async def start(self):
+        """Start the worker pool (called on application startup)"""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stop the worker pool; queued jobs are dropped (called on application shutdown)"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    @staticmethod
+    def result_key(user_id: str, endpoint: str, params: Dict, version: int) -> Hashable:
+        return (user_id, endpoint, tuple(sorted(params.items())), version)
+
+    def submit(
+        self,
+        user_id: str,
+        endpoint: str,
+        params: Dict,
+        version: int,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Job:
+        """Queue ``compute`` as a job, or return the job already running for it"""
+        if self._queue is None:
+            raise RuntimeError("job queue is not running")
+
+        key = self.result_key(user_id, endpoint, params, version)
+        active_id = self._active.get(key)
+        active = self.backend.get(active_id) if active_id else None
+        if active is not None and not active.done:
+            self.coalesced += 1
+            return active
+
+        job = Job(user_id, endpoint, params, key)
+        self.backend.save(job)
+        self._active[key] = job.id
+        self._finished[job.id] = asyncio.Event()
+        self._queue.put_nowait((job, compute))
+        self.submitted += 1
+        return job
+
+    async def _run(self):
+        while True:
+            job, compute = await self._queue.get()
+            job.status = RUNNING
+            job.started_at = datetime.utcnow()
+            self.backend.save(job)
+            try:
+                job.result = jsonable_encoder(await compute())
+                job.status = SUCCEEDED
+                self.backend.put_result(job.key, job.result)
+                self.succeeded += 1
+            except Exception:
+                logger.exception("Job %s (%s) failed", job.id, job.endpoint)
+                job.status = FAILED
+                job.error = "Job failed"
+                self.failed += 1
+            finally:
+                job.finished_at = datetime.utcnow()
+                self.backend.save(job)
+                if self._active.get(job.key) == job.id:
+                    del self._active[job.key]
+                self._finished.pop(job.id).set()
+                self._queue.task_done()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.backend.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """Long-poll: the job once it finishes, or as it stands after ``timeout`` seconds"""
+        finished = self._finished.get(job_id)
+        if finished is not None:
+            try:
+                await asyncio.wait_for(finished.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.backend.get(job_id)
+
+    async def respond(
+        self,
+        request: Request,
+        user_id: str,
+        endpoint: str,
+        params: Dict,
+        compute: Callable[[Dict], Awaitable[Any]]
+    ) -> Response:
+        """
+        200 with the cached result for the user's current ``data_version``,
+        else 202 with the id of the job computing it. ``compute`` receives
+        the user document read for the version.
+        """
+        user = await self._service.get_user_by_id(user_id) or {}
+        version = user.get("data_version", 0)
+
+        result = self.backend.get_result(self.result_key(user_id, endpoint, params, version))
+        if result is not None:
+            self.cached += 1
+            return JSONResponse(result)
+
+        job = self.submit(user_id, endpoint, params, version, lambda: compute(user))
+        return self.accepted(job)
+
+    @staticmethod
+    def accepted(job: Job) -> JSONResponse:
+        """202 pointing the client at ``GET /jobs/{id}``"""
+        status_url = f"{settings.API_V1_PREFIX}/jobs/{job.id}"
+        return JSONResponse(
+            {"job_id": job.id, "status": job.status, "status_url": status_url},
+            status_code=status.HTTP_202_ACCEPTED,
+            headers={"Location": status_url}
+        )
+
+    def stats(self) -> Dict:
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "active": len(self._active),
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "cached": self.cached,
+            "backend": self.backend.stats()
+        }
+
+
+job_queue = JobQueue(
+    async_firestore_service,
+    InMemoryJobBackend(maxsize=settings.JOB_MAX_STORED, ttl=settings.JOB_TTL_SECONDS),
+    workers=settings.JOB_WORKERS
+)
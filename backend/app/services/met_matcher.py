@@ -0,0 +1,125 @@
+"""
+Activity -> MET lookup backed by a table of activity phrases.
+
+All phrases are compiled once into an Aho-Corasick automaton, so matching a
+description costs one pass over its characters regardless of how many
+activities the table holds. Phrases only match whole words ("row" does not
+match "rowing" or "arrow"). When several phrases occur in a description the
+longest one wins ("running uphill" beats "running").
+"""
+import csv
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# Used when no activity table is configured or found
+DEFAULT_ACTIVITIES: Dict[str, float] = {
+    "running": 9.8,
+    "jogging": 7.0,
+    "cycling": 7.5,
+    "biking": 7.5,
+    "swimming": 8.0,
+    "walking": 3.8,
+    "strength": 5.0,
+    "lifting": 5.0,
+    "gym": 5.0,
+    "yoga": 2.5,
+    "pilates": 3.0,
+    "hiit": 8.0,
+    "cardio": 7.0,
+    "basketball": 6.5,
+    "soccer": 7.0,
+    "tennis": 7.0,
+    "hiking": 6.0,
+    "dancing": 5.0
+}
+
+
+def normalize_activity(text: str) -> str:
+    """Lowercase and reduce punctuation to single spaces ("Push-ups" -> "push ups")"""
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+def load_activities(csv_path: str) -> Dict[str, float]:
+    """Read an ``activity,met`` CSV"""
+    activities = {}
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            activities[row["activity"]] = float(row["met"])
+    return activities
+
+
+class MetMatcher:
+    """Aho-Corasick automaton over normalized activity phrases"""
+
+    def __init__(self, activities: Dict[str, float]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # (phrase length, MET, phrase) for every phrase ending at a node,
+        # longest first, including those reached through failure links
+        self._outputs: List[List[Tuple[int, float, str]]] = [[]]
+
+        for phrase, met in activities.items():
+            self._add(normalize_activity(phrase), met)
+        self._link()
+        self.size = len(activities)
+
+    @classmethod
+    def from_csv(cls, csv_path: Optional[str]) -> "MetMatcher":
+        """Load the activity table, falling back to the built-in defaults"""
+        if csv_path and os.path.exists(csv_path):
+            return cls(load_activities(csv_path))
+        return cls(DEFAULT_ACTIVITIES)
+
+    def _add(self, phrase: str, met: float) -> None:
+        if not phrase:
+            return
+        node = 0
+        for char in phrase:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = next_node
+        self._outputs[node] = [(len(phrase), met, phrase)]
+
+    def _link(self) -> None:
+        """Breadth-first pass setting failure links and merging outputs"""
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+                queue.append(child)
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int, float, str]]:
+        """Yield ``(start, length, met, phrase)`` for phrases spanning whole words"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if end < len(text) and text[end] != " ":
+                continue
+            for length, met, phrase in outputs[node]:
+                start = end - length
+                if start == 0 or text[start - 1] == " ":
+                    yield start, length, met, phrase
+
+    def match(self, activity: str) -> Optional[Tuple[str, float]]:
+        """Longest activity phrase in ``activity`` as ``(phrase, met)``, earliest on ties"""
+        best = None
+        for start, length, met, phrase in self.iter_matches(normalize_activity(activity)):
+            if best is None or length > best[0]:
+                best = (length, phrase, met)
+        return (best[1], best[2]) if best else None
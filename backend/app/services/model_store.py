@@ -0,0 +1,111 @@
+import os
+import pickle
+import shutil
+import threading
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import quote
+from app.core.cache import LRUCache
+from app.core.config import settings
+
+# (user_id, model name, data version)
+ModelKey = Tuple[str, str, int]
+
+
+class ModelStore:
+    """
+    Two-tier store for fitted per-user models.
+
+    Entries are keyed by the data version they were fitted on, so a write
+    that bumps the version makes the old entry unreachable instead of
+    requiring an explicit invalidation. Tier 1 is an in-process LRU bounded
+    by ``memory_bytes``; tier 2 is one joblib file per user and model under
+    ``path``, which survives restarts and is shared by every worker. Disk
+    hits are promoted into memory, and saving a new version removes the
+    files of older ones.
+    """
+
+    def __init__(self, path: Optional[str], memory_bytes: int):
+        self.path = path
+        self.memory = LRUCache(max_bytes=memory_bytes, sizeof=lambda model: len(pickle.dumps(model)))
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.fits = 0
+
+    def _dir(self, user_id: str) -> str:
+        return os.path.join(self.path, quote(user_id, safe=""))
+
+    def _file(self, key: ModelKey) -> str:
+        user_id, name, version = key
+        return os.path.join(self._dir(user_id), f"{quote(name, safe='')}.v{version}.joblib")
+
+    def get(self, key: ModelKey) -> Optional[Any]:
+        model = self.memory.get(key)
+        if model is not None or not self.path:
+            return model
+
+        import joblib  # deferred: pulls in numpy
+        try:
+            model = joblib.load(self._file(key))
+        except Exception:
+            # Missing, truncated or incompatible files are all just a miss
+            self.disk_misses += 1
+            return None
+
+        self.disk_hits += 1
+        self.memory.set(key, model)
+        return model
+
+    def put(self, key: ModelKey, model: Any) -> None:
+        self.fits += 1
+        self.memory.set(key, model)
+        if not self.path:
+            return
+
+        import joblib
+        user_id, name, version = key
+        directory = self._dir(user_id)
+        target = self._file(key)
+        prefix = f"{quote(name, safe='')}.v"
+        with self._lock:
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{target}.tmp{os.getpid()}"
+            joblib.dump(model, tmp_path, compress=3)
+            os.replace(tmp_path, target)
+
+            # Older versions can never be requested again
+            for filename in os.listdir(directory):
+                if filename.startswith(prefix) and os.path.join(directory, filename) != target:
+                    try:
+                        os.remove(os.path.join(directory, filename))
+                    except OSError:
+                        pass
+
+        # Same for older versions held in memory
+        self.memory.discard_where(lambda other: other[:2] == key[:2] and other[2] != version)
+
+    def discard_user(self, user_id: str) -> None:
+        """Forget every model fitted for a user, in memory and on disk"""
+        self.memory.discard_where(lambda key: key[0] == user_id)
+        if self.path:
+            with self._lock:
+                shutil.rmtree(self._dir(user_id), ignore_errors=True)
+
+    def stats(self) -> Dict:
+        """Hit rate across both tiers, plus how many models were fitted"""
+        memory = self.memory.stats()
+        lookups = memory["hits"] + memory["misses"]
+        hits = memory["hits"] + self.disk_hits
+        return {
+            "memory": memory,
+            "disk": {
+                "enabled": bool(self.path),
+                "hits": self.disk_hits,
+                "misses": self.disk_misses
+            },
+            "fits": self.fits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
+
+
+model_store = ModelStore(settings.MODEL_PATH, settings.MODEL_CACHE_MEMORY_BYTES)
@@ -0,0 +1,291 @@
+import json
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+from app.core.cache import LRUCache
+
+# Words and symbols that may join the foods of one query ("2 eggs and toast")
+_SEPARATORS = {",", ";", "+", "&", "and", "with", "plus"}
+_TOKEN = re.compile(r"[,;+&]|[^\s,;+&]+")
+_NUMBER = re.compile(r"^(\d+(?:\.\d+)?)(?:/(\d+))?$")
+# An amount written without a space ("200g")
+_NUMBER_UNIT = re.compile(r"^(\d+(?:\.\d+)?)([a-z]+)$")
+# Units whose weight is known without asking upstream
+_GRAMS_PER_UNIT = {
+    "g": 1.0, "gram": 1.0, "grams": 1.0, "kg": 1000.0,
+    "oz": 28.3495, "ounce": 28.3495, "ounces": 28.3495,
+    "lb": 453.592, "lbs": 453.592, "pound": 453.592, "pounds": 453.592
+}
+# Measures whose weight depends on the food; learned from upstream answers
+_MEASURES = {
+    "cup", "cups", "tbsp", "tablespoon", "tablespoons", "tsp", "teaspoon", "teaspoons",
+    "slice", "slices", "piece", "pieces", "serving", "servings", "bowl", "bowls",
+    "glass", "glasses", "can", "cans", "scoop", "scoops", "ml", "l", "liter", "liters"
+}
+# Unit of a bare count ("2 eggs") and of a food named without any amount
+COUNT = "#"
+DEFAULT = ""
+# SQLite tables: queries -> upstream items, food names -> learned foods
+_QUERIES = "nutrition_items"
+_FOODS = "nutrition_foods"
+
+
+def normalize_query(query: str) -> str:
+    """
+    Cache key for a free-text food query: lowercased with whitespace
+    collapsed. The query is otherwise kept whole, quantities included, since
+    CalorieNinjas parses "2 eggs" or "mac and cheese" itself.
+    """
+    return " ".join(query.lower().split())
+
+
+def tokenize(query: str) -> List[str]:
+    return _TOKEN.findall(normalize_query(query))
+
+
+def _number(token: str) -> Optional[float]:
+    if token in ("a", "an"):
+        return 1.0
+    match = _NUMBER.match(token)
+    if match is None:
+        return None
+    value = float(match.group(1))
+    if match.group(2):
+        denominator = float(match.group(2))
+        return value / denominator if denominator else None
+    return value
+
+
+def parse_amount(tokens: List[str]) -> Tuple[float, str, str]:
+    """
+    Split one food's tokens into ``(quantity, unit, name)``: "2 cups milk" is
+    ``(2, "cups", "milk")``, "2 eggs" ``(2, COUNT, "eggs")`` and "toast"
+    ``(1, DEFAULT, "toast")``. Names are kept as written (no stemming).
+    """
+    glued = _NUMBER_UNIT.match(tokens[0])
+    if glued and (glued.group(2) in _GRAMS_PER_UNIT or glued.group(2) in _MEASURES):
+        tokens = [glued.group(1), glued.group(2)] + tokens[1:]
+    quantity = _number(tokens[0]) if len(tokens) > 1 else None
+    if quantity is None:
+        return 1.0, DEFAULT, " ".join(tokens)
+    rest = tokens[1:]
+    if len(rest) > 1 and (rest[0] in _GRAMS_PER_UNIT or rest[0] in _MEASURES):
+        unit, rest = rest[0], rest[1:]
+        if len(rest) > 1 and rest[0] == "of":
+            rest = rest[1:]
+        return quantity, unit, " ".join(rest)
+    return quantity, COUNT, " ".join(rest)
+
+
+def split_foods(tokens: List[str]) -> List[List[str]]:
+    """Split on every separator; only used to line a query up with upstream's items"""
+    foods, current = [], []
+    for token in tokens:
+        if token in _SEPARATORS:
+            if current:
+                foods.append(current)
+            current = []
+        else:
+            current.append(token)
+    if current:
+        foods.append(current)
+    return foods
+
+
+def scale_item(item: Dict, grams: float) -> Dict:
+    """An upstream item's numeric values rescaled to ``grams``"""
+    serving = item.get("serving_size_g") or 0
+    if not serving:
+        return dict(item)
+    factor = grams / serving
+    scaled = {
+        field: round(value * factor, 2) if isinstance(value, (int, float)) and not isinstance(value, bool) else value
+        for field, value in item.items()
+    }
+    scaled["serving_size_g"] = round(grams, 2)
+    return scaled
+
+
+class NutritionCache:
+    """
+    Two-tier cache of upstream nutrition answers.
+
+    Whole queries are cached under their normalized text. Every item
+    CalorieNinjas returns is also kept as a food: its nutrients plus the
+    grams per unit the query used (per egg, per cup, or the default serving
+    when no amount was given). ``lookup`` answers a new query from foods
+    already seen, so "2 eggs and toast" reuses earlier "2 eggs" and "toast"
+    lookups and "3 eggs" scales the learned per-egg weight. Foods are matched
+    longest name first, so "mac and cheese", once seen, is never split.
+
+    Tier 1 is an in-process LRU bounded by ``memory_bytes``; tier 2 is an
+    optional SQLite file that survives restarts and is shared by every worker
+    on the host. Disk hits are promoted into memory. The file is opened on
+    first use, and every method that may touch it blocks, so async callers
+    run them with ``asyncio.to_thread``.
+    """
+
+    def __init__(self, memory_bytes: int, path: Optional[str] = None):
+        self.memory = LRUCache(max_bytes=memory_bytes, sizeof=lambda value: len(json.dumps(value)))
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+        self.disk_hits = 0
+        self.disk_misses = 0
+        self.lookups = 0
+        self.hits = 0
+        self.composed = 0
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """The SQLite tier, opened on first use; call with ``_lock`` held"""
+        if self._db is None and self.path:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(f"CREATE TABLE IF NOT EXISTS {_QUERIES} (key TEXT PRIMARY KEY, items TEXT NOT NULL)")
+            db.execute(f"CREATE TABLE IF NOT EXISTS {_FOODS} (key TEXT PRIMARY KEY, food TEXT NOT NULL)")
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _read(self, table: str, key: str):
+        memory_key = (table, key)
+        value = self.memory.get(memory_key)
+        if value is not None or not self.path:
+            return value
+
+        with self._lock:
+            row = self._connect().execute(f"SELECT * FROM {table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.disk_misses += 1
+            return None
+
+        self.disk_hits += 1
+        value = json.loads(row[1])
+        self.memory.set(memory_key, value)
+        return value
+
+    def _write(self, table: str, rows: List[Tuple[str, object]]) -> None:
+        for key, value in rows:
+            self.memory.set((table, key), value)
+        if not self.path or not rows:
+            return
+        with self._lock:
+            db = self._connect()
+            db.executemany(f"INSERT OR REPLACE INTO {table} VALUES (?, ?)",
+                           [(key, json.dumps(value)) for key, value in rows])
+            db.commit()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Upstream items cached for exactly this normalized query"""
+        return self._read(_QUERIES, key)
+
+    def cached(self, key: str) -> Optional[List[Dict]]:
+        """A query's items from the memory tier only; never blocks on disk"""
+        items = self.memory.peek((_QUERIES, key))
+        if items is not None:
+            self.lookups += 1
+            self.hits += 1
+        return items
+
+    def food(self, name: str) -> Optional[Dict]:
+        return self._read(_FOODS, name)
+
+    def lookup(self, key: str) -> Optional[List[Dict]]:
+        """Items for a query: cached for the query itself, or composed from known foods"""
+        self.lookups += 1
+        items = self.get(key)
+        if items is None:
+            items = self.compose(tokenize(key))
+            if items is not None:
+                self.composed += 1
+        if items is not None:
+            self.hits += 1
+        return items
+
+    def compose(self, tokens: List[str]) -> Optional[List[Dict]]:
+        """
+        Cover ``tokens`` with known foods joined by separators, using as few
+        (so as long) foods as possible. None unless every part is known, in a
+        unit whose weight is known for that food.
+        """
+        n = len(tokens)
+        if not n:
+            return None
+        # best[i]: fewest foods covering tokens[:i] (ending before a separator), with their items
+        best: List[Optional[Tuple[int, List[Dict]]]] = [None] * (n + 1)
+        best[0] = (0, [])
+        for start in range(n):
+            if best[start] is None or tokens[start] in _SEPARATORS:
+                continue
+            for end in range(n, start, -1):
+                if end < n and tokens[end] not in _SEPARATORS:
+                    continue
+                item = self._resolve(tokens[start:end])
+                if item is None:
+                    continue
+                # Skip the separator(s) after this food
+                after = end
+                while after < n and tokens[after] in _SEPARATORS:
+                    after += 1
+                count, items = best[start]
+                if best[after] is None or best[after][0] > count + 1:
+                    best[after] = (count + 1, items + [item])
+        return best[n][1] if best[n] is not None else None
+
+    def _resolve(self, tokens: List[str]) -> Optional[Dict]:
+        quantity, unit, name = parse_amount(tokens)
+        food = self.food(name)
+        if food is None:
+            return None
+        grams_per_unit = _GRAMS_PER_UNIT.get(unit) or food["grams"].get(unit)
+        if not grams_per_unit:
+            return None
+        return scale_item(food["item"], quantity * grams_per_unit)
+
+    def set(self, key: str, items: List[Dict]) -> None:
+        """Cache upstream's answer for a query and learn the foods in it"""
+        self._write(_QUERIES, [(key, items)])
+
+        tokens = tokenize(key)
+        foods = split_foods(tokens)
+        if len(foods) > 1 and len(items) == 1:
+            # One dish whose name contains a separator ("mac and cheese")
+            while tokens and tokens[-1] in _SEPARATORS:
+                tokens = tokens[:-1]
+            while tokens and tokens[0] in _SEPARATORS:
+                tokens = tokens[1:]
+            foods = [tokens]
+        if len(foods) != len(items):
+            # Can't tell which part of the query each item came from
+            return
+
+        learned = {}
+        for tokens, item in zip(foods, items):
+            serving = item.get("serving_size_g")
+            if not tokens or not serving:
+                continue
+            quantity, unit, name = parse_amount(tokens)
+            food = learned.get(name) or self.food(name) or {"item": item, "grams": {}}
+            food = {"item": item, "grams": dict(food["grams"])}
+            if unit not in _GRAMS_PER_UNIT and quantity > 0:
+                food["grams"][unit] = serving / quantity
+            learned[name] = food
+        self._write(_FOODS, list(learned.items()))
+
+    def stats(self) -> Dict:
+        """Hit rate and eviction counters for both tiers"""
+        memory = self.memory.stats()
+        return {
+            "memory": memory,
+            "disk": {
+                "enabled": bool(self.path),
+                "open": self._db is not None,
+                "hits": self.disk_hits,
+                "misses": self.disk_misses
+            },
+            "lookups": self.lookups,
+            "composed": self.composed,
+            "hit_rate": round(self.hits / self.lookups, 4) if self.lookups else 0.0
+        }
@@ -0,0 +1,87 @@
+import hashlib
+import time
+from typing import Awaitable, Callable, Dict, Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.services.async_firestore_service import AsyncFirestoreService, async_firestore_service
+
+
+class ResponseCache:
+    """
+    Conditional GET support for per-user read endpoints.
+
+    The ETag of a response is a hash of the user, the request path and query
+    parameters, the user's overall ``data_version`` counter (bumped by every
+    write in FirestoreService) and the current time window. A request whose
+    ``If-None-Match`` matches gets a bodiless 304 after a single read of the
+    user document; otherwise the rendered body is served from an LRU keyed by
+    the same tag, and only computed on a miss.
+
+    The time window (``window_seconds``) bounds how stale a result built from
+    "the last N days" can get without any write; pick one that evenly
+    divides a day so no window spans UTC midnight.
+    """
+
+    def __init__(self, service: AsyncFirestoreService, max_bytes: int, window_seconds: int):
+        self._service = service
+        self.window_seconds = window_seconds
+        self._cache = LRUCache(max_bytes=max_bytes, sizeof=len)
+        self._inflight = SingleFlight()
+        self.not_modified = 0
+
+    def etag(self, request: Request, user_id: str, version: int) -> str:
+        window = int(time.time() // self.window_seconds)
+        query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+        raw = f"{user_id}|{request.url.path}?{query}|{version}|{window}"
+        return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+    @staticmethod
+    def _matches(if_none_match: Optional[str], etag: str) -> bool:
+        if not if_none_match:
+            return False
+        # Weak comparison, as RFC 9110 requires for If-None-Match
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in tags)
+
+    async def respond(
+        self,
+        request: Request,
+        user_id: str,
+        compute: Callable[[Dict], Awaitable[Dict]]
+    ) -> Response:
+        """
+        Serve ``compute(user)`` for the current user with an ETag, answering
+        304 or from the cache when possible. ``compute`` receives the user
+        document that was read for the version check.
+        """
+        user = await self._service.get_user_by_id(user_id) or {}
+        etag = self.etag(request, user_id, user.get("data_version", 0))
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if self._matches(request.headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        body = self._cache.get(etag)
+        if body is None:
+            async def render() -> bytes:
+                rendered = JSONResponse(jsonable_encoder(await compute(user))).body
+                self._cache.set(etag, rendered)
+                return rendered
+
+            body = await self._inflight.do(etag, render)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def stats(self) -> Dict:
+        return {**self._cache.stats(), "not_modified": self.not_modified}
+
+
+response_cache = ResponseCache(
+    async_firestore_service,
+    max_bytes=settings.RESPONSE_CACHE_BYTES,
+    window_seconds=settings.RESPONSE_CACHE_WINDOW_SECONDS
+)
@@ -0,0 +1,193 @@
+"""
+Columnar, per-user copies of workout and nutrition history.
+
+Each series keeps one NumPy array per numeric field (dates as UTC epoch
+seconds) plus categorical codes for workout types and meal types, so the
+analytics and ML routes can filter and aggregate with vectorized operations
+instead of building a DataFrame from Firestore dicts on every request.
+Arrays grow by doubling, so appending a newly written document is cheap.
+"""
+import threading
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+SECONDS_PER_DAY = 86400.0
+
+# Naive datetimes are stored as UTC throughout the app
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = _EPOCH.replace(tzinfo=timezone.utc)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+def epoch_seconds(value: Optional[datetime]) -> float:
+    """UTC epoch seconds of a naive-UTC or aware datetime (NaN if missing)"""
+    if not isinstance(value, datetime):
+        return float("nan")
+    return (value - (_EPOCH if value.tzinfo is None else _EPOCH_UTC)).total_seconds()
+
+
+def utc_days(seconds: np.ndarray) -> np.ndarray:
+    """Whole UTC days since the epoch for an array of epoch seconds"""
+    return np.floor(seconds / SECONDS_PER_DAY).astype(np.int64)
+
+
+def day_to_date(day: int) -> date:
+    return date.fromordinal(_EPOCH_ORDINAL + int(day))
+
+
+def utc_weekdays(seconds: np.ndarray) -> np.ndarray:
+    """Day of the week (0 = Monday, as in ``WEEKDAYS``) for epoch seconds"""
+    # 1970-01-01 was a Thursday
+    return (utc_days(seconds) + 3) % 7
+
+
+class _Series(ABC):
+    """Growable set of equally long columns, one row per Firestore document"""
+
+    # (field name, dtype)
+    COLUMNS: tuple = ()
+    # Categorical column -> document field it is coded from
+    CATEGORIES: Dict[str, str] = {}
+
+    def __init__(self, version: int = 0, capacity: int = 64, since: Optional[float] = None):
+        self.version = version
+        # Oldest log date (epoch seconds) the series was loaded from; None
+        # when it holds the user's whole (most recent) history
+        self.since = since
+        self.size = 0
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._data = {name: np.empty(capacity, dtype) for name, dtype in self.COLUMNS}
+        self.categories: Dict[str, List[str]] = {name: [] for name in self.CATEGORIES}
+        self._codes: Dict[str, Dict[str, int]] = {name: {} for name in self.CATEGORIES}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Dict], version: int = 0, since: Optional[float] = None) -> "_Series":
+        documents = list(documents)
+        series = cls(version=version, capacity=max(64, len(documents)), since=since)
+        for document in documents:
+            series._append(document)
+        return series
+
+    def covers(self, since: Optional[float]) -> bool:
+        """Whether every document logged at or after ``since`` (None: ever) is loaded"""
+        return self.since is None or (since is not None and self.since <= since)
+
+    @abstractmethod
+    def _row(self, document: Dict) -> Dict:
+        """Numeric column values for one document (categoricals are added by the caller)"""
+
+    def _code(self, column: str, value: Optional[str]) -> int:
+        value = str(value or "unknown")
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self.categories[column])
+            self.categories[column].append(value)
+        return code
+
+    def _append(self, document: Dict) -> bool:
+        doc_id = document.get("id")
+        if doc_id in self._rows:
+            return False
+
+        capacity = len(self._data[self.COLUMNS[0][0]])
+        if self.size == capacity:
+            for name in self._data:
+                grown = np.empty(max(1, 2 * capacity), self._data[name].dtype)
+                grown[:self.size] = self._data[name][:self.size]
+                self._data[name] = grown
+
+        row = self._row(document)
+        for column, field in self.CATEGORIES.items():
+            row[column] = self._code(column, document.get(field))
+        for name, value in row.items():
+            self._data[name][self.size] = value
+
+        self._rows[doc_id] = self.size
+        self.ids.append(doc_id)
+        self.size += 1
+        return True
+
+    def add(self, document: Dict) -> bool:
+        """Append a newly written document (ignored if already present)"""
+        with self._lock:
+            return self._append(document)
+
+    def remove(self, doc_id: str) -> bool:
+        """Drop a deleted document's row"""
+        with self._lock:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                return False
+            for name, values in self._data.items():
+                # Shift into a copy of the same capacity, so arrays handed out
+                # earlier stay intact and later appends need not grow again
+                shifted = np.empty_like(values)
+                shifted[:row] = values[:row]
+                shifted[row:self.size - 1] = values[row + 1:self.size]
+                self._data[name] = shifted
+            del self.ids[row]
+            for index in range(row, len(self.ids)):
+                self._rows[self.ids[index]] = index
+            self.size -= 1
+            return True
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Consistent views of every column, trimmed to the current size"""
+        with self._lock:
+            return {name: values[:self.size] for name, values in self._data.items()}
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        # Arrays plus a rough allowance for the id list and index
+        return sum(values.nbytes for values in self._data.values()) + 120 * len(self.ids)
+
+
+class WorkoutSeries(_Series):
+    COLUMNS = (
+        ("log_date", np.float64),
+        ("created_at", np.float64),
+        ("duration", np.float64),
+        ("calories_burned", np.float64),
+        ("workout_type", np.int32),
+    )
+    CATEGORIES = {"workout_type": "workout_type"}
+
+    def _row(self, document: Dict) -> Dict:
+        return {
+            "log_date": epoch_seconds(document.get("log_date")),
+            "created_at": epoch_seconds(document.get("created_at")),
+            "duration": document.get("duration", 0) or 0,
+            "calories_burned": document.get("calories_burned", 0) or 0,
+        }
+
+
+class NutritionSeries(_Series):
+    COLUMNS = (
+        ("log_date", np.float64),
+        ("created_at", np.float64),
+        ("calories", np.float64),
+        ("protein", np.float64),
+        ("carbs", np.float64),
+        ("fats", np.float64),
+        ("meal_type", np.int32),
+    )
+    CATEGORIES = {"meal_type": "meal_type"}
+
+    def _row(self, document: Dict) -> Dict:
+        return {
+            "log_date": epoch_seconds(document.get("log_date")),
+            "created_at": epoch_seconds(document.get("created_at")),
+            "calories": document.get("calories", 0) or 0,
+            "protein": document.get("protein", 0) or 0,
+            "carbs": document.get("carbs", 0) or 0,
+            "fats": document.get("fats", 0) or 0,
+        }
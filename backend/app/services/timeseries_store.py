@@ -0,0 +1,143 @@
+from datetime import datetime
+from typing import Dict, Optional
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.services.firestore_service import (
+    FirestoreService,
+    firestore_service,
+    NUTRITION_LOGS_COLLECTION,
+    WORKOUTS_COLLECTION,
+)
+
+
+class UserSeries:
+    """A user's cached workout and nutrition series (either may not be loaded yet)"""
+
+    def __init__(self):
+        self.workouts = None
+        self.nutrition = None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(series.nbytes for series in (self.workouts, self.nutrition) if series is not None)
+
+
+class TimeSeriesStore:
+    """
+    LRU cache of per-user columnar series, bounded by ``max_bytes``.
+
+    Each series remembers the ``data_versions`` counter it was loaded at.
+    Writes made through this process are appended to (or removed from) the
+    cached series and advance its version in step with Firestore; if the
+    stored counter has moved any other way (another worker, a script), the
+    series is reloaded on next use. numpy and the series classes are only
+    imported once a series is first loaded.
+
+    Routes that only look at a recent window pass ``since``; a user with no
+    cached series then gets just that window (a Firestore range query)
+    instead of their whole history. Every load reads at most ``max_rows``
+    documents.
+    """
+
+    def __init__(self, service: FirestoreService, max_bytes: int, max_rows: int):
+        self._service = service
+        self.max_rows = max_rows
+        self._cache = LRUCache(max_bytes=max_bytes, sizeof=lambda series: series.nbytes)
+        self.loads = 0
+        self.reuses = 0
+        self.appends = 0
+
+    def get(
+        self,
+        user_id: str,
+        user: Optional[Dict] = None,
+        workouts: bool = True,
+        nutrition: bool = False,
+        since: Optional[datetime] = None
+    ) -> UserSeries:
+        """
+        Up-to-date series for a user. Pass the already-loaded ``user``
+        document to skip re-reading it for the version check, and ``since``
+        when only documents logged from then on are needed.
+        """
+        if user is None:
+            user = self._service.get_user_by_id(user_id) or {}
+        versions = user.get("data_versions") or {}
+
+        cached = self._cache.get(user_id) or UserSeries()
+
+        if workouts:
+            cached.workouts = self._fresh(
+                cached.workouts, versions.get(WORKOUTS_COLLECTION, 0), since,
+                lambda: self._service.get_user_workouts_between(user_id, start=since, limit=self.max_rows),
+                "WorkoutSeries"
+            )
+        if nutrition:
+            cached.nutrition = self._fresh(
+                cached.nutrition, versions.get(NUTRITION_LOGS_COLLECTION, 0), since,
+                lambda: self._service.get_user_nutrition_logs_between(user_id, start=since, limit=self.max_rows),
+                "NutritionSeries"
+            )
+
+        # Re-inserting refreshes the entry's size after loads and appends
+        self._cache.set(user_id, cached)
+        return cached
+
+    def _fresh(self, series, version: int, since: Optional[datetime], fetch, kind: str):
+        from app.services import timeseries
+        start = timeseries.epoch_seconds(since) if since is not None else None
+        if series is not None and series.version == version and series.covers(start):
+            self.reuses += 1
+            return series
+
+        # The version is read before the documents, so a concurrent write can
+        # only make the loaded series newer than its version, never staler
+        self.loads += 1
+        return getattr(timeseries, kind).from_documents(fetch(), version=version, since=start)
+
+    # ============ WRITE HOOKS ============
+    # Call these after the corresponding Firestore write has committed.
+
+    def _apply(self, user_id: str, attribute: str, change) -> None:
+        cached = self._cache.peek(user_id)
+        series = getattr(cached, attribute, None) if cached else None
+        if series is None:
+            return
+        change(series)
+        # Firestore incremented the counter by one for this write
+        series.version += 1
+        self.appends += 1
+
+    def add_workout(self, user_id: str, workout: Dict) -> None:
+        self._apply(user_id, "workouts", lambda series: series.add(workout))
+
+    def remove_workout(self, user_id: str, workout_id: str) -> None:
+        self._apply(user_id, "workouts", lambda series: series.remove(workout_id))
+
+    def add_nutrition_log(self, user_id: str, log: Dict) -> None:
+        self._apply(user_id, "nutrition", lambda series: series.add(log))
+
+    def remove_nutrition_log(self, user_id: str, log_id: str) -> None:
+        self._apply(user_id, "nutrition", lambda series: series.remove(log_id))
+
+    def invalidate(self, user_id: str) -> None:
+        self._cache.pop(user_id)
+
+    def stats(self) -> Dict:
+        memory = self._cache.stats()
+        return {
+            "users": memory["size"],
+            "bytes": memory["bytes"],
+            "max_bytes": memory["max_bytes"],
+            "evictions": memory["evictions"],
+            "loads": self.loads,
+            "reuses": self.reuses,
+            "appends": self.appends
+        }
+
+
+timeseries_store = TimeSeriesStore(
+    firestore_service,
+    max_bytes=settings.TIMESERIES_CACHE_BYTES,
+    max_rows=settings.TIMESERIES_MAX_ROWS
+)
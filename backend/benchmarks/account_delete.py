@@ -0,0 +1,81 @@
+"""
+Benchmark: deleting a user with a long history from the in-memory Firestore
+stand-in (fixed per-RPC latency), one ``reference.delete()`` per document
+versus ``FirestoreService.delete_user``, which pages through the user's
+subcollections and commits deletes in parallel batches of 500. Each run
+starts from the same seeded history and checks nothing is left behind.
+
+Usage (from backend/):
+    python -m benchmarks.account_delete [--records 10000] [--latency 0.01]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from benchmarks.export_memory import USER_ID, seed
+from benchmarks.fake_firestore import install
+
+
+def _reseed(fake, records: int) -> int:
+    fake._collections.clear()
+    seed(fake, records)
+    fake._collections[("users",)] = {USER_ID: {"username": "benchmark", "data_version": 1}}
+    return sum(len(docs) for docs in fake._collections.values())
+
+
+def _remaining(fake) -> int:
+    return sum(len(docs) for docs in fake._collections.values())
+
+
+def one_by_one(service) -> int:
+    """What deleting an account would take with the old per-document deletes"""
+    from app.services.firestore_service import EXERCISES_COLLECTION, SUBCOLLECTIONS, USERS_COLLECTION
+
+    user_ref = service.db.collection(USERS_COLLECTION).document(USER_ID)
+    deleted = 0
+    for name in SUBCOLLECTIONS[USERS_COLLECTION]:
+        for doc in user_ref.collection(name).stream():
+            for exercise in doc.reference.collection(EXERCISES_COLLECTION).stream():
+                exercise.reference.delete()
+                deleted += 1
+            doc.reference.delete()
+            deleted += 1
+    user_ref.delete()
+    return deleted + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=10000)
+    parser.add_argument("--latency", type=float, default=0.01, help="fake Firestore RPC latency in seconds")
+    args = parser.parse_args()
+
+    fake = install(latency=args.latency)
+
+    from app.core.config import settings
+    from app.services.firestore_service import firestore_service
+
+    print(f"Firestore latency {args.latency * 1000:.0f} ms per RPC, "
+          f"{settings.DELETE_COMMIT_CONCURRENCY} parallel commits, "
+          f"{settings.FIRESTORE_FANOUT_CONCURRENCY} parallel listings")
+    runs = (
+        ("reference.delete() per document", lambda: one_by_one(firestore_service)),
+        ("delete_user (batched)", lambda: firestore_service.delete_user(USER_ID)),
+    )
+    for label, delete in runs:
+        documents = _reseed(fake, args.records)
+        fake.rpc_count = 0
+        started = time.perf_counter()
+        deleted = delete()
+        elapsed = time.perf_counter() - started
+        assert deleted == documents and not _remaining(fake), (deleted, documents, _remaining(fake))
+        print(f"  {label:<32} {deleted:>7} documents {elapsed:8.2f} s  "
+              f"{deleted / elapsed:8.0f} docs/s  {fake.rpc_count:>6} RPCs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: requests/second through the auth dependency, before and after the
+shared cached principal resolution.
+
+Usage (from backend/):
+    SECRET_KEY=bench python -m benchmarks.auth_dependency [--requests 2000] [--latency 0.005]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from benchmarks.fake_firestore import install
+
+
+async def _drive(app, path: str, token: str, total: int, concurrency: int) -> float:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    remaining = iter(range(total))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                response = await client.get(path, headers=headers)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.005, help="simulated Firestore RPC latency (s)")
+    args = parser.parse_args()
+
+    fake = install(latency=args.latency)
+
+    from fastapi import Depends, FastAPI, HTTPException
+    from app.api.deps import oauth2_scheme, get_current_user_id
+    from app.core.security import create_access_token, decode_access_token
+    from app.services.firestore_service import firestore_service
+
+    user_id = firestore_service.create_user({"username": "bench", "email": "bench@example.com"})
+
+    def legacy_get_current_user_id(token: str = Depends(oauth2_scheme)) -> str:
+        """The per-router dependency every authenticated route used to run"""
+        payload = decode_access_token(token)
+        if payload is None:
+            raise HTTPException(status_code=401, detail="Invalid token")
+        user = firestore_service.get_user_by_username(payload.get("sub"))
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user["id"]
+
+    app = FastAPI()
+
+    @app.get("/legacy")
+    async def legacy(uid: str = Depends(legacy_get_current_user_id)):
+        return {"user_id": uid}
+
+    @app.get("/cached")
+    async def cached(uid: str = Depends(get_current_user_id)):
+        return {"user_id": uid}
+
+    legacy_token = create_access_token({"sub": "bench"})
+    token = create_access_token({"sub": "bench", "uid": user_id})
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, Firestore latency {args.latency * 1000:.1f} ms")
+    for label, path, bearer in (("before (username lookup)", "/legacy", legacy_token),
+                                ("after (cached principal)", "/cached", token)):
+        fake.rpc_count = 0
+        rps = asyncio.run(_drive(app, path, bearer, args.requests, args.concurrency))
+        print(f"  {label:<28} {rps:>9.1f} req/s  {fake.rpc_count:>6} Firestore RPCs")
+
+
+if __name__ == "__main__":
+    main()
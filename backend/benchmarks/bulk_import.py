@@ -0,0 +1,111 @@
+"""
+Benchmark: loading a workout history one row at a time through
+``POST /workouts`` (sequential and concurrent) versus one streamed CSV upload
+to ``POST /import``, against the in-memory Firestore stand-in with a fixed
+per-RPC latency. Each run starts from an empty database and reports rows per
+second and the number of Firestore RPCs made.
+
+Usage (from backend/):
+    python -m benchmarks.bulk_import [--rows 5000] [--latency 0.01] [--concurrency 8]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from benchmarks.fake_firestore import install
+
+USER_ID = "benchmark-user"
+
+
+def _history(count: int, seed: int = 3):
+    rng = random.Random(seed)
+    start = datetime(2022, 1, 1)
+    for i in range(count):
+        yield {
+            "name": f"Workout {i}",
+            "workout_type": rng.choice(["cardio", "strength", "yoga", "hiit"]),
+            "duration": rng.randrange(15, 90),
+            "calories_burned": rng.randrange(80, 700),
+            "log_date": (start + timedelta(days=i // 2, hours=rng.randrange(6, 21))).isoformat()
+        }
+
+
+def _csv_chunks(rows, chunk_size: int = 64 * 1024):
+    fields = ("name", "workout_type", "duration", "calories_burned", "log_date")
+    buffer = [",".join(fields)]
+    size = 0
+    for row in rows:
+        line = ",".join(str(row[field]) for field in fields)
+        buffer.append(line)
+        size += len(line) + 1
+        if size >= chunk_size:
+            yield ("\n".join(buffer) + "\n").encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "\n".join(buffer).encode()
+
+
+async def _run(app, prefix: str, rows, mode: str, concurrency: int) -> float:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        if mode == "import":
+            async def body():
+                for chunk in _csv_chunks(rows):
+                    yield chunk
+
+            response = await client.post(f"{prefix}/import?kind=workouts", content=body(),
+                                         headers={"content-type": "text/csv"})
+            response.raise_for_status()
+            assert response.json()["imported"] == len(rows), response.json()
+        else:
+            remaining = iter(rows)
+
+            async def worker():
+                for row in remaining:
+                    response = await client.post(f"{prefix}/workouts", json=row)
+                    response.raise_for_status()
+
+            await asyncio.gather(*(worker() for _ in range(concurrency if mode == "concurrent" else 1)))
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.01, help="fake Firestore RPC latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=8, help="clients for the concurrent single-row run")
+    args = parser.parse_args()
+
+    fake = install(latency=args.latency)
+
+    from app.main import app
+    from app.api.deps import get_current_user_id
+    from app.core.config import settings
+
+    app.dependency_overrides[get_current_user_id] = lambda: USER_ID
+    rows = list(_history(args.rows))
+
+    print(f"{len(rows)} workouts, Firestore latency {args.latency * 1000:.0f} ms per RPC, "
+          f"import batch concurrency {settings.IMPORT_BATCH_CONCURRENCY}")
+    for label, mode in (("POST /workouts, sequential", "sequential"),
+                        (f"POST /workouts, {args.concurrency} concurrent", "concurrent"),
+                        ("POST /import (CSV)", "import")):
+        fake._collections.clear()
+        fake._collections[("users",)] = {USER_ID: {"username": "benchmark", "data_version": 0}}
+        fake.rpc_count = 0
+        elapsed = asyncio.run(_run(app, settings.API_V1_PREFIX, rows, mode, args.concurrency))
+        print(f"  {label:<30} {elapsed:8.2f} s  {len(rows) / elapsed:9.0f} rows/s  {fake.rpc_count:>6} RPCs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Memory check for the streaming export: seeds the in-memory Firestore
+stand-in with a synthetic history, then streams ``GET /export`` in both
+formats and measures the peak Python heap allocated while doing so
+(tracemalloc) and the growth of the process RSS. For comparison it also
+measures loading the same workouts as one list, the way
+``get_user_workouts(limit=...)`` does.
+
+Runs the export at a tenth of the size and at full size, and exits with
+status 1 if the full-size streaming peak exceeds ``--max-mb``, grows more
+than ``--max-growth`` times over the small run (memory should stay flat), or
+the full-size run grows RSS by more than ``--max-rss-mb``:
+    python -m benchmarks.export_memory [--records 100000] [--max-mb 16] [--max-rss-mb 32]
+
+``tests/test_export_memory.py`` runs the same check under pytest.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from benchmarks.fake_firestore import install
+
+USER_ID = "benchmark-user"
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def seed(fake, records: int, seed: int = 5) -> None:
+    """Write ``records`` documents straight into the fake: 60% workouts, the rest meals and goals"""
+    rng = random.Random(seed)
+    user = ("users", USER_ID)
+    start = datetime(2020, 1, 1)
+    workouts = fake._collections.setdefault(user + ("workouts",), {})
+    meals = fake._collections.setdefault(user + ("nutrition_logs",), {})
+    goals = fake._collections.setdefault(user + ("goals",), {})
+    for i in range(records):
+        when = start + timedelta(minutes=37 * i)
+        kind = i % 10
+        if kind < 6:
+            workout_id = f"w{i:08d}"
+            workouts[workout_id] = {
+                "user_id": USER_ID, "name": f"Workout {i}", "workout_type": rng.choice(["cardio", "strength"]),
+                "duration": rng.randrange(15, 90), "calories_burned": float(rng.randrange(80, 700)),
+                "notes": None, "log_date": when, "created_at": when
+            }
+            if kind == 0:
+                fake._collections[user + ("workouts", workout_id, "exercises")] = {
+                    f"e{i:08d}{n}": {"name": "squat", "sets": 5, "reps": 5, "weight": 60.0, "distance": None,
+                                     "workout_id": workout_id, "created_at": when}
+                    for n in range(3)
+                }
+        elif kind < 9 or i % 1000:
+            meals[f"n{i:08d}"] = {
+                "user_id": USER_ID, "meal_type": "lunch", "food_name": "chicken salad", "calories": 450.0,
+                "protein": 35.0, "carbs": 20.0, "fats": 18.0, "serving_size": "1 bowl",
+                "log_date": when, "created_at": when
+            }
+        else:
+            goals[f"g{i:08d}"] = {"user_id": USER_ID, "goal_type": "weight", "target_value": 70.0,
+                                  "is_achieved": False, "created_at": when}
+
+
+def measure(func):
+    """(result, seconds, peak traced bytes, RSS growth bytes) of one call"""
+    rss_before = _rss_bytes()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak, max(0, _rss_bytes() - rss_before)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100000)
+    parser.add_argument("--max-mb", type=float, default=16.0, help="allowed streaming peak at full size")
+    parser.add_argument("--max-growth", type=float, default=2.0, help="allowed full/small streaming peak ratio")
+    parser.add_argument("--max-rss-mb", type=float, default=32.0, help="allowed streaming RSS growth at full size")
+    args = parser.parse_args()
+
+    fake = install()
+
+    from app.services.exporter import stream_export
+    from app.services.firestore_service import firestore_service
+
+    def export(export_format):
+        return sum(len(chunk) for chunk in stream_export(firestore_service, USER_ID, export_format))
+
+    peaks = {}
+    rss_growth = {}
+    for records in (args.records // 10, args.records):
+        fake._collections.clear()
+        seed(fake, records)
+        print(f"{records} records")
+        for export_format in ("ndjson", "csv"):
+            size, elapsed, peak, rss = measure(lambda: export(export_format))
+            peaks[records, export_format] = peak
+            rss_growth[records, export_format] = rss
+            print(f"  stream {export_format:<6} {size / 2 ** 20:8.1f} MiB out in {elapsed:6.2f} s   "
+                  f"peak heap {peak / 2 ** 20:7.2f} MiB   RSS +{rss / 2 ** 20:6.1f} MiB")
+        workouts, elapsed, peak, rss = measure(
+            lambda: firestore_service.get_user_workouts_between(USER_ID, limit=records))
+        print(f"  list of {len(workouts)} workouts{'':<9} in {elapsed:6.2f} s   "
+              f"peak heap {peak / 2 ** 20:7.2f} MiB   RSS +{rss / 2 ** 20:6.1f} MiB")
+        del workouts
+
+    failed = False
+    for export_format in ("ndjson", "csv"):
+        small, full = peaks[args.records // 10, export_format], peaks[args.records, export_format]
+        if full > args.max_mb * 2 ** 20:
+            print(f"✗ {export_format} peak {full / 2 ** 20:.2f} MiB is over {args.max_mb} MiB")
+            failed = True
+        if full > args.max_growth * small:
+            print(f"✗ {export_format} peak grew {full / small:.1f}x with 10x the records")
+            failed = True
+        rss = rss_growth[args.records, export_format]
+        if rss > args.max_rss_mb * 2 ** 20:
+            print(f"✗ {export_format} RSS grew {rss / 2 ** 20:.1f} MiB, over {args.max_rss_mb} MiB")
+            failed = True
+    if not failed:
+        print("✓ streaming export memory stays flat")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
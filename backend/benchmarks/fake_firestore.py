@@ -0,0 +1,317 @@
+"""
+In-memory stand-in for the Firestore client, used by the benchmark scripts.
+
+Only the subset of the API that FirestoreService touches is implemented.
+Every RPC sleeps for ``latency`` seconds so the numbers resemble a networked
+database instead of a dict lookup.
+"""
+import itertools
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.cloud.firestore_v1 import Increment
+
+DOCUMENT_ID = "__name__"
+
+
+class FakeSnapshot:
+    def __init__(self, reference: "FakeDocument", data: Optional[Dict]):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> Optional[Dict]:
+        return dict(self._data) if self._data is not None else None
+
+    def get(self, field: str) -> Any:
+        if field == DOCUMENT_ID:
+            return self.id
+        return _get_path(self._data or {}, field)
+
+
+def _get_path(data: Dict, field: str) -> Any:
+    for part in field.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(part)
+    return data
+
+
+def _apply(data: Dict, updates: Dict, dotted: bool) -> None:
+    for field, value in updates.items():
+        parts = field.split(".") if dotted else [field]
+        target = data
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        if isinstance(value, Increment):
+            target[parts[-1]] = (target.get(parts[-1]) or 0) + value.value
+        elif isinstance(value, dict) and not dotted:
+            nested = target.setdefault(parts[-1], {})
+            _apply(nested, value, dotted=False)
+        else:
+            target[parts[-1]] = value
+
+
+class FakeDocument:
+    def __init__(self, client: "FakeFirestore", path: Tuple[str, ...]):
+        self._client = client
+        self.path = "/".join(path)
+        self._path = path
+        self.id = path[-1]
+
+    @property
+    def parent(self) -> "FakeCollection":
+        return FakeCollection(self._client, self._path[:-1])
+
+    def collection(self, name: str) -> "FakeCollection":
+        return FakeCollection(self._client, self._path + (name,))
+
+    def get(self) -> FakeSnapshot:
+        self._client._rpc()
+        return self._client._snapshot(self._path)
+
+    def set(self, data: Dict, merge: bool = False) -> None:
+        self._client._rpc()
+        self._client._write(self._path, data, merge=merge)
+
+    def update(self, data: Dict) -> None:
+        self._client._rpc()
+        self._client._update(self._path, data)
+
+    def delete(self) -> None:
+        self._client._rpc()
+        self._client._delete(self._path)
+
+
+class FakeQuery:
+    def __init__(self, client: "FakeFirestore", parent: Tuple[str, ...], group: bool = False):
+        self._client = client
+        self._parent = parent
+        self._group = group
+        self._filters: List[Tuple[str, str, Any]] = []
+        self._orders: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+        self._start_after: Optional[Any] = None
+        self._select: Optional[List[str]] = None
+
+    def _copy(self) -> "FakeQuery":
+        query = FakeQuery(self._client, self._parent, self._group)
+        query._filters = list(self._filters)
+        query._orders = list(self._orders)
+        query._limit = self._limit
+        query._start_after = self._start_after
+        query._select = self._select
+        return query
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None) -> "FakeQuery":
+        query = self._copy()
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        query._filters.append((field_path, op_string, value))
+        return query
+
+    def order_by(self, field_path: str, direction: str = "ASCENDING") -> "FakeQuery":
+        query = self._copy()
+        query._orders.append((str(field_path), direction == "DESCENDING"))
+        return query
+
+    def select(self, field_paths) -> "FakeQuery":
+        query = self._copy()
+        query._select = list(field_paths)
+        return query
+
+    def limit(self, count: int) -> "FakeQuery":
+        query = self._copy()
+        query._limit = count
+        return query
+
+    def start_after(self, document_fields) -> "FakeQuery":
+        query = self._copy()
+        query._start_after = document_fields
+        return query
+
+    def _matches(self, snapshot: FakeSnapshot) -> bool:
+        for field, op, value in self._filters:
+            actual = snapshot.get(field)
+            if op == "==" and actual != value:
+                return False
+            if op == "in" and actual not in value:
+                return False
+            if op in ("<", "<=", ">", ">=") and actual is None:
+                return False
+            if op == "<" and not actual < value:
+                return False
+            if op == "<=" and not actual <= value:
+                return False
+            if op == ">" and not actual > value:
+                return False
+            if op == ">=" and not actual >= value:
+                return False
+        return True
+
+    def _sort_key(self, snapshot: FakeSnapshot) -> List[Any]:
+        return [snapshot.get(field) for field, _ in self._effective_orders()]
+
+    def _effective_orders(self) -> List[Tuple[str, bool]]:
+        orders = list(self._orders)
+        if not any(field == DOCUMENT_ID for field, _ in orders):
+            orders.append((DOCUMENT_ID, orders[-1][1] if orders else False))
+        return orders
+
+    def _cursor_values(self) -> List[Any]:
+        cursor = self._start_after
+        if isinstance(cursor, FakeSnapshot):
+            return self._sort_key(cursor)
+        return [cursor.get(field) for field, _ in self._effective_orders()]
+
+    def _after_cursor(self, snapshot: FakeSnapshot, cursor: List[Any]) -> bool:
+        for (field, descending), current, bound in zip(self._effective_orders(), self._sort_key(snapshot), cursor):
+            if bound is None or current == bound:
+                continue
+            return current < bound if descending else current > bound
+        return False
+
+    def stream(self):
+        if self._select is not None:
+            # Projection: only the selected fields come back
+            return (
+                FakeSnapshot(snap.reference, {field: snap._data[field] for field in self._select if field in snap._data})
+                for snap in self._stream()
+            )
+        return self._stream()
+
+    def _stream(self):
+        self._client._rpc()
+        if not (self._group or self._filters or self._orders or self._start_after is not None):
+            # A plain collection scan streams in document id order, like
+            # Firestore, without building every snapshot up front
+            return itertools.islice(self._client._scan_by_id(self._parent), self._limit)
+        snapshots = [snap for snap in self._client._scan(self._parent, self._group) if self._matches(snap)]
+        for field, descending in reversed(self._effective_orders()):
+            snapshots.sort(key=lambda snap: (snap.get(field) is not None, snap.get(field)), reverse=descending)
+        if self._start_after is not None:
+            cursor = self._cursor_values()
+            snapshots = [snap for snap in snapshots if self._after_cursor(snap, cursor)]
+        if self._limit is not None:
+            snapshots = snapshots[:self._limit]
+        return iter(snapshots)
+
+    def get(self) -> List[FakeSnapshot]:
+        return list(self.stream())
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, client: "FakeFirestore", path: Tuple[str, ...]):
+        super().__init__(client, path)
+        self.id = path[-1]
+
+    def document(self, document_id: Optional[str] = None) -> FakeDocument:
+        return FakeDocument(self._client, self._parent + (document_id or uuid.uuid4().hex[:20],))
+
+
+class FakeBatch:
+    def __init__(self, client: "FakeFirestore"):
+        self._client = client
+        self._ops: List[Tuple[str, FakeDocument, Any, bool]] = []
+
+    def __len__(self) -> int:
+        return len(self._ops)
+
+    def set(self, reference: FakeDocument, data: Dict, merge: bool = False) -> None:
+        self._ops.append(("set", reference, data, merge))
+
+    def update(self, reference: FakeDocument, data: Dict) -> None:
+        self._ops.append(("update", reference, data, False))
+
+    def delete(self, reference: FakeDocument) -> None:
+        self._ops.append(("delete", reference, None, False))
+
+    def commit(self) -> List[None]:
+        if len(self._ops) > 500:
+            raise ValueError("maximum 500 writes allowed per request")
+        self._client._rpc()
+        for op, reference, data, merge in self._ops:
+            if op == "set":
+                self._client._write(reference._path, data, merge=merge)
+            elif op == "update":
+                self._client._update(reference._path, data)
+            else:
+                self._client._delete(reference._path)
+        results = [None] * len(self._ops)
+        self._ops = []
+        return results
+
+
+class FakeFirestore:
+    """Drop-in replacement for ``firestore.client()`` backed by dicts"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.rpc_count = 0
+        # parent collection path -> {document id: data}
+        self._collections: Dict[Tuple[str, ...], Dict[str, Dict]] = {}
+        self._counter = itertools.count()
+
+    def _rpc(self) -> None:
+        self.rpc_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _snapshot(self, path: Tuple[str, ...]) -> FakeSnapshot:
+        data = self._collections.get(path[:-1], {}).get(path[-1])
+        return FakeSnapshot(FakeDocument(self, path), data)
+
+    def _scan(self, parent: Tuple[str, ...], group: bool):
+        if not group:
+            for doc_id, data in list(self._collections.get(parent, {}).items()):
+                yield FakeSnapshot(FakeDocument(self, parent + (doc_id,)), data)
+            return
+        for path, docs in list(self._collections.items()):
+            if path[-1] == parent[-1]:
+                for doc_id, data in list(docs.items()):
+                    yield FakeSnapshot(FakeDocument(self, path + (doc_id,)), data)
+
+    def _scan_by_id(self, parent: Tuple[str, ...]):
+        docs = self._collections.get(parent, {})
+        for doc_id in sorted(docs):
+            if doc_id in docs:
+                yield FakeSnapshot(FakeDocument(self, parent + (doc_id,)), docs[doc_id])
+
+    def _write(self, path: Tuple[str, ...], data: Dict, merge: bool) -> None:
+        docs = self._collections.setdefault(path[:-1], {})
+        current = docs.get(path[-1]) if merge else None
+        document = dict(current or {})
+        _apply(document, data, dotted=False)
+        docs[path[-1]] = document
+
+    def _update(self, path: Tuple[str, ...], data: Dict) -> None:
+        docs = self._collections.get(path[:-1], {})
+        if path[-1] not in docs:
+            raise KeyError(f"No document to update: {'/'.join(path)}")
+        _apply(docs[path[-1]], data, dotted=True)
+
+    def _delete(self, path: Tuple[str, ...]) -> None:
+        self._collections.get(path[:-1], {}).pop(path[-1], None)
+
+    def collection(self, name: str) -> FakeCollection:
+        return FakeCollection(self, (name,))
+
+    def collection_group(self, name: str) -> FakeQuery:
+        return FakeQuery(self, (name,), group=True)
+
+    def batch(self) -> FakeBatch:
+        return FakeBatch(self)
+
+
+def install(latency: float = 0.0) -> FakeFirestore:
+    """
+    Point ``app.core.firebase_config`` at a fresh fake before the app (and the
+    ``firestore_service`` singleton) is imported.
+    """
+    from app.core import firebase_config
+
+    fake = FakeFirestore(latency=latency)
+    firebase_config._db = fake
+    return fake
@@ -0,0 +1,142 @@
+"""
+Microbenchmark: forecasting every workout type of a synthetic history with
+the previous sklearn path (a DataFrame and two LinearRegression fits per
+type, predictions built in a loop) versus the vectorized closed-form engine
+in app.services.forecasting, both from raw documents and from an already
+cached columnar series. Also checks both give the same predictions.
+
+Needs pandas and scikit-learn, which the app itself no longer uses.
+
+Usage (from backend/):
+    python -m benchmarks.forecast_engine [--workouts 10000] [--types 6] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+
+from app.services.forecasting import fit_workout_trends, forecast
+from app.services.timeseries import WorkoutSeries
+
+
+def synthetic_history(count: int, types: int, seed: int = 7):
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    names = [f"type{i}" for i in range(types)]
+    workouts = []
+    for i in range(count):
+        day = i * 730 / count
+        logged = start + timedelta(days=day, minutes=rng.randrange(1440))
+        workouts.append({
+            "id": f"workout{i}",
+            "workout_type": rng.choice(names),
+            "log_date": logged,
+            "created_at": logged,
+            "duration": max(5.0, 30 + 0.02 * day + rng.gauss(0, 8)),
+            "calories_burned": max(20.0, 250 + 0.1 * day + rng.gauss(0, 40))
+        })
+    return workouts
+
+
+def sklearn_forecast(workouts, workout_type: str, days_ahead: int):
+    """The previous /ml/predict-performance implementation for one type"""
+    workouts = [w for w in workouts if w.get("workout_type") == workout_type]
+    workouts.sort(key=lambda x: x.get("created_at", datetime.min))
+
+    df = pd.DataFrame([{
+        'date': w["created_at"],
+        'duration': w.get("duration", 0) or 0,
+        'calories_burned': w.get("calories_burned", 0) or 0
+    } for w in workouts])
+    df['day_num'] = (df['date'] - df['date'].min()).dt.days
+
+    X = df[['day_num']].values
+    y_duration = df['duration'].values
+    y_calories = df['calories_burned'].values
+    duration_model = LinearRegression().fit(X, y_duration)
+    calories_model = LinearRegression().fit(X, y_calories)
+
+    last_day = df['day_num'].max()
+    future_days = np.array([[last_day + i] for i in range(1, days_ahead + 1)])
+    predicted_duration = duration_model.predict(future_days)
+    predicted_calories = calories_model.predict(future_days)
+
+    predictions = []
+    for i, (dur, cal) in enumerate(zip(predicted_duration, predicted_calories)):
+        predictions.append({
+            "day": i + 1,
+            "predicted_duration": max(0, round(float(dur), 2)),
+            "predicted_calories": max(0, round(float(cal), 2))
+        })
+    return {
+        "predictions": predictions,
+        "model_info": {
+            "duration_score": round(duration_model.score(X, y_duration), 3),
+            "calories_score": round(calories_model.score(X, y_calories), 3)
+        }
+    }
+
+
+def _best_of(repeat: int, func) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workouts", type=int, default=10000)
+    parser.add_argument("--types", type=int, default=6)
+    parser.add_argument("--days-ahead", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    workouts = synthetic_history(args.workouts, args.types)
+    types = sorted({w["workout_type"] for w in workouts})
+
+    def old_path():
+        return {name: sklearn_forecast(workouts, name, args.days_ahead) for name in types}
+
+    def fit_series(series):
+        columns = series.columns()
+        fits = fit_workout_trends(
+            columns["workout_type"], series.categories["workout_type"],
+            columns["log_date"], columns["duration"], columns["calories_burned"]
+        )
+        return {name: forecast(fit, args.days_ahead) for name, fit in fits.items()}
+
+    def new_path():
+        return fit_series(WorkoutSeries.from_documents(workouts))
+
+    cached = WorkoutSeries.from_documents(workouts)
+
+    old, new = old_path(), new_path()
+    for name in types:
+        for before, after in zip(old[name]["predictions"], new[name]["predictions"]):
+            for field in ("predicted_duration", "predicted_calories"):
+                assert abs(before[field] - after[field]) <= 0.011, (name, field, before, after)
+        assert old[name]["model_info"] == new[name]["model_info"], name
+
+    old_time = _best_of(args.repeat, old_path)
+    new_time = _best_of(args.repeat, new_path)
+    cached_time = _best_of(args.repeat, lambda: fit_series(cached))
+    print(f"{args.workouts} workouts, {len(types)} types, {args.days_ahead} days ahead (best of {args.repeat})")
+    print(f"  sklearn, one type per fit        {old_time * 1000:8.2f} ms")
+    print(f"  closed form, from documents      {new_time * 1000:8.2f} ms   ({old_time / new_time:.1f}x faster)")
+    print(f"  closed form, from cached series  {cached_time * 1000:8.2f} ms   ({old_time / cached_time:.1f}x faster)")
+    print("  predictions and scores match")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: login throughput under concurrent load, and how responsive the
+rest of the API stays meanwhile, with argon2 run inline on the event loop
+(before) versus on the bounded hashing pool (after).
+
+Usage (from backend/):
+    SECRET_KEY=bench python -m benchmarks.login_throughput [--logins 200] [--concurrency 32]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from benchmarks.fake_firestore import install
+
+
+async def _run(app, login_path: str, total: int, concurrency: int):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    form = {"username": "bench", "password": "correct horse battery staple"}
+    remaining = iter(range(total))
+    probe_latencies = []
+    done = asyncio.Event()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def login_worker():
+            for _ in remaining:
+                response = await client.post(login_path, data=form)
+                response.raise_for_status()
+
+        async def probe():
+            # A cheap request issued every 10 ms; its latency shows loop stalls
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/health")
+                probe_latencies.append(time.perf_counter() - started)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+
+    return total / elapsed, len(probe_latencies), statistics.median(probe_latencies or [0.0]), max(probe_latencies or [0.0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    install()
+
+    from fastapi import Depends, HTTPException
+    from fastapi.security import OAuth2PasswordRequestForm
+    from app.main import app
+    from app.core.config import settings
+    from app.core.security import get_password_hash, password_hasher, verify_password, create_access_token
+    from app.services.firestore_service import firestore_service
+
+    firestore_service.create_user({
+        "username": "bench",
+        "email": "bench@example.com",
+        "hashed_password": get_password_hash("correct horse battery staple")
+    })
+
+    @app.post("/legacy-login")
+    async def legacy_login(form_data: OAuth2PasswordRequestForm = Depends()):
+        """The previous handler: argon2 verification inline on the event loop"""
+        user = firestore_service.get_user_by_username(form_data.username)
+        if not user or not verify_password(form_data.password, user["hashed_password"]):
+            raise HTTPException(status_code=401)
+        return {"access_token": create_access_token({"sub": user["username"]}), "token_type": "bearer"}
+
+    print(f"{args.logins} logins, concurrency {args.concurrency}, "
+          f"hash pool size {settings.PASSWORD_HASH_CONCURRENCY}")
+    for label, path in (("before (inline argon2)", "/legacy-login"),
+                        ("after (bounded pool)", f"{settings.API_V1_PREFIX}/auth/login")):
+        rate, probes, median, worst = asyncio.run(_run(app, path, args.logins, args.concurrency))
+        print(f"  {label:<24} {rate:>7.1f} logins/s   /health x{probes:<5} "
+              f"median {median * 1000:6.1f} ms  max {worst * 1000:7.1f} ms")
+    print(f"  pool stats: {password_hasher.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark: resolving a meal plan through the single-item prediction endpoint
+(one request per item, sequential and concurrent) versus one call to the batch
+endpoint. CalorieNinjas is replaced by a fixed-latency fake and the nutrition
+caches start empty for every run.
+
+Usage (from backend/):
+    SECRET_KEY=bench python -m benchmarks.prediction_batch [--items 60] [--latency 0.08]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+
+from benchmarks.fake_firestore import install
+
+
+def _meal_plan(count: int):
+    # Roughly one repeat for every three items, as in a weekly plan
+    distinct = max(1, count * 2 // 3)
+    return [f"benchmark food {i % distinct}" for i in range(count)]
+
+
+async def _run(app, prefix: str, queries, mode: str, concurrency: int) -> float:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        if mode == "batch":
+            response = await client.post(f"{prefix}/nutrition/batch", json={"items": [{"query": q} for q in queries]})
+            response.raise_for_status()
+        else:
+            remaining = iter(queries)
+
+            async def worker():
+                for query in remaining:
+                    response = await client.post(f"{prefix}/nutrition", json={"query": query})
+                    response.raise_for_status()
+
+            await asyncio.gather(*(worker() for _ in range(concurrency if mode == "concurrent" else 1)))
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.08, help="fake CalorieNinjas latency in seconds")
+    args = parser.parse_args()
+
+    install()
+
+    from app.main import app
+    from app.core.config import settings
+    from app.services.ai_service import ai_service
+    from app.services.nutrition_cache import NutritionCache
+
+    upstream_calls = 0
+
+    async def fake_fetch_items(query):
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(args.latency)
+        return [{"name": query, "calories": 100.0, "protein_g": 5.0, "carbohydrates_total_g": 10.0,
+                 "fat_total_g": 2.0, "serving_size_g": 100.0}]
+
+    ai_service._fetch_items = fake_fetch_items
+    ai_service.food_index = None
+    prefix = f"{settings.API_V1_PREFIX}/prediction"
+    queries = _meal_plan(args.items)
+    concurrency = settings.PREDICTION_BATCH_CONCURRENCY
+
+    print(f"{len(queries)} items ({len(set(queries))} distinct), upstream latency {args.latency * 1000:.0f} ms, "
+          f"concurrency {concurrency}")
+    for label, mode in (("single, sequential", "sequential"),
+                        (f"single, {concurrency} concurrent", "concurrent"),
+                        ("batch endpoint", "batch")):
+        ai_service.nutrition_cache = NutritionCache(settings.NUTRITION_CACHE_MEMORY_BYTES)
+        upstream_calls = 0
+        elapsed = asyncio.run(_run(app, prefix, queries, mode, concurrency))
+        print(f"  {label:<22} {elapsed * 1000:8.0f} ms  {len(queries) / elapsed:7.1f} items/s  "
+              f"{upstream_calls:>3} upstream calls")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Build the memory-mapped offline food index from a CSV.
+
+The CSV needs a ``name`` column plus serving_size_g, calories, protein_g,
+carbohydrates_total_g and fat_total_g (per serving):
+    python scripts/build_food_index.py                      # data/foods.csv -> data/foods.idx
+    python scripts/build_food_index.py my_foods.csv out.idx
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.food_index import build_index
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+
+def main(argv):
+    csv_path = argv[0] if len(argv) > 0 else os.path.join(DATA_DIR, "foods.csv")
+    index_path = argv[1] if len(argv) > 1 else os.path.join(DATA_DIR, "foods.idx")
+    count = build_index(csv_path, index_path)
+    print(f"✓ Indexed {count} foods from {csv_path} into {index_path}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,78 @@
+"""
+Import-time budget check for the API's cold start.
+
+Imports app.main in a fresh interpreter under ``python -X importtime`` and
+fails (exit status 1) if it takes longer than the budget or if any module in
+app.core.warmup.HEAVY_MODULES was imported on the way:
+    python scripts/check_import_time.py                 # 1500 ms budget
+    python scripts/check_import_time.py --budget-ms 800 --top 15
+
+tests/test_import_time.py enforces the same budget under pytest.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core.warmup import HEAVY_MODULES
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure(module: str = "app.main"):
+    """Return ``[(cumulative_us, self_us, depth, name)]`` for one fresh import of ``module``"""
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "import-time-check")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"importing {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(cumulative_us), int(self_us), len(indent) // 2, name))
+    return rows
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    args = parser.parse_args(argv)
+
+    rows = measure()
+    total_ms = next(cumulative for cumulative, _, _, name in rows if name == "app.main") / 1000
+    imported = {name for _, _, _, name in rows}
+    eager = [name for name in HEAVY_MODULES if name in imported]
+
+    print(f"app.main imported in {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    print("slowest top-level imports:")
+    top_level = sorted((row for row in rows if row[2] <= 1), reverse=True)[:args.top]
+    for cumulative, _, _, name in top_level:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if eager:
+        print(f"✗ heavy modules imported at startup: {', '.join(eager)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"✗ over budget by {total_ms - args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("✓ within budget")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
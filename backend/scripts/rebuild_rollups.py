@@ -0,0 +1,27 @@
+"""
+Regenerate the per-day rollup documents from raw workouts and nutrition logs.
+
+Run after importing data outside the API, or to repair drift:
+    python scripts/rebuild_rollups.py              # every user
+    python scripts/rebuild_rollups.py USER_ID ...  # specific users
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.firestore_service import firestore_service, USERS_COLLECTION
+
+
+def main(user_ids):
+    if not user_ids:
+        user_ids = [doc.id for doc in firestore_service.db.collection(USERS_COLLECTION).stream()]
+
+    for user_id in user_ids:
+        days = firestore_service.rebuild_daily_rollups(user_id)
+        print(f"✓ {user_id}: {days} daily rollups written")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,12 @@
+import os
+import sys
+
+# Make the ``app`` package importable however pytest is invoked
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.core.config refuses to load without one
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: long-running checks, deselect with -m 'not slow'")
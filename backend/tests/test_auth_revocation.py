@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("jose")
+pytest.importorskip("google.cloud.firestore_v1")
+pytest.importorskip("firebase_admin")
+
+from fastapi import HTTPException  # noqa: E402
+
+from app.api import deps  # noqa: E402
+from app.core import firebase_config  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.services.firestore_service import firestore_service  # noqa: E402
+from benchmarks.fake_firestore import install  # noqa: E402
+
+
+@pytest.fixture
+def user_token():
+    previous = firebase_config._db
+    install()
+    user_id = firestore_service.create_user({"username": "alice", "email": "alice@example.com"})
+    yield user_id, create_access_token({"sub": "alice", "uid": user_id})
+    deps.principal_cache.discard_where(lambda principal: True)
+    firebase_config._db = previous
+
+
+def test_revoked_account_is_rejected_but_can_poll_its_jobs(user_token):
+    user_id, token = user_token
+    assert deps.get_current_principal(token)["user_id"] == user_id
+
+    assert asyncio.run(deps.revoke_user(user_id))
+    with pytest.raises(HTTPException) as error:
+        deps.get_current_principal(token)
+    assert error.value.status_code == 401
+    assert deps.get_job_owner_id(token) == user_id
+
+    asyncio.run(deps.restore_user(user_id))
+    assert deps.get_current_principal(token)["user_id"] == user_id
+
+
+def test_revocation_by_another_worker_applies_once_the_principal_expires(user_token):
+    user_id, token = user_token
+    deps.get_current_principal(token)
+
+    # Another worker marks the account; this one still holds the principal
+    firestore_service.update_user(user_id, {"revoked_at": "2026-01-01T00:00:00"})
+    assert deps.get_current_principal(token)["user_id"] == user_id
+
+    deps.principal_cache.discard_where(lambda principal: True)
+    with pytest.raises(HTTPException):
+        deps.get_current_principal(token)
+
+
+def test_deleted_account_is_rejected(user_token):
+    user_id, token = user_token
+    firestore_service.delete_user(user_id)
+
+    with pytest.raises(HTTPException):
+        deps.get_current_principal(token)
+    assert deps.get_job_owner_id(token) == user_id
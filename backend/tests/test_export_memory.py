@@ -0,0 +1,47 @@
+"""
+Bounded-memory check for the streaming export (``GET /export``), run against
+the in-memory Firestore stand-in from ``benchmarks``, at 100k records.
+Marked ``slow``: deselect it locally with ``-m "not slow"``.
+"""
+import os
+
+import pytest
+
+pytest.importorskip("google.cloud.firestore_v1")
+pytest.importorskip("pydantic_settings")
+if not os.path.exists("/proc/self/statm"):
+    pytest.skip("RSS is read from /proc", allow_module_level=True)
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from benchmarks.export_memory import USER_ID, measure, seed  # noqa: E402
+from benchmarks.fake_firestore import install  # noqa: E402
+
+pytestmark = pytest.mark.slow
+
+RECORDS = 100000
+MAX_RSS_GROWTH_MB = 32
+MAX_PEAK_MB = 16
+
+
+@pytest.fixture(scope="module")
+def service():
+    fake = install()
+    from app.services.firestore_service import firestore_service
+
+    seed(fake, RECORDS)
+    return firestore_service
+
+
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+def test_streaming_export_memory_is_bounded(service, export_format):
+    from app.services.exporter import stream_export
+
+    def export():
+        return sum(len(chunk) for chunk in stream_export(service, USER_ID, export_format))
+
+    size, _, peak, rss_growth = measure(export)
+
+    assert size > 0
+    assert peak < MAX_PEAK_MB * 2 ** 20
+    assert rss_growth < MAX_RSS_GROWTH_MB * 2 ** 20
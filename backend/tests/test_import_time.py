@@ -0,0 +1,54 @@
+"""
+Cold-start budget: importing app.main must stay fast and must not load the
+heavy modules or open the data files the routes load on first use.
+"""
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("firebase_admin")
+pytest.importorskip("pydantic_settings")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = 1500
+
+
+def _load_check():
+    # Loaded by path: a site-packages "scripts" package must not shadow ours
+    spec = importlib.util.spec_from_file_location(
+        "check_import_time", os.path.join(BACKEND_DIR, "scripts", "check_import_time.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_app_imports_within_budget():
+    check = _load_check()
+    rows = check.measure()
+
+    total_ms = next(cumulative for cumulative, _, _, name in rows if name == "app.main") / 1000
+    imported = {name for _, _, _, name in rows}
+
+    assert not [name for name in check.HEAVY_MODULES if name in imported]
+    assert total_ms <= BUDGET_MS, f"app.main imported in {total_ms:.0f} ms (budget {BUDGET_MS} ms)"
+
+
+def test_import_does_not_open_data_files():
+    probe = (
+        "import app.main\n"
+        "from app.services import ai_service as module\n"
+        "service = module.ai_service\n"
+        "assert service._food_index is module._UNLOADED, 'food index opened at import'\n"
+        "assert service._met_matcher is module._UNLOADED, 'MET table loaded at import'\n"
+        "assert service.nutrition_cache._db is None, 'nutrition cache opened at import'\n"
+    )
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "import-time-check")
+    result = subprocess.run([sys.executable, "-c", probe], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr[-2000:]
@@ -0,0 +1,41 @@
+import time
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("google.cloud.firestore_v1")
+pytest.importorskip("firebase_admin")
+
+from app.services.jobs import FAILED, RUNNING, SUCCEEDED, InMemoryJobBackend, Job, JobBackend  # noqa: E402
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        JobBackend()
+
+
+def test_running_job_outlives_the_ttl():
+    backend = InMemoryJobBackend(maxsize=10, ttl=0.05)
+    job = Job("user", "account-delete", {}, key=("user", "account-delete"))
+    backend.save(job)
+    job.status = RUNNING
+    backend.save(job)
+
+    time.sleep(0.1)
+    assert backend.get(job.id) is job
+
+
+@pytest.mark.parametrize("final_status", [SUCCEEDED, FAILED])
+def test_ttl_starts_when_the_job_finishes(final_status):
+    backend = InMemoryJobBackend(maxsize=10, ttl=0.1)
+    job = Job("user", "progress", {"days": 365}, key=("user", "progress"))
+    backend.save(job)
+    time.sleep(0.15)
+
+    job.status = final_status
+    backend.save(job)
+    assert backend.get(job.id) is job
+    assert backend.stats()["pending"] == 0
+
+    time.sleep(0.15)
+    assert backend.get(job.id) is None
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from app.services.met_matcher import DEFAULT_ACTIVITIES, MetMatcher
+
+ACTIVITY_TABLE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "activities.csv")
+
+
+def test_phrase_must_end_on_a_word_boundary():
+    matcher = MetMatcher({"row": 7.0, "run": 9.8})
+
+    assert matcher.match("rowing machine") is None
+    assert matcher.match("runner's stretch") is None
+    assert matcher.match("row, then run") == ("row", 7.0)
+    assert matcher.match("easy run") == ("run", 9.8)
+
+
+def test_phrase_must_start_on_a_word_boundary():
+    matcher = MetMatcher({"row": 7.0})
+
+    assert matcher.match("arrow drills") is None
+    assert matcher.match("Row") == ("row", 7.0)
+
+
+def test_short_phrase_does_not_match_a_longer_word():
+    # "gym" used to match the start of "gymnastics" and score it as a gym session
+    matcher = MetMatcher(DEFAULT_ACTIVITIES)
+
+    assert matcher.match("gymnastics") is None
+    assert matcher.match("gym session") == ("gym", 5.0)
+
+
+def test_longest_phrase_wins():
+    matcher = MetMatcher({"running": 9.8, "running uphill": 12.0, "uphill": 6.0})
+
+    assert matcher.match("Running uphill!") == ("running uphill", 12.0)
+    assert matcher.match("running up the hill") == ("running", 9.8)
+
+
+@pytest.mark.parametrize("activity, phrase", [
+    ("Trail running", "trail running"),
+    ("golfing", "golfing"),
+    ("3 sets of planks", "planks"),
+    ("rowing machine intervals", "rowing machine")
+])
+def test_bundled_table(activity, phrase):
+    matcher = MetMatcher.from_csv(ACTIVITY_TABLE)
+    assert matcher.match(activity)[0] == phrase
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from app.services.nutrition_cache import NutritionCache
+
+
+def item(name, grams, calories):
+    return {"name": name, "serving_size_g": grams, "calories": calories, "protein_g": calories / 10}
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    path = str(tmp_path / "nutrition.sqlite3") if request.param == "sqlite" else None
+    return NutritionCache(memory_bytes=1 << 20, path=path)
+
+
+def test_sqlite_file_is_opened_on_first_use(tmp_path):
+    path = str(tmp_path / "nutrition.sqlite3")
+    cache = NutritionCache(memory_bytes=1 << 20, path=path)
+    assert not os.path.exists(path)
+    cache.set("toast", [item("toast", 100.0, 290.0)])
+    assert os.path.exists(path)
+
+
+def test_whole_query_is_cached_as_is(cache):
+    cache.set("2 eggs and toast", [item("eggs", 100.0, 143.0), item("toast", 100.0, 290.0)])
+    assert cache.lookup("2 eggs and toast") == [item("eggs", 100.0, 143.0), item("toast", 100.0, 290.0)]
+
+
+def test_query_is_composed_from_foods_seen_separately(cache):
+    cache.set("2 eggs", [item("eggs", 100.0, 143.0)])
+    cache.set("toast", [item("toast", 100.0, 290.0)])
+
+    assert cache.lookup("2 eggs and toast") == [item("eggs", 100.0, 143.0), item("toast", 100.0, 290.0)]
+    # Counts use the per-egg weight upstream gave, not a 100 g base
+    eggs = cache.lookup("3 eggs")[0]
+    assert eggs["serving_size_g"] == 150.0
+    assert eggs["calories"] == 214.5
+    assert cache.lookup("200g toast")[0]["calories"] == 580.0
+
+
+def test_dish_names_are_not_split(cache):
+    cache.set("mac", [item("mac", 100.0, 1.0)])
+    cache.set("cheese", [item("cheese", 100.0, 400.0)])
+    cache.set("mac and cheese", [item("mac and cheese", 100.0, 164.0)])
+
+    assert cache.lookup("mac and cheese, toast") is None
+    cache.set("toast", [item("toast", 100.0, 290.0)])
+    assert cache.lookup("mac and cheese with toast") == [
+        item("mac and cheese", 100.0, 164.0), item("toast", 100.0, 290.0)
+    ]
+
+
+def test_unknown_foods_and_units_go_upstream(cache):
+    cache.set("toast", [item("toast", 100.0, 290.0)])
+    cache.set("hummus", [item("hummus", 100.0, 166.0)])
+
+    assert cache.lookup("2 slices toast") is None
+    assert cache.lookup("an egg") is None
+    assert cache.lookup("hummus and toast") is not None
+    assert cache.lookup("hummu") is None
@@ -0,0 +1,137 @@
+"""
+Concurrent identical nutrition predictions make one CalorieNinjas request.
+The service's pooled httpx client is pointed at a local HTTP stub that
+answers after a delay, so the callers really overlap on the wire.
+"""
+import asyncio
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("dotenv")
+pytest.importorskip("pydantic_settings")
+
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from app.services.ai_service import AIService  # noqa: E402
+from app.services.nutrition_cache import NutritionCache  # noqa: E402
+
+CALLERS = 20
+
+
+class StubCalorieNinjas(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, delay: float):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.delay = delay
+        self.status = 200
+        self.hits = 0
+        self.served = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1/nutrition"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        stub = self.server
+        with stub.lock:
+            stub.hits += 1
+        threading.Event().wait(stub.delay)
+        if stub.status == 200:
+            body = json.dumps({"items": [{
+                "name": "chicken tikka", "serving_size_g": 100.0, "calories": 150.0,
+                "protein_g": 20.0, "carbohydrates_total_g": 4.0, "fat_total_g": 6.0
+            }]}).encode()
+        else:
+            body = b'{"error": "upstream failure"}'
+        self.send_response(stub.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with stub.lock:
+            stub.served += 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = StubCalorieNinjas(delay=0.3)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def service(stub):
+    service = AIService()
+    service.calorieninjas_api_key = "test-key"
+    service.calorieninjas_api_url = stub.url
+    service.nutrition_cache = NutritionCache(memory_bytes=1 << 20)
+    service.food_index = None
+    return service
+
+
+async def _with_client(service, coroutine):
+    await service.start()
+    try:
+        return await coroutine
+    finally:
+        await service.aclose()
+
+
+def test_concurrent_identical_queries_make_one_upstream_call(service, stub):
+    async def main():
+        return await asyncio.gather(*(service.predict_nutrition("Chicken Tikka") for _ in range(CALLERS)))
+
+    results = asyncio.run(_with_client(service, main()))
+
+    assert stub.hits == 1
+    assert len(results) == CALLERS
+    assert all(result == results[0] for result in results)
+    assert results[0]["calories"] == 150.0
+
+
+def test_upstream_error_reaches_every_caller(service, stub):
+    stub.status = 500
+
+    async def main():
+        return await asyncio.gather(
+            *(service.predict_nutrition("chicken tikka") for _ in range(CALLERS)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(_with_client(service, main()))
+
+    assert stub.hits == 1
+    assert all(isinstance(result, Exception) and "500" in str(result) for result in results)
+
+
+def test_cancelled_caller_does_not_cancel_shared_request(service, stub):
+    async def main():
+        leaving = asyncio.ensure_future(service.predict_nutrition("chicken tikka"))
+        staying = asyncio.ensure_future(service.predict_nutrition("chicken tikka"))
+        await asyncio.sleep(stub.delay / 3)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return await staying
+
+    result = asyncio.run(_with_client(service, main()))
+
+    assert result["calories"] == 150.0
+    assert stub.hits == 1
+    assert stub.served == 1
+    assert len(service._inflight) == 0
@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+class DelayedUpstream:
+    """Local stand-in for an upstream API that answers after ``delay`` seconds"""
+
+    def __init__(self, delay: float = 0.05, error: Exception = None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+        self.completed = 0
+
+    async def fetch(self, query: str):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error is not None:
+            raise self.error
+        self.completed += 1
+        return {"query": query}
+
+
+def test_concurrent_callers_share_one_upstream_call():
+    upstream = DelayedUpstream()
+    flight = SingleFlight()
+
+    async def main():
+        return await asyncio.gather(*(
+            flight.do("apple", lambda: upstream.fetch("apple")) for _ in range(50)
+        ))
+
+    results = asyncio.run(main())
+
+    assert upstream.calls == 1
+    assert results == [{"query": "apple"}] * 50
+    assert flight.stats() == {"in_flight": 0, "started": 1, "coalesced": 49}
+
+
+def test_different_keys_are_not_coalesced():
+    upstream = DelayedUpstream()
+    flight = SingleFlight()
+
+    async def main():
+        return await asyncio.gather(
+            flight.do("apple", lambda: upstream.fetch("apple")),
+            flight.do("banana", lambda: upstream.fetch("banana"))
+        )
+
+    assert asyncio.run(main()) == [{"query": "apple"}, {"query": "banana"}]
+    assert upstream.calls == 2
+
+
+def test_exception_reaches_every_waiter():
+    upstream = DelayedUpstream(error=RuntimeError("upstream down"))
+    flight = SingleFlight()
+
+    async def main():
+        return await asyncio.gather(
+            *(flight.do("apple", lambda: upstream.fetch("apple")) for _ in range(10)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+
+    assert upstream.calls == 1
+    assert len(results) == 10
+    assert all(isinstance(result, RuntimeError) and str(result) == "upstream down" for result in results)
+    assert len(flight) == 0
+
+
+def test_failed_call_is_not_reused():
+    upstream = DelayedUpstream(delay=0.01, error=RuntimeError("upstream down"))
+    flight = SingleFlight()
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await flight.do("apple", lambda: upstream.fetch("apple"))
+        upstream.error = None
+        return await flight.do("apple", lambda: upstream.fetch("apple"))
+
+    assert asyncio.run(main()) == {"query": "apple"}
+    assert upstream.calls == 2
+
+
+def test_cancelled_waiter_does_not_cancel_shared_call():
+    upstream = DelayedUpstream()
+    flight = SingleFlight()
+
+    async def main():
+        leaving = asyncio.ensure_future(flight.do("apple", lambda: upstream.fetch("apple")))
+        staying = asyncio.ensure_future(flight.do("apple", lambda: upstream.fetch("apple")))
+        await asyncio.sleep(upstream.delay / 5)
+        leaving.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaving
+        return await staying
+
+    assert asyncio.run(main()) == {"query": "apple"}
+    assert upstream.calls == 1
+    assert upstream.cancelled == 0
+    assert upstream.completed == 1
+    assert len(flight) == 0
+
+
+def test_last_cancelled_waiter_cancels_call_without_stale_entry():
+    upstream = DelayedUpstream()
+    flight = SingleFlight()
+
+    async def main():
+        waiters = [asyncio.ensure_future(flight.do("apple", lambda: upstream.fetch("apple"))) for _ in range(3)]
+        await asyncio.sleep(upstream.delay / 5)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        # Let the shared task process its cancellation
+        await asyncio.sleep(0)
+        assert len(flight) == 0
+
+        # A later caller starts a fresh upstream call
+        return await flight.do("apple", lambda: upstream.fetch("apple"))
+
+    assert asyncio.run(main()) == {"query": "apple"}
+    assert upstream.calls == 2
+    assert upstream.cancelled == 1
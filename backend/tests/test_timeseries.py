@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.timeseries import WorkoutSeries, _Series, epoch_seconds  # noqa: E402
+
+
+def workout(index: int) -> dict:
+    when = datetime(2024, 1, 1) + timedelta(days=index)
+    return {"id": f"w{index}", "workout_type": "cardio", "duration": 30 + index,
+            "calories_burned": 200.0, "log_date": when, "created_at": when}
+
+
+def test_series_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        _Series()
+
+
+def test_remove_keeps_capacity_and_order():
+    series = WorkoutSeries.from_documents([workout(i) for i in range(5)])
+    capacity = len(series._data["duration"])
+
+    assert series.remove("w1")
+    assert not series.remove("w1")
+
+    assert len(series._data["duration"]) == capacity
+    assert series.ids == ["w0", "w2", "w3", "w4"]
+    assert series.columns()["duration"].tolist() == [30, 32, 33, 34]
+
+
+def test_append_after_removing_every_row():
+    series = WorkoutSeries(capacity=1)
+    series.add(workout(0))
+    series.add(workout(1))
+    for doc_id in ("w0", "w1"):
+        series.remove(doc_id)
+    assert len(series) == 0
+
+    for index in range(2, 6):
+        assert series.add(workout(index))
+    assert series.columns()["duration"].tolist() == [32, 33, 34, 35]
+
+
+def test_columns_handed_out_survive_removal():
+    series = WorkoutSeries.from_documents([workout(i) for i in range(3)])
+    before = series.columns()["duration"]
+    series.remove("w0")
+    assert before.tolist() == [30, 31, 32]
+
+
+def test_partial_series_only_covers_its_window():
+    start = epoch_seconds(datetime(2024, 1, 10))
+    series = WorkoutSeries.from_documents([], since=start)
+
+    assert series.covers(start)
+    assert series.covers(start + 3600)
+    assert not series.covers(start - 3600)
+    assert not series.covers(None)
+    assert WorkoutSeries.from_documents([]).covers(None)